@@ -107,6 +107,89 @@ else:
     }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'rapid-scaffolder',
+    },
+    # Generated archives and previews only, so their size cannot evict the
+    # quota, auth and response entries in 'default'. LocMemCache drops the least
+    # recently used quarter once full: at most MAX_ENTRIES x MAX_ITEM_BYTES
+    # (SCAFFOLDER_GENERATION_CACHE) per process
+    'generation': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'rapid-scaffolder-generation',
+        'OPTIONS': {
+            'MAX_ENTRIES': 64,
+            'CULL_FREQUENCY': 4,
+        },
+    },
+}
+
+# Generated code cache (keyed by project schema fingerprint); eviction is left
+# to the backend of its dedicated alias
+SCAFFOLDER_GENERATION_CACHE = {
+    'ALIAS': 'generation',
+    'MAX_ITEM_BYTES': 8 * 1024 * 1024,  # Larger artifacts are regenerated each time
+    'TIMEOUT': 60 * 60,
+    'FRAGMENT_ENTRIES': 8192,  # Per-model code fragments kept in process
+}
+
+# Serialized project detail and view/route lists, invalidated per project by signals
+SCAFFOLDER_RESPONSE_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': 5 * 60,
+}
+
+# Background generation jobs (in-process worker pool)
+SCAFFOLDER_GENERATION_JOBS = {
+    'MAX_WORKERS': 2,
+    'MAX_PENDING': 8,
+    # Unfinished jobs older than this (seconds) are marked failed by the
+    # fail_stale_generations command; run it on startup and from cron
+    'STALE_AFTER': 15 * 60,
+}
+
+# Render files and deflate archive chunks on a shared thread pool
+SCAFFOLDER_PARALLEL_RENDERING = {
+    'ENABLED': False,
+    'MAX_WORKERS': 4,
+}
+
+# Daily API-call quota per subscription tier (None is unlimited); counted in
+# the cache and flushed to UserProfile.api_calls_today in the background.
+# ALIAS must name a cache shared by all workers (Redis, Memcached, ...) in
+# production: with LocMemCache each process counts separately, so the
+# effective limit is multiplied by the number of workers. `check --deploy`
+# reports this as users.E001.
+USER_API_QUOTA = {
+    'ALIAS': 'default',
+    'DAILY_LIMITS': {'free': 1000, 'pro': 10000, 'enterprise': None},
+    'TIER_TIMEOUT': 5 * 60,
+    'FLUSH_INTERVAL': 60,  # Seconds between flushes; None disables them
+}
+
+# What authentication checks about JWT subjects (id, is_active, a password digest);
+# dropped when the user is saved. ALIAS must be a cache shared by all workers in
+# production (users.E002), or a deactivated user stays signed in for TIMEOUT
+USER_AUTH_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': 60,
+}
+
+# Outgoing mail queue delivered by `manage.py send_queued_emails`
+USER_EMAIL_OUTBOX = {
+    'BATCH_SIZE': 50,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BACKOFF': 60,  # Seconds before the first retry, doubling after each failure
+    'MAX_BACKOFF': 60 * 60,
+    'LEASE': 5 * 60,
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -154,11 +237,14 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # DRF Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_THROTTLE_CLASSES': (
+        'users.throttling.DailyQuotaThrottle',
+    ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20
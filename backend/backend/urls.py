@@ -24,5 +24,6 @@ urlpatterns = [
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     
     path("api/auth/", include("users.urls")),
+    path("api/async/", include("scaffolder.async_urls")),
     path("api/", include("scaffolder.urls")),
 ]
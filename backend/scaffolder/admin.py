@@ -3,7 +3,7 @@ from .models import Project, DatabaseModel, ModelField, Relationship, GeneratedP
 
 @admin.register(Project)
 class ProjectAdmin(admin.ModelAdmin):
-    list_display = ('name', 'framework', 'owner', 'created_at')
+    list_display = ('name', 'framework', 'owner', 'model_count', 'field_count', 'relationship_count', 'created_at')
     list_filter = ('framework', 'created_at')
     search_fields = ('name', 'owner__username')
 
@@ -27,6 +27,6 @@ class RelationshipAdmin(admin.ModelAdmin):
 
 @admin.register(GeneratedProject)
 class GeneratedProjectAdmin(admin.ModelAdmin):
-    list_display = ('project', 'version', 'generated_at')
-    list_filter = ('generated_at',)
+    list_display = ('project', 'version', 'status', 'generated_at')
+    list_filter = ('status', 'generated_at')
     search_fields = ('project__name',)
\ No newline at end of file
@@ -5,3 +5,6 @@ class ScaffolderConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'scaffolder'
     verbose_name="Scaffolder"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,11 @@
+from django.urls import path
+
+from . import async_views
+
+# Mounted under api/async/; same paths as the ProjectViewSet actions
+urlpatterns = [
+    path('projects/<uuid:pk>/generate/', async_views.generate, name='async-project-generate'),
+    path('projects/<uuid:pk>/preview/', async_views.preview, name='async-project-preview'),
+    path('projects/<uuid:pk>/preview/files/', async_views.preview_files, name='async-project-preview-files'),
+    path('projects/<uuid:pk>/graph/', async_views.graph, name='async-project-graph'),
+]
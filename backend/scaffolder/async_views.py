@@ -0,0 +1,131 @@
+"""
+Async variants of the editor's hot endpoints for ASGI deployments.
+
+DRF views are synchronous, so these are plain Django async views, mounted
+under api/async/ with the same paths, parameters and responses as their
+ProjectViewSet actions, behind the same JWT authentication and API quota.
+Schema rows are read with the async ORM and the scaffolder.rendering
+helpers shared with those actions (rendering, fingerprinting and
+compression) run on the event loop's default executor, so a request
+waiting on either does not hold a worker thread.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import exceptions, status
+from rest_framework.utils.encoders import JSONEncoder
+
+from users.authentication import CachedJWTAuthentication
+from users.quota import api_call_quota, seconds_until_tomorrow
+from .models import Project
+from .graph import GraphQueryError, graph_cache_kind, load_project_graph_async, parse_graph_selection
+from .rendering import generate_response, preview_files_response, preview_response
+from .response_cache import response_cache, schema_etag, schema_last_modified, with_validators
+from .schema import load_project_schema_async
+
+# CPU-bound work goes to the loop's default executor, off the request's own thread
+offload = functools.partial(sync_to_async, thread_sensitive=False)
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    return JsonResponse(data, status=status, encoder=JSONEncoder, safe=False)
+
+
+def api_exception_response(request, authenticator, exc):
+    """The response DRF's default exception handler gives for exc"""
+    detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    response = json_response(detail, status=exc.status_code)
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        response.status_code = status.HTTP_401_UNAUTHORIZED
+        response['WWW-Authenticate'] = authenticator.authenticate_header(request)
+    if getattr(exc, 'wait', None):
+        response['Retry-After'] = str(int(exc.wait))
+    return response
+
+
+def async_api_view(view):
+    """Authenticate and count the call like the DRF defaults, then await view"""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        authenticator = CachedJWTAuthentication()
+        try:
+            result = await authenticator.aauthenticate(request)
+            if result is None:
+                raise exceptions.NotAuthenticated()
+            request.user, request.auth = result
+            calls, limit = await sync_to_async(api_call_quota.record_call)(request.user)
+            if limit is not None and calls > limit:
+                raise exceptions.Throttled(wait=seconds_until_tomorrow())
+            return await view(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return api_exception_response(request, authenticator, exc)
+    return csrf_exempt(wrapper)
+
+
+async def get_project(request, pk, *fields):
+    queryset = Project.objects.filter(owner=request.user)
+    if fields:
+        queryset = queryset.only(*fields)
+    try:
+        return await queryset.aget(pk=pk)
+    except Project.DoesNotExist:
+        raise exceptions.NotFound('No Project matches the given query.')
+
+
+async def iterate_in_executor(iterator):
+    """Pull each chunk of a blocking iterator on the executor"""
+    sentinel = object()
+    pull = offload(next)
+    while (chunk := await pull(iterator, sentinel)) is not sentinel:
+        yield chunk
+
+
+@require_POST
+@async_api_view
+async def generate(request, pk):
+    project = await get_project(request, pk)
+    schema = await load_project_schema_async(project)
+    return await offload(generate_response)(request, project, schema, json_response, iterate_in_executor)
+
+
+@require_GET
+@async_api_view
+async def preview(request, pk):
+    project = await get_project(request, pk)
+    try:
+        schema = await load_project_schema_async(project)
+    except Exception as e:
+        return json_response(
+            {'error': f'Preview generation failed: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    return await offload(preview_response)(request, schema, json_response)
+
+
+@require_GET
+@async_api_view
+async def preview_files(request, pk):
+    project = await get_project(request, pk)
+    schema = await load_project_schema_async(project)
+    return await offload(preview_files_response)(request, schema, json_response)
+
+
+@require_GET
+@async_api_view
+async def graph(request, pk):
+    try:
+        selection = parse_graph_selection(request.GET)
+    except GraphQueryError as e:
+        return json_response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    project = await get_project(request, pk, 'pk', 'owner', *Project.REVISION_FIELDS)
+
+    etag, last_modified = schema_etag(project), schema_last_modified(project)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = json_response(await response_cache.aget_or_build(
+            project, graph_cache_kind(selection), lambda: load_project_graph_async(project.pk, selection)
+        ))
+    return with_validators(response, etag, last_modified)
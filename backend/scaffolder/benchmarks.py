@@ -0,0 +1,360 @@
+"""
+Helpers for benchmarking the code generators on synthetic schemas.
+
+synthetic_schema builds an in-memory ProjectSchema for pure render
+throughput; create_synthetic_project writes an equivalent project to the
+database so the full path (schema loading, rendering, compression) can be
+measured for latency, SQL query count, peak memory and archive size.
+run_suite does so in a temporary test database, never the configured one.
+
+interpreted_templates switches the generators back to parsing each
+template with str.format and growing files by string concatenation, so
+measure_render_paths can compare that path with the compiled one.
+"""
+import gc
+import random
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.test.utils import CaptureQueriesContext, setup_databases, teardown_databases
+
+from . import code_generators
+from .emitter import Template
+from .models import Project, DatabaseModel, ModelField, Relationship, View, ViewField, URLRoute
+from .ranking import evenly_spaced_ranks
+from .schema import FieldSchema, ModelSchema, ProjectSchema, RelationshipSchema
+
+FIELD_TYPES = [field_type for field_type, _ in ModelField.FIELD_TYPES]
+RELATIONSHIP_TYPES = ['1:1', '1:M', 'M:M']
+
+
+class NoFragmentCache:
+    """Fragment cache stand-in that forces every model to be rendered"""
+
+    def get_or_render(self, key, render):
+        return render()
+
+
+def synthetic_schema(models=100, fields_per_model=10, relationship_density=0.3, seed=0):
+    """Build an in-memory ProjectSchema without touching the database"""
+    rng = random.Random(seed)
+    stamp = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    model_names = [f'Model{index}' for index in range(models)]
+
+    model_schemas = []
+    for index, model_name in enumerate(model_names):
+        fields = []
+        for order in range(fields_per_model):
+            field_type = FIELD_TYPES[(index + order) % len(FIELD_TYPES)]
+            fields.append(FieldSchema(
+                uuid.UUID(int=rng.getrandbits(128)), f'field_{order}', field_type,
+                rng.choice([None, 100, 255]), order % 2 == 0, order % 3 == 0, order == 1,
+                False, '1' if field_type == 'integer' and order % 4 == 0 else '',
+                'Synthetic field' if order % 5 == 0 else '', order, None, stamp,
+            ))
+
+        relationships = []
+        if index and rng.random() < relationship_density:
+            target = rng.randrange(index)
+            relationship_data = {
+                'references': {'model': model_names[target], 'field': 'id'},
+                'relationshipType': rng.choice(RELATIONSHIP_TYPES),
+                'onDelete': 'CASCADE',
+                'null': True,
+            }
+            fields.append(FieldSchema(
+                uuid.UUID(int=rng.getrandbits(128)), f'{model_names[target].lower()}_id',
+                'integer', None, True, False, False, False, '', '', fields_per_model,
+                relationship_data, stamp,
+            ))
+            relationships.append(RelationshipSchema(
+                uuid.UUID(int=rng.getrandbits(128)), model_names[target].lower(),
+                'foreign_key', None, 'cascade', '', True, False, stamp,
+            ))
+
+        model_schemas.append(ModelSchema(
+            uuid.UUID(int=rng.getrandbits(128)), model_name, '', 'field_0' if index % 2 else '',
+            index, stamp, tuple(fields), tuple(relationships),
+        ))
+
+    return ProjectSchema(
+        uuid.UUID(int=rng.getrandbits(128)), 'Synthetic', 'django', True, True,
+        False, False, True, tuple(model_schemas), (), (),
+    )
+
+
+def measure_render_throughput(generator_class, schema, repeat=5):
+    """Render every project file repeat times; return best wall time and output size"""
+    best = None
+    output_bytes = 0
+    for _ in range(repeat):
+        gc.collect()
+        generator = generator_class(schema, fragments=NoFragmentCache())
+        started = time.perf_counter()
+        files = generator.generate_project()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+        output_bytes = sum(len(content) for content in files.values())
+    return {
+        'seconds': best,
+        'output_bytes': output_bytes,
+        'mb_per_second': output_bytes / best / (1024 * 1024) if best else 0.0,
+    }
+
+
+class ConcatEmitter:
+    """Emitter that grows a single string, as the generators did before Emitter"""
+
+    def __init__(self):
+        self._value = ''
+
+    def write(self, chunk):
+        self._value += chunk
+
+    def extend(self, chunks):
+        for chunk in chunks:
+            self._value += chunk
+
+    def emit(self, template, **context):
+        self._value += template.render(**context)
+
+    def getvalue(self):
+        return self._value
+
+
+@contextmanager
+def interpreted_templates():
+    """Render the generators' templates with str.format and ConcatEmitter while active"""
+    templates = [value for value in vars(code_generators).values() if isinstance(value, Template)]
+    compiled = [template.render for template in templates]
+    emitter_class = code_generators.Emitter
+    for template in templates:
+        template.render = template.source.format
+    code_generators.Emitter = ConcatEmitter
+    try:
+        yield
+    finally:
+        code_generators.Emitter = emitter_class
+        for template, render in zip(templates, compiled):
+            template.render = render
+
+
+def measure_render_paths(generator_class, schema, repeat=5):
+    """measure_render_throughput with interpreted and compiled templates; outputs must match"""
+    with interpreted_templates():
+        interpreted = measure_render_throughput(generator_class, schema, repeat)
+        expected = generator_class(schema, fragments=NoFragmentCache()).generate_project()
+    compiled = measure_render_throughput(generator_class, schema, repeat)
+    if generator_class(schema, fragments=NoFragmentCache()).generate_project() != expected:
+        raise AssertionError('Compiled templates rendered different output')
+    return {'interpreted': interpreted, 'compiled': compiled}
+
+
+def create_synthetic_project(owner, models=100, fields_per_model=10, relationship_density=0.3,
+                             views_per_model=1, routes_per_view=1, seed=0):
+    """Insert a synthetic project with bulk_create and return it"""
+    rng = random.Random(seed)
+    project = Project.objects.create(
+        owner=owner, name=f'Benchmark {models}x{fields_per_model} #{seed}', include_docker=True,
+    )
+
+    database_models = DatabaseModel.objects.bulk_create([
+        DatabaseModel(project=project, name=f'Model{index}', order=index, rank=rank,
+                      display_field='field_0' if index % 2 else '')
+        for index, rank in enumerate(evenly_spaced_ranks(models))
+    ])
+    field_ranks = evenly_spaced_ranks(fields_per_model + 1)
+
+    fields = []
+    relationships = []
+    for index, model in enumerate(database_models):
+        for order in range(fields_per_model):
+            field_type = FIELD_TYPES[(index + order) % len(FIELD_TYPES)]
+            fields.append(ModelField(
+                database_model=model, name=f'field_{order}', field_type=field_type,
+                max_length=rng.choice([None, 100, 255]), null=order % 2 == 0,
+                blank=order % 3 == 0, unique=order == 1, order=order, rank=field_ranks[order],
+                default_value='1' if field_type == 'integer' and order % 4 == 0 else '',
+                help_text='Synthetic field' if order % 5 == 0 else '',
+            ))
+        if index and rng.random() < relationship_density:
+            target = database_models[rng.randrange(index)]
+            fields.append(ModelField(
+                database_model=model, name=f'{target.name.lower()}_id', field_type='integer',
+                null=True, order=fields_per_model, rank=field_ranks[fields_per_model],
+                relationship_data={
+                    'references': {'model': target.name, 'field': 'id'},
+                    'relationshipType': rng.choice(RELATIONSHIP_TYPES),
+                    'onDelete': 'CASCADE',
+                    'null': True,
+                },
+            ))
+            relationships.append(Relationship(
+                from_model=model, to_model=target, relationship_type='foreign_key',
+                name=target.name.lower(),
+            ))
+    fields = ModelField.objects.bulk_create(fields)
+    Relationship.objects.bulk_create(relationships)
+
+    first_field_by_model = {}
+    for field in fields:
+        first_field_by_model.setdefault(field.database_model_id, field)
+
+    view_types = [view_type for view_type, _ in View.VIEW_TYPES]
+    views = View.objects.bulk_create([
+        View(project=project, model=model, name=f'{model.name}{view_types[number % len(view_types)]}{number}',
+             view_type=view_types[number % len(view_types)])
+        for model in database_models
+        for number in range(views_per_model)
+    ])
+    ViewField.objects.bulk_create([
+        ViewField(view=view, model_field=first_field_by_model[view.model_id], rank=evenly_spaced_ranks(1)[0])
+        for view in views
+        if view.model_id in first_field_by_model
+    ])
+
+    methods = [method for method, _ in URLRoute.HTTP_METHOD_CHOICES]
+    URLRoute.objects.bulk_create([
+        URLRoute(project=project, path=f'/api/{view.name.lower()}/{number}/', name=view.name,
+                 http_method=methods[number % len(methods)], associated_view=view.name)
+        for view in views
+        for number in range(routes_per_view)
+    ])
+    # bulk_create skips the signals that maintain the counters
+    Project.objects.filter(pk=project.pk).recount()
+    return project
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def _measure(operation, iterations):
+    """Time operation; report latency percentiles (ms), queries per call and peak memory"""
+    timings = []
+    queries = 0
+    result = None
+    for _ in range(iterations):
+        gc.collect()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            result = operation()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries = len(captured)
+
+    # Memory is traced in a separate run; tracing slows the timed runs down
+    gc.collect()
+    tracemalloc.start()
+    try:
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return result, {
+        'p50_ms': percentile(timings, 0.50),
+        'p95_ms': percentile(timings, 0.95),
+        'p99_ms': percentile(timings, 0.99),
+        'max_ms': timings[-1],
+        'queries': queries,
+        'peak_memory_kib': peak / 1024,
+    }
+
+
+def benchmark_project(generator_class, project, iterations=5):
+    """Benchmark generate_project, generate_preview and create_zip_file on one project"""
+    def generate_project():
+        return generator_class(project, fragments=NoFragmentCache()).generate_project()
+
+    def generate_preview():
+        return generator_class(project, fragments=NoFragmentCache()).generate_preview()
+
+    project_structure, project_stats = _measure(generate_project, iterations)
+    _, preview_stats = _measure(generate_preview, iterations)
+
+    zip_generator = generator_class(project, fragments=NoFragmentCache())
+    zip_buffer, zip_stats = _measure(lambda: zip_generator.create_zip_file(project_structure), iterations)
+    zip_stats['zip_bytes'] = len(zip_buffer.getvalue())
+
+    return {
+        'generate_project': project_stats,
+        'generate_preview': preview_stats,
+        'create_zip_file': zip_stats,
+    }
+
+
+@contextmanager
+def temporary_database(verbosity=0):
+    """Point the default connection at a new test database, destroyed on exit"""
+    old_config = setup_databases(verbosity, interactive=False, aliases={DEFAULT_DB_ALIAS})
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity)
+
+
+def run_suite(generator_class, scenarios, iterations=5, verbosity=0):
+    """
+    Build each scenario in a temporary test database and benchmark it.
+
+    scenarios is a list of create_synthetic_project keyword dicts; results are
+    keyed by a stable scenario label so runs can be compared with a baseline.
+    """
+    results = {}
+    with temporary_database(verbosity):
+        owner = get_user_model().objects.create(
+            username=f'benchmark-{uuid.uuid4().hex[:8]}',
+            email=f'benchmark-{uuid.uuid4().hex[:8]}@example.com',
+        )
+        for scenario in scenarios:
+            project = create_synthetic_project(owner, **scenario)
+            results[scenario_label(scenario)] = benchmark_project(generator_class, project, iterations)
+    return results
+
+
+def scenario_label(scenario):
+    return (
+        f"models={scenario.get('models', 100)},fields={scenario.get('fields_per_model', 10)},"
+        f"relationships={scenario.get('relationship_density', 0.3)},"
+        f"views={scenario.get('views_per_model', 1)},routes={scenario.get('routes_per_view', 1)}"
+    )
+
+
+# Metrics compared against a baseline; lower is better for all of them
+REGRESSION_METRICS = ('p50_ms', 'p95_ms', 'queries', 'peak_memory_kib', 'zip_bytes')
+
+# Timing differences below this are treated as noise
+TIMING_NOISE_MS = 2.0
+
+
+def find_regressions(results, baseline, tolerance=0.25):
+    """List metrics that are more than tolerance worse than the baseline"""
+    regressions = []
+    for label, operations in results.items():
+        for operation, stats in operations.items():
+            expected = baseline.get(label, {}).get(operation, {})
+            for metric in REGRESSION_METRICS:
+                if metric not in stats or metric not in expected:
+                    continue
+                # Query counts must not grow at all; the rest get some slack for noise
+                if metric == 'queries':
+                    allowed = expected[metric]
+                elif metric.endswith('_ms'):
+                    allowed = max(expected[metric] * (1 + tolerance), expected[metric] + TIMING_NOISE_MS)
+                else:
+                    allowed = expected[metric] * (1 + tolerance)
+                if stats[metric] > allowed:
+                    regressions.append(
+                        f'{label} {operation} {metric}: {stats[metric]:.1f} > baseline {expected[metric]:.1f}'
+                    )
+    return regressions
@@ -1,94 +1,152 @@
 import os
 import zipfile
 import io
-from datetime import datetime
+import time
 
-class BaseCodeGenerator:
-    def __init__(self, project):
-        self.project = project
-        self.models = project.database_models.prefetch_related('fields', 'outgoing_relationships').all()
-    
-    def generate_models_code(self):
-        """Generate models code for the framework"""
-        raise NotImplementedError
-    
-    def generate_serializers_code(self):
-        """Generate serializers code"""
-        raise NotImplementedError
-    
-    def generate_views_code(self):
-        """Generate views code"""
-        raise NotImplementedError
-    
-    def generate_urls_code(self):
-        """Generate URLs code"""
-        raise NotImplementedError
-    
-    def generate_settings_code(self):
-        """Generate settings code"""
-        raise NotImplementedError
-    
-    def generate_requirements(self):
-        """Generate requirements file"""
-        raise NotImplementedError
-    
-    def generate_project(self):
-        """Generate complete project structure"""
-        return {
-            'models.py': self.generate_models_code(),
-            'serializers.py': self.generate_serializers_code(),
-            'views.py': self.generate_views_code(),
-            'urls.py': self.generate_urls_code(),
-            'settings.py': self.generate_settings_code(),
-            'requirements.txt': self.generate_requirements(),
-        }
-    
-    def generate_preview(self):
-        """Generate preview of code without full project structure"""
-        return {
-            'models': self.generate_models_code(),
-            'serializers': self.generate_serializers_code(),
-            'views': self.generate_views_code(),
-        }
-    
-    def create_zip_file(self, project_structure):
-        """Create ZIP file from project structure"""
-        zip_buffer = io.BytesIO()
-        
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            for file_path, content in project_structure.items():
-                zip_file.writestr(file_path, content)
-            
-            # Add basic project files
-            zip_file.writestr('README.md', self.generate_readme())
-            zip_file.writestr('.env.example', self.generate_env_example())
-            
-            # Add boilerplate files based on project options
-            if self.project.include_docker:
-                zip_file.writestr('Dockerfile', self.generate_dockerfile())
-            
-        zip_buffer.seek(0)
-        return zip_buffer
-    
-    def generate_readme(self):
-        """Generate README file"""
-        return f"""# {self.project.name}
+from .emitter import Emitter, Template
+from .fragments import fragment_cache
+from .parallel import build_zip
+from .schema import ProjectSchema, load_project_schema
+
+# Bump whenever generated output changes so cached artifacts are invalidated
+GENERATOR_VERSION = '2'
+
+# Uncompressed bytes fed to the compressor between yields when streaming
+ZIP_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Precompiled templates for the generated files (literal braces are doubled)
+MODELS_HEADER = """from django.db import models
+from django.contrib.auth.models import User
+
+"""
+
+MODEL_CLASS = Template("class {name}(models.Model):\n")
+
+FIELD_LINE = Template("    {definition}\n")
+
+FIELD_DEFINITION = Template("{name} = {field_class}({args})")
+
+MODEL_META = Template("""
+    class Meta:
+        ordering = ['-id']
+        verbose_name = '{name}'
+        verbose_name_plural = '{name}s'
+
+    def __str__(self):
+        return str(self.{display_field})
+
+""")
+
+DJANGO_FIELD_TYPES = {
+    'char': 'models.CharField',
+    'text': 'models.TextField',
+    'integer': 'models.IntegerField',
+    'boolean': 'models.BooleanField',
+    'date': 'models.DateField',
+    'datetime': 'models.DateTimeField',
+    'email': 'models.EmailField',
+    'url': 'models.URLField',
+    'image': 'models.ImageField',
+    'file': 'models.FileField',
+    'decimal': 'models.DecimalField',
+    'float': 'models.FloatField',
+    'json': 'models.JSONField',
+}
+
+# Frontend relationship notation -> Django relationship type
+RELATIONSHIP_TYPE_MAP = {
+    '1:1': 'one_to_one',
+    '1:M': 'foreign_key',
+    'M:M': 'many_to_many',
+}
+
+SERIALIZERS_HEADER = """from rest_framework import serializers
+from .models import *
+
+"""
+
+SERIALIZER_CLASS = Template("""class {name}Serializer(serializers.ModelSerializer):
+    class Meta:
+        model = {name}
+        fields = '__all__'
+
+""")
+
+VIEWS_HEADER = """from rest_framework import viewsets, permissions
+from .models import *
+from .serializers import *
+
+"""
 
-Generated by Rapid Scaffolder on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+VIEWSET_CLASS = Template("""class {name}ViewSet(viewsets.ModelViewSet):
+    queryset = {name}.objects.all()
+    serializer_class = {name}Serializer
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+
+""")
+
+URLS_HEADER = """from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from . import views
+
+router = DefaultRouter()
+
+"""
+
+ROUTER_REGISTRATION = Template("router.register(r'{prefix}', views.{name}ViewSet)\n")
+
+URLS_FOOTER = """
+urlpatterns = [
+    path('', include(router.urls)),
+]
+"""
+
+DJANGO_SETTINGS_SNIPPET = """# This is a settings snippet for your generated project
+# Add these to your existing Django settings
+
+INSTALLED_APPS += [
+    'rest_framework',
+    'corsheaders',
+]
+
+REST_FRAMEWORK = {
+    'DEFAULT_PERMISSION_CLASSES': [
+        'rest_framework.permissions.IsAuthenticatedOrReadOnly',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'PAGE_SIZE': 20
+}
+
+# CORS settings (if needed)
+CORS_ALLOWED_ORIGINS = [
+    "http://localhost:3000",
+    "http://127.0.0.1:3000",
+]
+"""
+
+DJANGO_REQUIREMENTS = """Django>=5.0,<6.0
+djangorestframework>=3.14,<4.0
+django-cors-headers>=4.0,<5.0
+Pillow>=10.0,<11.0
+"""
+
+README_TEMPLATE = Template("""# {name}
+
+Generated by Rapid Scaffolder
 
 ## Setup Instructions
 
 1. Install dependencies:
-{'pip install -r requirements.txt' if self.project.framework == 'django' else 'npm install'}
+{install}
 
 2. Set up environment variables:
 cp .env.example .env
 
 3. Run migrations:
-{'python manage.py migrate' if self.project.framework == 'django' else 'npx sequelize-cli db:migrate'}
+{migrate}
 
 4. Start development server:
-{'python manage.py runserver' if self.project.framework == 'django' else 'npm run dev'}
+{run}
 
 ## Project Structure
 
@@ -97,27 +155,34 @@ This project was automatically generated and includes:
 - REST API endpoints
 - Serializers/Validators
 - Basic authentication setup
-"""
+""")
+
+SETUP_COMMANDS = {
+    'django': {
+        'install': 'pip install -r requirements.txt',
+        'migrate': 'python manage.py migrate',
+        'run': 'python manage.py runserver',
+    },
+    'express': {
+        'install': 'npm install',
+        'migrate': 'npx sequelize-cli db:migrate',
+        'run': 'npm run dev',
+    },
+}
 
-    def generate_env_example(self):
-        """Generate environment example file"""
-        if self.project.framework == 'django':
-            return """DEBUG=True
+DJANGO_ENV_EXAMPLE = """DEBUG=True
 SECRET_KEY=your-secret-key-here
 DATABASE_URL=sqlite:///db.sqlite3
 ALLOWED_HOSTS=localhost,127.0.0.1
 """
-        else:
-            return """NODE_ENV=development
+
+EXPRESS_ENV_EXAMPLE = """NODE_ENV=development
 PORT=3000
 DATABASE_URL=sqlite://db.sqlite3
 JWT_SECRET=your-jwt-secret-here
 """
 
-    def generate_dockerfile(self):
-        """Generate Dockerfile"""
-        if self.project.framework == 'django':
-            return """FROM python:3.11-slim
+DJANGO_DOCKERFILE = """FROM python:3.11-slim
 
 WORKDIR /app
 
@@ -130,8 +195,8 @@ EXPOSE 8000
 
 CMD ["python", "manage.py", "runserver", "0.0.0.0:8000"]
 """
-        else:
-            return """FROM node:18-alpine
+
+EXPRESS_DOCKERFILE = """FROM node:18-alpine
 
 WORKDIR /app
 
@@ -146,72 +211,246 @@ CMD ["npm", "run", "dev"]
 """
 
 
-class DjangoCodeGenerator(BaseCodeGenerator):
-    def generate_models_code(self):
-        """Generate Django models.py content with proper relationships"""
-        models_code = """from django.db import models
-from django.contrib.auth.models import User
+class _ZipStreamWriter:
+    """Unseekable sink for zipfile; compressed bytes are drained as they arrive"""
+    
+    def __init__(self):
+        self._chunks = []
+        self.pending = 0
+    
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self.pending += len(data)
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        self.pending = 0
+        return data
 
-"""
-        
-        for model in self.models:
-            models_code += f"class {model.name}(models.Model):\n"
+
+def iter_zip_stream(entries, chunk_size=ZIP_STREAM_CHUNK_SIZE):
+    """Yield a ZIP archive of (path, content) entries as it is compressed"""
+    stream = _ZipStreamWriter()
+    
+    with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for file_path, content in entries:
+            zip_info = zipfile.ZipInfo(file_path, date_time=time.localtime(time.time())[:6])
+            zip_info.compress_type = zipfile.ZIP_DEFLATED
+            zip_info.external_attr = 0o600 << 16
             
-            # First, add all regular fields (non-relationship fields)
-            for field in model.fields.all():
-                # Skip fields that are part of relationships (they'll be replaced with relationship fields)
-                if not getattr(field, 'relationship_data', None):
-                    field_def = self._generate_django_field(field)
-                    if field_def:
-                        models_code += f"    {field_def}\n"
+            data = content.encode('utf-8')
+            with zip_file.open(zip_info, 'w') as entry:
+                for offset in range(0, len(data), chunk_size):
+                    entry.write(data[offset:offset + chunk_size])
+                    if stream.pending >= chunk_size:
+                        yield stream.drain()
             
-            # Then, add relationship fields
-            for field in model.fields.all():
-                relationship_data = getattr(field, 'relationship_data', None)
-                if relationship_data:
-                    rel_def = self._generate_django_relationship_from_data(field, relationship_data)
-                    if rel_def:
-                        models_code += f"    {rel_def}\n"
+            if stream.pending:
+                yield stream.drain()
+    
+    # Central directory
+    yield stream.drain()
+
+
+class BaseCodeGenerator:
+    def __init__(self, project, fragments=None):
+        # Accept a Project or an already loaded ProjectSchema; rendering never touches the ORM
+        self.schema = project if isinstance(project, ProjectSchema) else load_project_schema(project)
+        self.models = self.schema.models
+        self.fragments = fragment_cache if fragments is None else fragments
+        self._model_markers = {}
+    
+    def get_model_marker(self, model):
+        """Version marker that changes whenever the model, its fields or relationships change"""
+        marker = self._model_markers.get(model.id)
+        if marker is None:
+            marker = self._model_markers[model.id] = (
+                model.updated_at,
+                tuple((field.id, field.updated_at) for field in model.fields),
+                tuple((rel.id, rel.updated_at) for rel in model.relationships),
+            )
+        return marker
+    
+    def render_model_fragment(self, kind, model, render):
+        """Return render(model), reusing the cached fragment while the model is unchanged"""
+        key = (GENERATOR_VERSION, type(self).__name__, kind, model.id, self.get_model_marker(model))
+        return self.fragments.get_or_render(key, lambda: render(model))
+    
+    def _iter_fragments(self, kind, render):
+        for model in self.models:
+            yield self.render_model_fragment(kind, model, render)
+    
+    def generate_models_code(self):
+        """Generate models code for the framework"""
+        raise NotImplementedError
+    
+    def generate_serializers_code(self):
+        """Generate serializers code"""
+        raise NotImplementedError
+    
+    def generate_views_code(self):
+        """Generate views code"""
+        raise NotImplementedError
+    
+    def generate_urls_code(self):
+        """Generate URLs code"""
+        raise NotImplementedError
+    
+    def generate_settings_code(self):
+        """Generate settings code"""
+        raise NotImplementedError
+    
+    def generate_requirements(self):
+        """Generate requirements file"""
+        raise NotImplementedError
+    
+    # Archive paths in order, mapped to the method that renders them
+    PROJECT_FILES = (
+        ('models.py', 'generate_models_code'),
+        ('serializers.py', 'generate_serializers_code'),
+        ('views.py', 'generate_views_code'),
+        ('urls.py', 'generate_urls_code'),
+        ('settings.py', 'generate_settings_code'),
+        ('requirements.txt', 'generate_requirements'),
+    )
+    
+    def iter_project_files(self):
+        """Yield (path, content) pairs, rendering each file only when reached"""
+        for file_path, method_name in self.PROJECT_FILES:
+            yield file_path, getattr(self, method_name)()
+    
+    def render_file(self, file_path):
+        """Render a single file listed in PROJECT_FILES"""
+        return getattr(self, dict(self.PROJECT_FILES)[file_path])()
+    
+    def generate_project(self, executor=None):
+        """
+        Generate complete project structure.
+        
+        With an executor the files are rendered concurrently from the shared
+        schema; results are still collected in PROJECT_FILES order.
+        """
+        if executor is None:
+            return dict(self.iter_project_files())
+        
+        futures = [
+            (file_path, executor.submit(getattr(self, method_name)))
+            for file_path, method_name in self.PROJECT_FILES
+        ]
+        return {file_path: future.result() for file_path, future in futures}
+    
+    def generate_preview(self):
+        """Generate preview of code without full project structure"""
+        return {
+            'models': self.generate_models_code(),
+            'serializers': self.generate_serializers_code(),
+            'views': self.generate_views_code(),
+        }
+    
+    def iter_archive_entries(self, project_structure):
+        """Yield every (path, content) pair that belongs in the archive"""
+        if isinstance(project_structure, dict):
+            project_structure = project_structure.items()
+        yield from project_structure
+        
+        # Add basic project files
+        yield 'README.md', self.generate_readme()
+        yield '.env.example', self.generate_env_example()
+        
+        # Add boilerplate files based on project options
+        if self.schema.include_docker:
+            yield 'Dockerfile', self.generate_dockerfile()
+    
+    def create_zip_file(self, project_structure, executor=None):
+        """Create ZIP file from project structure"""
+        if executor is not None:
+            # Deflate entries in chunks on the executor and assemble the archive
+            return build_zip(self.iter_archive_entries(project_structure), executor)
+        
+        zip_buffer = io.BytesIO()
+        
+        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            for file_path, content in self.iter_archive_entries(project_structure):
+                zip_file.writestr(file_path, content)
             
-            # Add Meta class and __str__
-            display_field = getattr(model, 'display_field', 'id') or 'id'
-            models_code += f"""
-    class Meta:
-        ordering = ['-id']
-        verbose_name = '{model.name}'
-        verbose_name_plural = '{model.name}s'
+        zip_buffer.seek(0)
+        return zip_buffer
+    
+    def iter_zip_file(self, project_structure, chunk_size=ZIP_STREAM_CHUNK_SIZE):
+        """
+        Yield the ZIP archive in chunks while entries are being compressed.
+        
+        Accepts the same input as create_zip_file, or a lazy iterable such as
+        iter_project_files(), so only one file is held in memory at a time.
+        """
+        return iter_zip_stream(self.iter_archive_entries(project_structure), chunk_size)
+    
+    def generate_readme(self):
+        """Generate README file"""
+        commands = SETUP_COMMANDS.get(self.schema.framework, SETUP_COMMANDS['express'])
+        return README_TEMPLATE.render(name=self.schema.name, **commands)
 
-    def __str__(self):
-        return str(self.{display_field})
+    def generate_env_example(self):
+        """Generate environment example file"""
+        if self.schema.framework == 'django':
+            return DJANGO_ENV_EXAMPLE
+        else:
+            return EXPRESS_ENV_EXAMPLE
 
-"""
+    def generate_dockerfile(self):
+        """Generate Dockerfile"""
+        if self.schema.framework == 'django':
+            return DJANGO_DOCKERFILE
+        else:
+            return EXPRESS_DOCKERFILE
+
+
+class DjangoCodeGenerator(BaseCodeGenerator):
+    def generate_models_code(self):
+        """Generate Django models.py content with proper relationships"""
+        out = Emitter()
+        out.write(MODELS_HEADER)
+        out.extend(self._iter_fragments('models', self._generate_model_class))
+        return out.getvalue()
+    
+    def _generate_model_class(self, model):
+        """Generate the models.py class for a single model"""
+        out = Emitter()
+        write, field_line = out.write, FIELD_LINE.render
+        write(MODEL_CLASS.render(name=model.name))
+        
+        # Regular fields first; relationship fields are replaced and emitted after them
+        relationship_fields = []
+        for field in model.fields:
+            if field.relationship_data:
+                relationship_fields.append(field)
+                continue
+            field_def = self._generate_django_field(field)
+            if field_def:
+                write(field_line(definition=field_def))
+        
+        for field in relationship_fields:
+            rel_def = self._generate_django_relationship_from_data(field, field.relationship_data)
+            if rel_def:
+                write(field_line(definition=rel_def))
         
-        return models_code
+        # Add Meta class and __str__
+        out.emit(MODEL_META, name=model.name, display_field=model.display_field or 'id')
+        return out.getvalue()
     
     def _generate_django_field(self, field):
         """Generate Django field definition for regular fields only"""
-        field_type_map = {
-            'char': 'models.CharField',
-            'text': 'models.TextField',
-            'integer': 'models.IntegerField',
-            'boolean': 'models.BooleanField',
-            'date': 'models.DateField',
-            'datetime': 'models.DateTimeField',
-            'email': 'models.EmailField',
-            'url': 'models.URLField',
-            'image': 'models.ImageField',
-            'file': 'models.FileField',
-            'decimal': 'models.DecimalField',
-            'float': 'models.FloatField',
-            'json': 'models.JSONField',
-        }
-        
         # Skip fields that have relationship data (they'll be handled separately)
-        if getattr(field, 'relationship_data', None):
+        if field.relationship_data:
             return None
             
         field_args = []
-        field_type = field_type_map.get(field.field_type, 'models.CharField')
+        field_type = DJANGO_FIELD_TYPES.get(field.field_type, 'models.CharField')
         
         # Add max_length for char fields
         if field.field_type == 'char' and field.max_length:
@@ -237,8 +476,7 @@ from django.contrib.auth.models import User
         if field.help_text:
             field_args.append(f"help_text='{field.help_text}'")
         
-        args_str = ", ".join(field_args)
-        return f"{field.name} = {field_type}({args_str})"
+        return FIELD_DEFINITION.render(name=field.name, field_class=field_type, args=", ".join(field_args))
     
     def _generate_django_relationship_from_data(self, field, relationship_data):
         """Generate Django relationship from field relationship data"""
@@ -249,9 +487,8 @@ from django.contrib.auth.models import User
         frontend_type = relationship_data.get('relationshipType', '1:M')
         django_relationship_type = self._map_relationship_type(frontend_type)
         
-        # Get the referenced model and field
+        # Get the referenced model
         referenced_model = relationship_data['references']['model']
-        referenced_field = relationship_data['references']['field']
         
         # Create a new field name for the relationship
         # Use a more descriptive name than the original field name
@@ -262,8 +499,6 @@ from django.contrib.auth.models import User
         # Generate the relationship field
         if django_relationship_type == 'one_to_one':
             return self._generate_one_to_one_field(relationship_field_name, referenced_model, relationship_data)
-        elif django_relationship_type == 'foreign_key':
-            return self._generate_foreign_key_field(relationship_field_name, referenced_model, relationship_data)
         elif django_relationship_type == 'many_to_many':
             return self._generate_many_to_many_field(relationship_field_name, referenced_model, relationship_data)
         else:
@@ -273,42 +508,28 @@ from django.contrib.auth.models import User
         """Generate a meaningful name for the relationship field"""
         model_name_lower = referenced_model.lower()
         
-        if relationship_type == 'one_to_one':
-            return f"{model_name_lower}"
-        elif relationship_type == 'foreign_key':
-            return f"{model_name_lower}"
-        elif relationship_type == 'many_to_many':
+        if relationship_type == 'many_to_many':
             return f"{model_name_lower}s"
-        else:
-            return f"{model_name_lower}"
+        return model_name_lower
     
     def _generate_one_to_one_field(self, field_name, referenced_model, relationship_data):
         """Generate a OneToOneField"""
-        args = [referenced_model]
-        on_delete = relationship_data.get('onDelete', 'CASCADE')
-        args.append(f"on_delete=models.{on_delete}")
-        
-        # Add related_name
-        related_name = f"{field_name}_set"
-        args.append(f"related_name='{related_name}'")
-        
-        # Add field options
-        if relationship_data.get('null'):
-            args.append("null=True")
-        if relationship_data.get('blank'):
-            args.append("blank=True")
-        
-        return f"{field_name} = models.OneToOneField({', '.join(args)})"
+        return self._generate_related_field('models.OneToOneField', field_name, referenced_model, relationship_data)
     
     def _generate_foreign_key_field(self, field_name, referenced_model, relationship_data):
         """Generate a ForeignKey field"""
+        return self._generate_related_field('models.ForeignKey', field_name, referenced_model, relationship_data)
+    
+    def _generate_many_to_many_field(self, field_name, referenced_model, relationship_data):
+        """Generate a ManyToManyField"""
         args = [referenced_model]
-        on_delete = relationship_data.get('onDelete', 'CASCADE')
-        args.append(f"on_delete=models.{on_delete}")
         
         # Add related_name
-        related_name = f"{field_name}_set"
-        args.append(f"related_name='{related_name}'")
+        args.append(f"related_name='{field_name}_set'")
+        
+        # Add through table if specified
+        if relationship_data.get('through'):
+            args.append(f"through='{relationship_data['through']}'")
         
         # Add field options
         if relationship_data.get('null'):
@@ -316,19 +537,16 @@ from django.contrib.auth.models import User
         if relationship_data.get('blank'):
             args.append("blank=True")
         
-        return f"{field_name} = models.ForeignKey({', '.join(args)})"
+        return FIELD_DEFINITION.render(name=field_name, field_class='models.ManyToManyField', args=', '.join(args))
     
-    def _generate_many_to_many_field(self, field_name, referenced_model, relationship_data):
-        """Generate a ManyToManyField"""
+    def _generate_related_field(self, field_class, field_name, referenced_model, relationship_data):
+        """Generate a ForeignKey or OneToOneField"""
         args = [referenced_model]
+        on_delete = relationship_data.get('onDelete', 'CASCADE')
+        args.append(f"on_delete=models.{on_delete}")
         
         # Add related_name
-        related_name = f"{field_name}_set"
-        args.append(f"related_name='{related_name}'")
-        
-        # Add through table if specified
-        if relationship_data.get('through'):
-            args.append(f"through='{relationship_data['through']}'")
+        args.append(f"related_name='{field_name}_set'")
         
         # Add field options
         if relationship_data.get('null'):
@@ -336,109 +554,52 @@ from django.contrib.auth.models import User
         if relationship_data.get('blank'):
             args.append("blank=True")
         
-        return f"{field_name} = models.ManyToManyField({', '.join(args)})"
+        return FIELD_DEFINITION.render(name=field_name, field_class=field_class, args=', '.join(args))
     
     def _map_relationship_type(self, frontend_type):
         """Map frontend relationship types to Django relationship types"""
-        if frontend_type == '1:1':
-            return 'one_to_one'
-        elif frontend_type == '1:M':
-            return 'foreign_key'
-        elif frontend_type == 'M:M':
-            return 'many_to_many'
-        else:
-            return 'foreign_key'
+        return RELATIONSHIP_TYPE_MAP.get(frontend_type, 'foreign_key')
     
-    # ... keep the rest of your methods (serializers, views, urls, etc.) the same
     def generate_serializers_code(self):
         """Generate DRF serializers"""
-        serializers_code = """from rest_framework import serializers
-from .models import *
-
-"""
-        
-        for model in self.models:
-            serializers_code += f"class {model.name}Serializer(serializers.ModelSerializer):\n"
-            serializers_code += f"    class Meta:\n"
-            serializers_code += f"        model = {model.name}\n"
-            serializers_code += f"        fields = '__all__'\n\n"
-        
-        return serializers_code
+        out = Emitter()
+        out.write(SERIALIZERS_HEADER)
+        out.extend(self._iter_fragments('serializers', self._generate_serializer_class))
+        return out.getvalue()
+    
+    def _generate_serializer_class(self, model):
+        return SERIALIZER_CLASS.render(name=model.name)
     
     def generate_views_code(self):
         """Generate DRF views"""
-        views_code = """from rest_framework import viewsets, permissions
-from .models import *
-from .serializers import *
-
-"""
-        
-        for model in self.models:
-            views_code += f"class {model.name}ViewSet(viewsets.ModelViewSet):\n"
-            views_code += f"    queryset = {model.name}.objects.all()\n"
-            views_code += f"    serializer_class = {model.name}Serializer\n"
-            views_code += f"    permission_classes = [permissions.IsAuthenticatedOrReadOnly]\n\n"
-        
-        return views_code
+        out = Emitter()
+        out.write(VIEWS_HEADER)
+        out.extend(self._iter_fragments('views', self._generate_viewset_class))
+        return out.getvalue()
+    
+    def _generate_viewset_class(self, model):
+        return VIEWSET_CLASS.render(name=model.name)
     
     def generate_urls_code(self):
         """Generate Django URLs"""
-        urls_code = """from django.urls import path, include
-from rest_framework.routers import DefaultRouter
-from . import views
-
-router = DefaultRouter()
-
-"""
-        
-        for model in self.models:
-            model_lower = model.name.lower()
-            urls_code += f"router.register(r'{model_lower}', views.{model.name}ViewSet)\n"
-        
-        urls_code += """
-urlpatterns = [
-    path('', include(router.urls)),
-]
-"""
-        return urls_code
+        out = Emitter()
+        out.write(URLS_HEADER)
+        out.extend(self._iter_fragments('urls', self._generate_router_registration))
+        out.write(URLS_FOOTER)
+        return out.getvalue()
+    
+    def _generate_router_registration(self, model):
+        return ROUTER_REGISTRATION.render(name=model.name, prefix=model.name.lower())
     
     def generate_settings_code(self):
         """Generate Django settings snippet"""
-        return """# This is a settings snippet for your generated project
-# Add these to your existing Django settings
-
-INSTALLED_APPS += [
-    'rest_framework',
-    'corsheaders',
-]
-
-REST_FRAMEWORK = {
-    'DEFAULT_PERMISSION_CLASSES': [
-        'rest_framework.permissions.IsAuthenticatedOrReadOnly',
-    ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 20
-}
-
-# CORS settings (if needed)
-CORS_ALLOWED_ORIGINS = [
-    "http://localhost:3000",
-    "http://127.0.0.1:3000",
-]
-"""
+        return DJANGO_SETTINGS_SNIPPET
     
     def generate_requirements(self):
         """Generate requirements.txt"""
-        requirements = """Django>=5.0,<6.0
-djangorestframework>=3.14,<4.0
-django-cors-headers>=4.0,<5.0
-Pillow>=10.0,<11.0
-"""
-        
-        if self.project.include_docker:
-            requirements += "gunicorn>=20.0,<21.0\n"
-        
-        return requirements
+        if self.schema.include_docker:
+            return DJANGO_REQUIREMENTS + "gunicorn>=20.0,<21.0\n"
+        return DJANGO_REQUIREMENTS
 
 
 class ExpressCodeGenerator(BaseCodeGenerator):
@@ -480,4 +641,11 @@ class ExpressCodeGenerator(BaseCodeGenerator):
     "sqlite3": "^5.0.0",
     "cors": "^2.8.0"
   }
-}""" % self.project.name
\ No newline at end of file
+}""" % self.schema.name
+
+
+def get_code_generator(project):
+    """Return the generator matching the framework of a Project or ProjectSchema"""
+    if project.framework == 'django':
+        return DjangoCodeGenerator(project)
+    return ExpressCodeGenerator(project)
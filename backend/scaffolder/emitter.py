@@ -0,0 +1,51 @@
+"""
+Minimal compiled-template layer used by the code generators.
+
+A Template's source uses str.format placeholder syntax ({name}, literal
+braces doubled) and is compiled once, at import time, into a function that
+evaluates it as an f-string, so rendering costs no parsing. An Emitter
+collects rendered chunks in a list and joins them a single time, so
+building a file is linear in its size.
+"""
+from string import Formatter
+
+
+class Template:
+    """A code template compiled to a keyword-only render function"""
+    __slots__ = ('source', 'params', 'render')
+
+    def __init__(self, source):
+        self.source = source
+        params = []
+        for _, field_name, format_spec, conversion in Formatter().parse(source):
+            if field_name is None:
+                continue
+            if not field_name.isidentifier() or format_spec or conversion:
+                raise ValueError(f'Unsupported template placeholder: {{{field_name}}}')
+            if field_name not in params:
+                params.append(field_name)
+        self.params = tuple(params)
+
+        signature = f"*, {', '.join(self.params)}" if self.params else ''
+        namespace = {}
+        exec(f'def render({signature}):\n    return f{source!r}\n', namespace)
+        self.render = namespace['render']
+
+    def __repr__(self):
+        return f'Template({self.source[:40]!r})'
+
+
+class Emitter:
+    """Write-only output buffer for generated source files"""
+    __slots__ = ('_parts', 'write', 'extend')
+
+    def __init__(self):
+        self._parts = []
+        self.write = self._parts.append
+        self.extend = self._parts.extend
+
+    def emit(self, template, **context):
+        self._parts.append(template.render(**context))
+
+    def getvalue(self):
+        return ''.join(self._parts)
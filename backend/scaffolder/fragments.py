@@ -0,0 +1,50 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class FragmentCache:
+    """
+    Process-local LRU of rendered per-model code fragments.
+
+    Keys carry the model's version markers, so an edited model simply misses
+    and its stale fragment ages out instead of being invalidated explicitly.
+    """
+
+    def __init__(self, max_entries=None):
+        config = getattr(settings, 'SCAFFOLDER_GENERATION_CACHE', {})
+        self.max_entries = max_entries or config.get('FRAGMENT_ENTRIES', 8192)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is not None:
+                self._entries.move_to_end(key)
+            return fragment
+
+    def set(self, key, fragment):
+        with self._lock:
+            self._entries[key] = fragment
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_render(self, key, render):
+        fragment = self.get(key)
+        if fragment is None:
+            fragment = render()
+            self.set(key, fragment)
+        return fragment
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+fragment_cache = FragmentCache()
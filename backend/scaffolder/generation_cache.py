@@ -0,0 +1,86 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.http import quote_etag
+
+from .code_generators import GENERATOR_VERSION
+
+
+def schema_fingerprint(schema):
+    """Return a content hash of a ProjectSchema together with the generator version"""
+    payload = json.dumps([GENERATOR_VERSION, schema], default=str, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def preview_etag(fingerprint, file_path=None):
+    """Strong ETag for a preview response; file_path scopes it to one file"""
+    if file_path:
+        fingerprint = hashlib.sha256(f'{fingerprint}:{file_path}'.encode()).hexdigest()
+    return quote_etag(fingerprint)
+
+
+def _sizeof(value):
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_sizeof(k) + _sizeof(v) for k, v in value.items())
+    return 0
+
+
+class GenerationCache:
+    """
+    Generator output keyed by schema fingerprint.
+
+    Values live in a Django cache backend and are never invalidated
+    explicitly: a schema change changes the fingerprint, and stale entries
+    expire after TIMEOUT or are evicted by the backend (size the alias with
+    its own OPTIONS, e.g. MAX_ENTRIES). Artifacts over MAX_ITEM_BYTES are
+    not cached at all.
+    """
+    KEY_PREFIX = 'scaffolder:generation'
+
+    def __init__(self, alias=None, max_item_bytes=None, timeout=None):
+        config = getattr(settings, 'SCAFFOLDER_GENERATION_CACHE', {})
+        self.alias = alias or config.get('ALIAS', 'default')
+        self.max_item_bytes = max_item_bytes or config.get('MAX_ITEM_BYTES', 8 * 1024 * 1024)
+        self.timeout = timeout or config.get('TIMEOUT', 60 * 60)
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def make_key(self, fingerprint, kind):
+        return f'{self.KEY_PREFIX}:{kind}:{fingerprint}'
+
+    def get(self, fingerprint, kind):
+        return self.cache.get(self.make_key(fingerprint, kind))
+
+    def set(self, fingerprint, kind, value):
+        if _sizeof(value) <= self.max_item_bytes:
+            self.cache.set(self.make_key(fingerprint, kind), value, self.timeout)
+
+    def get_or_generate(self, fingerprint, kind, generate):
+        value = self.get(fingerprint, kind)
+        if value is None:
+            value = generate()
+            self.set(fingerprint, kind, value)
+        return value
+
+    def iter_and_set(self, fingerprint, kind, chunks):
+        """Yield byte chunks, caching them joined once the last one has been yielded"""
+        parts, size = [], 0
+        for chunk in chunks:
+            yield chunk
+            if parts is not None:
+                size += len(chunk)
+                parts.append(chunk)
+                if size > self.max_item_bytes:
+                    parts = None
+        # Not reached when the client disconnects and the iterator is closed early
+        if parts is not None:
+            self.cache.set(self.make_key(fingerprint, kind), b''.join(parts), self.timeout)
+
+
+generation_cache = GenerationCache()
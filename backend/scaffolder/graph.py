@@ -0,0 +1,113 @@
+"""
+One-request read of a project's whole schema graph for the editor.
+
+The graph is flat and normalized: each type is a list of plain rows that
+reference each other by id (a field's `database_model`, a relationship's
+`from_model`/`to_model`, ...). Rows come straight from QuerySet.values(),
+one query per included type, with no serializer in between.
+
+Sparse fieldsets follow JSON:API: `?include=models,fields` limits the
+types and `?fields[models]=name,rank` limits a type's columns (`id` is
+always returned).
+"""
+import hashlib
+from collections import namedtuple
+
+from .models import Project, DatabaseModel, ModelField, Relationship, View, ViewField, URLRoute
+
+
+class GraphType(namedtuple('GraphType', ['model', 'project_lookup', 'fields', 'ordering'])):
+    __slots__ = ()
+
+
+GRAPH_TYPES = {
+    'project': GraphType(Project, 'pk', (
+        'id', 'name', 'description', 'framework', 'include_docker', 'include_cors',
+        'include_rate_limiting', 'include_logging', 'include_env_example', 'schema_revision',
+        'model_count', 'field_count', 'relationship_count', 'view_count', 'route_count',
+        'created_at', 'updated_at',
+    ), ()),
+    'models': GraphType(DatabaseModel, 'project_id', (
+        'id', 'name', 'description', 'display_field', 'order', 'rank', 'updated_at',
+    ), ('rank', 'name')),
+    'fields': GraphType(ModelField, 'database_model__project_id', (
+        'id', 'database_model', 'name', 'field_type', 'max_length', 'null', 'blank', 'unique',
+        'primary_key', 'default_value', 'help_text', 'order', 'rank', 'relationship_data', 'updated_at',
+    ), ('database_model', 'rank', 'name')),
+    'relationships': GraphType(Relationship, 'from_model__project_id', (
+        'id', 'from_model', 'to_model', 'relationship_type', 'name', 'on_delete', 'related_name',
+        'null', 'blank', 'updated_at',
+    ), ('from_model', 'name')),
+    'views': GraphType(View, 'project_id', (
+        'id', 'name', 'model', 'view_type', 'description', 'permissions', 'pagination_enabled',
+        'page_size', 'ordering_fields', 'search_fields', 'filter_fields', 'created_at', 'updated_at',
+    ), ('name',)),
+    'view_fields': GraphType(ViewField, 'view__project_id', (
+        'id', 'view', 'model_field', 'order', 'rank',
+    ), ('view', 'rank', 'pk')),
+    'routes': GraphType(URLRoute, 'project_id', (
+        'id', 'path', 'name', 'description', 'http_method', 'permission_level', 'associated_view',
+        'namespace', 'custom_regex', 'is_selected', 'created_at', 'updated_at',
+    ), ('path', 'http_method')),
+}
+
+
+class GraphQueryError(ValueError):
+    """Raised for an unknown type or field in the sparse fieldset parameters"""
+
+
+def _split(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def parse_graph_selection(query_params):
+    """Return {type: columns} requested by ?include= and ?fields[<type>]="""
+    include = query_params.get('include')
+    types = _split(include) if include else list(GRAPH_TYPES)
+    unknown = [name for name in types if name not in GRAPH_TYPES]
+    if unknown:
+        raise GraphQueryError(f'Unknown types: {", ".join(unknown)}.')
+
+    selection = {}
+    for name in GRAPH_TYPES:
+        if name not in types:
+            continue
+        columns = GRAPH_TYPES[name].fields
+        requested = query_params.get(f'fields[{name}]')
+        if requested is not None:
+            requested = _split(requested)
+            unknown = [column for column in requested if column not in columns]
+            if unknown:
+                raise GraphQueryError(f'Unknown fields for {name}: {", ".join(unknown)}.')
+            columns = ('id',) + tuple(column for column in requested if column != 'id')
+        selection[name] = columns
+    return selection
+
+
+def graph_cache_kind(selection):
+    """response_cache kind for a selection; hashed, as a full one would exceed memcached's key length"""
+    return 'graph:' + hashlib.sha1(repr(selection).encode()).hexdigest()
+
+
+def _graph_queries(project_id, selection):
+    for name, columns in selection.items():
+        graph_type = GRAPH_TYPES[name]
+        yield name, graph_type.model.objects.filter(**{graph_type.project_lookup: project_id}).order_by(
+            *graph_type.ordering
+        ).values(*columns)
+
+
+def load_project_graph(project_id, selection):
+    """Read the selected types of project_id's graph, one query per type"""
+    graph = {}
+    for name, rows in _graph_queries(project_id, selection):
+        graph[name] = rows.first() if name == 'project' else list(rows)
+    return graph
+
+
+async def load_project_graph_async(project_id, selection):
+    """load_project_graph through the async ORM"""
+    graph = {}
+    for name, rows in _graph_queries(project_id, selection):
+        graph[name] = await rows.afirst() if name == 'project' else [row async for row in rows]
+    return graph
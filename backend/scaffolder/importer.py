@@ -0,0 +1,231 @@
+"""
+Whole-schema import for a project.
+
+A single JSON document describes models (with their fields and
+relationships), views and URL routes. Cross-references use names, not ids:
+relationships point at `to_model` by model name and views list their model
+and included fields by name. The document is validated as a whole, resolved
+in memory and written with one batched INSERT per table inside a single
+transaction.
+"""
+from collections import Counter
+
+from django.db import transaction
+from rest_framework import serializers
+
+from .models import Project, DatabaseModel, ModelField, Relationship, View, ViewField, URLRoute
+from .ranking import evenly_spaced_ranks
+from .limits import check_model_limit
+from .signals import schema_batch
+
+
+def _duplicates(names):
+    return sorted(name for name, count in Counter(names).items() if count > 1)
+
+
+def _rank_in_order(rows):
+    """Give rows of one parent evenly spaced ranks following their (order, name) sequence"""
+    ordered = sorted(rows, key=lambda row: (row.order, row.name))
+    for row, rank in zip(ordered, evenly_spaced_ranks(len(ordered))):
+        row.rank = rank
+
+
+class ImportFieldSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ModelField
+        fields = ['name', 'field_type', 'max_length', 'null', 'blank', 'unique',
+                  'primary_key', 'default_value', 'help_text', 'order', 'relationship_data']
+
+
+class ImportRelationshipSerializer(serializers.ModelSerializer):
+    to_model = serializers.CharField(help_text='Name of the target model')
+
+    class Meta:
+        model = Relationship
+        fields = ['name', 'to_model', 'relationship_type', 'on_delete', 'related_name', 'null', 'blank']
+
+
+class ImportModelSerializer(serializers.ModelSerializer):
+    fields = ImportFieldSerializer(many=True, required=False, default=list)
+    relationships = ImportRelationshipSerializer(many=True, required=False, default=list)
+
+    class Meta:
+        model = DatabaseModel
+        fields = ['name', 'description', 'display_field', 'order', 'fields', 'relationships']
+
+
+class ImportViewSerializer(serializers.ModelSerializer):
+    model = serializers.CharField(help_text='Name of the model the view serves')
+    fields = serializers.ListField(
+        child=serializers.CharField(), required=False, default=list,
+        help_text='Names of the included model fields, in order'
+    )
+
+    class Meta:
+        model = View
+        fields = ['name', 'model', 'view_type', 'description', 'permissions',
+                  'pagination_enabled', 'page_size', 'ordering_fields', 'search_fields',
+                  'filter_fields', 'fields']
+
+
+class ImportRouteSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = URLRoute
+        fields = ['path', 'name', 'description', 'http_method', 'permission_level',
+                  'associated_view', 'namespace', 'custom_regex', 'is_selected']
+
+
+class ProjectImportSerializer(serializers.Serializer):
+    """
+    Validate an import document for the project in context['project'].
+
+    The project must have no models, views or routes unless `replace` is
+    set, in which case its current schema is deleted first.
+    """
+    replace = serializers.BooleanField(required=False, default=False)
+    models = ImportModelSerializer(many=True, required=False, default=list)
+    views = ImportViewSerializer(many=True, required=False, default=list)
+    routes = ImportRouteSerializer(many=True, required=False, default=list)
+
+    def validate(self, attrs):
+        project = self.context['project']
+        errors = {}
+
+        if not attrs['replace'] and (
+            project.database_models.exists() or project.views.exists() or project.url_routes.exists()
+        ):
+            errors['replace'] = ['The project already has a schema; set replace to overwrite it.']
+
+        model_fields = {model['name']: {field['name'] for field in model['fields']} for model in attrs['models']}
+
+        model_errors = []
+        duplicates = _duplicates(model['name'] for model in attrs['models'])
+        if duplicates:
+            model_errors.append(f'Duplicate model names: {", ".join(duplicates)}.')
+        for model in attrs['models']:
+            duplicates = _duplicates(field['name'] for field in model['fields'])
+            if duplicates:
+                model_errors.append(f'{model["name"]}: duplicate field names: {", ".join(duplicates)}.')
+            duplicates = _duplicates(relationship['name'] for relationship in model['relationships'])
+            if duplicates:
+                model_errors.append(f'{model["name"]}: duplicate relationship names: {", ".join(duplicates)}.')
+            for relationship in model['relationships']:
+                if relationship['to_model'] not in model_fields:
+                    model_errors.append(
+                        f'{model["name"]}.{relationship["name"]}: unknown model "{relationship["to_model"]}".'
+                    )
+        if model_errors:
+            errors['models'] = model_errors
+
+        view_errors = []
+        duplicates = _duplicates(view['name'] for view in attrs['views'])
+        if duplicates:
+            view_errors.append(f'Duplicate view names: {", ".join(duplicates)}.')
+        for view in attrs['views']:
+            if view['model'] not in model_fields:
+                view_errors.append(f'{view["name"]}: unknown model "{view["model"]}".')
+                continue
+            unknown = [name for name in view['fields'] if name not in model_fields[view['model']]]
+            if unknown:
+                view_errors.append(f'{view["name"]}: unknown fields on {view["model"]}: {", ".join(unknown)}.')
+            duplicates = _duplicates(view['fields'])
+            if duplicates:
+                view_errors.append(f'{view["name"]}: fields listed twice: {", ".join(duplicates)}.')
+        if view_errors:
+            errors['views'] = view_errors
+
+        default_method = URLRoute._meta.get_field('http_method').default
+        duplicates = _duplicates(
+            f'{route.get("http_method", default_method)} {route["path"]}' for route in attrs['routes']
+        )
+        if duplicates:
+            errors['routes'] = [f'Duplicate routes: {", ".join(duplicates)}.']
+
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
+
+    def create(self, validated_data):
+        return import_project_schema(self.context['project'], validated_data)
+
+
+def import_project_schema(project, document):
+    """
+    Write a validated import document into project.
+
+    Primary keys are assigned in Python, so every cross-reference is resolved
+    before the first INSERT and each table is written with one bulk_create.
+    """
+    models, fields, relationships = [], [], []
+    models_by_name, fields_by_name = {}, {}
+    for model_data in document['models']:
+        model = DatabaseModel(
+            project=project,
+            **{key: value for key, value in model_data.items() if key not in ('fields', 'relationships')}
+        )
+        models.append(model)
+        models_by_name[model.name] = model
+        model_fields = [ModelField(database_model=model, **field_data) for field_data in model_data['fields']]
+        _rank_in_order(model_fields)
+        for field in model_fields:
+            fields.append(field)
+            fields_by_name[model.name, field.name] = field
+    _rank_in_order(models)
+
+    for model_data in document['models']:
+        from_model = models_by_name[model_data['name']]
+        for relationship_data in model_data['relationships']:
+            relationships.append(Relationship(
+                from_model=from_model,
+                **dict(relationship_data, to_model=models_by_name[relationship_data['to_model']])
+            ))
+
+    views, view_fields = [], []
+    for view_data in document['views']:
+        view = View(
+            project=project,
+            **dict(
+                {key: value for key, value in view_data.items() if key != 'fields'},
+                model=models_by_name[view_data['model']]
+            )
+        )
+        views.append(view)
+        view_fields.extend(
+            ViewField(view=view, model_field=fields_by_name[view_data['model'], name], order=order, rank=rank)
+            for order, (name, rank) in enumerate(zip(view_data['fields'], evenly_spaced_ranks(len(view_data['fields']))))
+        )
+
+    routes = [URLRoute(project=project, **route_data) for route_data in document['routes']]
+
+    # The per-row delete handlers are folded into one recount and one revision bump
+    with transaction.atomic(), schema_batch():
+        project_rows = Project.objects.filter(pk=project.pk)
+        if document['replace']:
+            project.database_models.all().delete()
+            project.views.all().delete()
+            project.url_routes.all().delete()
+            # The model limit below is checked against the emptied counters
+            project_rows.recount()
+        if models:
+            check_model_limit(project, len(models))
+        DatabaseModel.objects.bulk_create(models)
+        ModelField.objects.bulk_create(fields)
+        Relationship.objects.bulk_create(relationships)
+        View.objects.bulk_create(views)
+        ViewField.objects.bulk_create(view_fields)
+        URLRoute.objects.bulk_create(routes)
+        # bulk_create sends no signals
+        project_rows.adjust_counters(
+            model_count=len(models), field_count=len(fields), relationship_count=len(relationships),
+            view_count=len(views), route_count=len(routes),
+        )
+        project_rows.bump_schema_revision()
+
+    return {
+        'models': len(models),
+        'fields': len(fields),
+        'relationships': len(relationships),
+        'views': len(views),
+        'view_fields': len(view_fields),
+        'routes': len(routes),
+    }
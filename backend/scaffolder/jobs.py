@@ -0,0 +1,165 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .models import Project, GeneratedProject
+from .code_generators import get_code_generator
+from .parallel import get_render_executor
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationQueueFull(Exception):
+    """Raised when every worker is busy and the pending queue is full"""
+
+
+def _job_settings():
+    config = getattr(settings, 'SCAFFOLDER_GENERATION_JOBS', {})
+    return {
+        'MAX_WORKERS': config.get('MAX_WORKERS', 2),
+        'MAX_PENDING': config.get('MAX_PENDING', 8),
+        'STALE_AFTER': config.get('STALE_AFTER', 15 * 60),  # Seconds before an unfinished job counts as lost
+        'RETRY_AFTER': config.get('RETRY_AFTER', 2),  # Suggested polling interval, in seconds
+    }
+
+
+class GenerationWorkerPool:
+    """
+    Bounded in-process thread pool that runs generation jobs.
+
+    At most MAX_WORKERS jobs render at once and at most MAX_PENDING more may
+    wait; further submissions are rejected instead of queueing without limit.
+    """
+
+    def __init__(self, max_workers=None, max_pending=None):
+        config = _job_settings()
+        self.max_workers = max_workers or config['MAX_WORKERS']
+        self.max_pending = config['MAX_PENDING'] if max_pending is None else max_pending
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='scaffolder-generation',
+                )
+            return self._executor
+
+    def reserve(self):
+        """Claim a queue slot or raise GenerationQueueFull"""
+        if not self._slots.acquire(blocking=False):
+            raise GenerationQueueFull()
+
+    def release(self):
+        self._slots.release()
+
+    def start(self, generation_id):
+        """Run a job in a previously reserved slot"""
+        try:
+            self.executor.submit(self._run, generation_id)
+        except Exception:
+            self.release()
+            raise
+
+    def _run(self, generation_id):
+        close_old_connections()
+        try:
+            run_generation(generation_id)
+        except Exception:
+            logger.exception('Generation %s crashed', generation_id)
+        finally:
+            self.release()
+            close_old_connections()
+
+
+worker_pool = GenerationWorkerPool()
+
+
+def create_generation(project, attempts=3):
+    """Insert a pending GeneratedProject with the next free version number"""
+    for attempt in range(attempts):
+        try:
+            with transaction.atomic():
+                latest = project.generations.aggregate(latest=Max('version'))['latest'] or 0
+                return GeneratedProject.objects.create(project=project, version=latest + 1)
+        except IntegrityError:
+            # Another request claimed the same version; retry with the next one
+            if attempt == attempts - 1:
+                raise
+
+
+def submit_generation(project, pool=None):
+    """Create a pending generation job for project and hand it to the pool"""
+    pool = pool or worker_pool
+    pool.reserve()
+    try:
+        generation = create_generation(project)
+    except Exception:
+        pool.release()
+        raise
+    transaction.on_commit(lambda: pool.start(generation.id))
+    return generation
+
+
+def run_generation(generation_id):
+    """Render a pending generation and store its archive entries"""
+    claimed = GeneratedProject.objects.filter(
+        pk=generation_id, status=GeneratedProject.STATUS_PENDING
+    ).update(status=GeneratedProject.STATUS_RUNNING, started_at=timezone.now())
+    if not claimed:
+        return
+
+    try:
+        project = Project.objects.get(generations__pk=generation_id)
+        generator = get_code_generator(project)
+        project_structure = generator.generate_project(executor=get_render_executor())
+        generated_code = dict(generator.iter_archive_entries(project_structure))
+    except Exception as e:
+        GeneratedProject.objects.filter(pk=generation_id).update(
+            status=GeneratedProject.STATUS_FAILED,
+            error=f'Generation failed: {str(e)}',
+            completed_at=timezone.now(),
+        )
+        return
+
+    # Not a schema change, so the schema revision (and what is cached on it) stays valid
+    GeneratedProject.objects.filter(pk=generation_id).update(
+        status=GeneratedProject.STATUS_COMPLETED,
+        generated_code=generated_code,
+        completed_at=timezone.now(),
+    )
+
+
+def poll_interval():
+    """Seconds a client should wait before polling an unfinished job again"""
+    return _job_settings()['RETRY_AFTER']
+
+
+def fail_stale_generations(older_than=None, now=None):
+    """
+    Mark jobs lost with their worker (e.g. on a restart) as failed.
+
+    A running job is stale once it started more than older_than seconds ago,
+    a pending one once it was submitted that long ago without starting.
+    Returns the number of jobs marked failed.
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(seconds=_job_settings()['STALE_AFTER'] if older_than is None else older_than)
+    return GeneratedProject.objects.filter(
+        Q(status=GeneratedProject.STATUS_RUNNING, started_at__lt=cutoff)
+        | Q(status=GeneratedProject.STATUS_PENDING, started_at__isnull=True, generated_at__lt=cutoff)
+    ).update(
+        status=GeneratedProject.STATUS_FAILED,
+        error='Generation was interrupted. Please submit it again.',
+        completed_at=now,
+    )
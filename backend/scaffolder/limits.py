@@ -0,0 +1,60 @@
+"""
+Plan limits from UserProfile: projects_limit and models_per_project_limit.
+
+Each check is a single conditional UPDATE against an indexed counter row
+(UserProfile.project_count, Project.model_count) that matches only if the
+new rows still fit. The UPDATE leaves the value alone but locks the row
+until the surrounding transaction ends, so concurrent creators queue up
+behind it and re-check against the committed count; the counters
+themselves are kept in step by scaffolder.signals. Callers must run the
+check and the inserts in one transaction.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from rest_framework.exceptions import PermissionDenied
+
+from users.models import UserProfile
+from .models import Project
+
+
+class PlanLimitExceeded(PermissionDenied):
+    default_detail = 'Your plan does not allow more of these.'
+    default_code = 'plan_limit_exceeded'
+
+
+def get_profile(user):
+    """The user's profile, created on first use with the default limits"""
+    try:
+        return UserProfile.objects.get(user=user)
+    except UserProfile.DoesNotExist:
+        pass
+    try:
+        # In a savepoint, so losing the race below leaves the caller's transaction usable
+        with transaction.atomic():
+            return UserProfile.objects.create(user=user, project_count=user.projects.count())
+    except IntegrityError:
+        # A concurrent first request created it
+        return UserProfile.objects.get(user=user)
+
+
+def _claim(queryset, counter, limit, count):
+    """Lock the counter row if count more rows fit under limit; False otherwise"""
+    return queryset.filter(**{f'{counter}__lte': limit - count}).update(**{counter: F(counter)}) == 1
+
+
+def check_project_limit(user, count=1):
+    profiles = UserProfile.objects.filter(user=user)
+    if not _claim(profiles, 'project_count', F('projects_limit'), count):
+        profile = get_profile(user)
+        if not _claim(profiles, 'project_count', F('projects_limit'), count):
+            raise PlanLimitExceeded(f'Your plan allows {profile.projects_limit} projects.')
+
+
+def check_model_limit(project, count=1):
+    limit = UserProfile.objects.filter(user_id=project.owner_id).values_list(
+        'models_per_project_limit', flat=True
+    ).first()
+    if limit is None:
+        limit = UserProfile._meta.get_field('models_per_project_limit').default
+    if not _claim(Project.objects.filter(pk=project.pk), 'model_count', limit, count):
+        raise PlanLimitExceeded(f'Your plan allows {limit} models per project.')
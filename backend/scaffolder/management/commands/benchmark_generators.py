@@ -0,0 +1,99 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scaffolder.benchmarks import (
+    find_regressions, measure_render_paths, measure_render_throughput, run_suite, synthetic_schema,
+)
+from scaffolder.code_generators import DjangoCodeGenerator
+
+DEFAULT_MODEL_COUNTS = [10, 100, 1000, 5000]
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the code generators on synthetic projects: latency percentiles, '
+        'SQL queries, peak memory and ZIP size, optionally checked against a JSON baseline. '
+        'Projects are written to a temporary test database, not the configured one'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--models', type=int, nargs='+', default=DEFAULT_MODEL_COUNTS)
+        parser.add_argument('--fields', type=int, default=10, help='Fields per model')
+        parser.add_argument('--relationship-density', type=float, default=0.3,
+                            help='Probability that a model references an earlier one')
+        parser.add_argument('--views', type=int, default=1, help='Views per model')
+        parser.add_argument('--routes', type=int, default=1, help='URL routes per view')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed iterations per operation')
+        parser.add_argument('--render-only', action='store_true',
+                            help='Only measure render throughput on in-memory schemas (no database)')
+        parser.add_argument('--compare-paths', action='store_true',
+                            help='With --render-only, also render with interpreted templates for comparison')
+        parser.add_argument('--save-baseline', metavar='PATH', help='Write results to a JSON baseline')
+        parser.add_argument('--baseline', metavar='PATH', help='Fail if results regress from this baseline')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Allowed relative slowdown before a metric counts as a regression')
+
+    def handle(self, *args, **options):
+        if options['render_only']:
+            return self.handle_render_only(options)
+
+        scenarios = [
+            {
+                'models': model_count,
+                'fields_per_model': options['fields'],
+                'relationship_density': options['relationship_density'],
+                'views_per_model': options['views'],
+                'routes_per_view': options['routes'],
+            }
+            for model_count in options['models']
+        ]
+        results = run_suite(
+            DjangoCodeGenerator, scenarios, iterations=options['repeat'], verbosity=options['verbosity']
+        )
+
+        for label, operations in results.items():
+            self.stdout.write(label)
+            for operation, stats in operations.items():
+                line = (
+                    f"  {operation:<18} p50 {stats['p50_ms']:9.2f} ms  p95 {stats['p95_ms']:9.2f} ms  "
+                    f"p99 {stats['p99_ms']:9.2f} ms  {stats['queries']:3d} queries  "
+                    f"peak {stats['peak_memory_kib']:10.1f} KiB"
+                )
+                if 'zip_bytes' in stats:
+                    line += f"  zip {stats['zip_bytes'] / 1024:9.1f} KiB"
+                self.stdout.write(line)
+
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as baseline_file:
+                json.dump(results, baseline_file, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['save_baseline']}"))
+
+        if options['baseline']:
+            with open(options['baseline']) as baseline_file:
+                baseline = json.load(baseline_file)
+            regressions = find_regressions(results, baseline, tolerance=options['tolerance'])
+            if regressions:
+                raise CommandError('Performance regressions:\n' + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS('No regressions against baseline'))
+
+    def handle_render_only(self, options):
+        for model_count in options['models']:
+            schema = synthetic_schema(
+                models=model_count, fields_per_model=options['fields'],
+                relationship_density=options['relationship_density'],
+            )
+            if options['compare_paths']:
+                paths = measure_render_paths(DjangoCodeGenerator, schema, repeat=options['repeat'])
+                interpreted, compiled = paths['interpreted'], paths['compiled']
+                self.stdout.write(
+                    f"{model_count:>6} models  interpreted {interpreted['seconds'] * 1000:9.2f} ms  "
+                    f"compiled {compiled['seconds'] * 1000:9.2f} ms  "
+                    f"x{interpreted['seconds'] / compiled['seconds']:5.2f}"
+                )
+                continue
+            result = measure_render_throughput(DjangoCodeGenerator, schema, repeat=options['repeat'])
+            self.stdout.write(
+                f"{model_count:>6} models  {result['seconds'] * 1000:9.2f} ms  "
+                f"{result['output_bytes'] / 1024:9.1f} KiB  {result['mb_per_second']:7.2f} MiB/s"
+            )
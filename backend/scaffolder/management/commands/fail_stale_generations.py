@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from scaffolder.jobs import fail_stale_generations
+
+
+class Command(BaseCommand):
+    help = (
+        'Mark generation jobs that have been pending or running for too long (their worker '
+        'was restarted or crashed) as failed; run on startup and/or periodically from cron'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=None,
+                            help="Seconds after which a job counts as lost (default: SCAFFOLDER_GENERATION_JOBS['STALE_AFTER'])")
+
+    def handle(self, *args, **options):
+        failed = fail_stale_generations(older_than=options['older_than'])
+        self.stdout.write(self.style.SUCCESS(f'Marked {failed} stale generation(s) as failed'))
@@ -0,0 +1,50 @@
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import Length
+from django.core.management.base import BaseCommand
+
+from scaffolder.models import Project, DatabaseModel, ModelField, ViewField
+from scaffolder.ranking import evenly_spaced_ranks
+
+# Ranked model -> lookup from a row to its project
+RANKED_MODELS = {
+    DatabaseModel: 'project_id',
+    ModelField: 'database_model__project_id',
+    ViewField: 'view__project_id',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Respace the ranks of every parent whose rows have grown long or collided, '
+        'keeping their current order; meant to run periodically'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-length', type=int, default=12,
+                            help='Rebalance parents with a rank longer than this')
+
+    def handle(self, *args, **options):
+        for model, project_path in RANKED_MODELS.items():
+            parent_id = f'{model.RANK_PARENT}_id'
+            long_ranks = model.objects.annotate(rank_length=Length('rank')).filter(
+                rank_length__gt=options['max_length']
+            ).values_list(parent_id, flat=True)
+            collisions = model.objects.values(parent_id, 'rank').annotate(
+                rows=Count('pk')
+            ).filter(rows__gt=1).values_list(parent_id, flat=True)
+            parents = set(long_ranks) | set(collisions)
+
+            for parent in parents:
+                self.rebalance(model, parent_id, parent, project_path)
+            self.stdout.write(f'{model.__name__}: rebalanced {len(parents)} parent(s)')
+
+    def rebalance(self, model, parent_id, parent, project_path):
+        with transaction.atomic():
+            rows = list(model.objects.select_for_update().filter(**{parent_id: parent}).order_by('rank', 'pk'))
+            for row, rank in zip(rows, evenly_spaced_ranks(len(rows))):
+                row.rank = rank
+            model.objects.bulk_update(rows, ['rank'])
+            # Order is unchanged but serialized ranks are not; bulk_update sends no signals
+            project_id = model.objects.filter(**{parent_id: parent}).values_list(project_path, flat=True).first()
+            Project.objects.filter(pk=project_id).bump_schema_revision()
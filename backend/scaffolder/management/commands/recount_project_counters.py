@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from scaffolder.models import Project
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare Project's denormalized model/field/relationship/view/route counters "
+        'with the child tables and repair any that drifted'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('projects', nargs='*', help='Project ids to check (default: all)')
+        parser.add_argument('--check', action='store_true',
+                            help='Only report drift and exit non-zero if there is any')
+
+    def handle(self, *args, **options):
+        projects = Project.objects.all()
+        if options['projects']:
+            projects = projects.filter(pk__in=options['projects'])
+
+        drifted = []
+        rows = projects.with_actual_counts().values('pk', 'name', *Project.COUNTER_FIELDS, *(
+            f'actual_{name}' for name in Project.COUNTER_FIELDS
+        ))
+        for row in rows.iterator():
+            differences = [
+                f"{name} {row[name]} != {row[f'actual_{name}']}"
+                for name in Project.COUNTER_FIELDS if row[name] != row[f'actual_{name}']
+            ]
+            if differences:
+                drifted.append(row['pk'])
+                self.stdout.write(f"{row['name']} ({row['pk']}): {', '.join(differences)}")
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('All project counters match'))
+            return
+        if options['check']:
+            raise CommandError(f'{len(drifted)} project(s) have drifted counters')
+
+        Project.objects.filter(pk__in=drifted).recount()
+        self.stdout.write(self.style.SUCCESS(f'Recounted {len(drifted)} project(s)'))
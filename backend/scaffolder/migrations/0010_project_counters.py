@@ -0,0 +1,64 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _count(queryset, group_by):
+    counts = queryset.order_by().values(group_by).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts), 0)
+
+
+def backfill_counters(apps, schema_editor):
+    Project = apps.get_model('scaffolder', 'Project')
+    DatabaseModel = apps.get_model('scaffolder', 'DatabaseModel')
+    ModelField = apps.get_model('scaffolder', 'ModelField')
+    Relationship = apps.get_model('scaffolder', 'Relationship')
+    View = apps.get_model('scaffolder', 'View')
+    URLRoute = apps.get_model('scaffolder', 'URLRoute')
+    Project.objects.update(
+        model_count=_count(DatabaseModel.objects.filter(project=OuterRef('pk')), 'project'),
+        field_count=_count(
+            ModelField.objects.filter(database_model__project=OuterRef('pk')), 'database_model__project'
+        ),
+        relationship_count=_count(
+            Relationship.objects.filter(from_model__project=OuterRef('pk')), 'from_model__project'
+        ),
+        view_count=_count(View.objects.filter(project=OuterRef('pk')), 'project'),
+        route_count=_count(URLRoute.objects.filter(project=OuterRef('pk')), 'project'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scaffolder', '0009_project_schema_revision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='model_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='field_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='relationship_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='route_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
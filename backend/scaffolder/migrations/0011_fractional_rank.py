@@ -0,0 +1,90 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:48
+
+from itertools import groupby
+
+from django.db import migrations, models
+
+
+def evenly_spaced_ranks(count):
+    """A frozen copy of scaffolder.ranking.evenly_spaced_ranks"""
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    width = 1
+    while len(digits) ** width <= count:
+        width += 1
+    step = len(digits) ** width // (count + 1)
+    ranks = []
+    for position in range(1, count + 1):
+        value, rank = position * step, []
+        for _ in range(width):
+            value, digit = divmod(value, len(digits))
+            rank.append(digits[digit])
+        ranks.append(''.join(reversed(rank)).rstrip('0'))
+    return ranks
+
+
+def backfill_ranks(apps, schema_editor):
+    """Rank existing rows in their current (order, tie-break) sequence within each parent"""
+    for model_name, parent, tie_break in (
+        ('DatabaseModel', 'project_id', 'name'),
+        ('ModelField', 'database_model_id', 'name'),
+        ('ViewField', 'view_id', 'pk'),
+    ):
+        model = apps.get_model('scaffolder', model_name)
+        rows = model.objects.order_by(parent, 'order', tie_break).only('pk', parent, 'rank')
+        ranked = []
+        for _, siblings in groupby(rows.iterator(), key=lambda row: getattr(row, parent)):
+            siblings = list(siblings)
+            for row, rank in zip(siblings, evenly_spaced_ranks(len(siblings))):
+                row.rank = rank
+                ranked.append(row)
+        model.objects.bulk_update(ranked, ['rank'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scaffolder', '0010_project_counters'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='databasemodel',
+            options={'ordering': ['rank', 'name']},
+        ),
+        migrations.AlterModelOptions(
+            name='modelfield',
+            options={'ordering': ['rank', 'name']},
+        ),
+        migrations.AlterModelOptions(
+            name='viewfield',
+            options={'ordering': ['rank']},
+        ),
+        migrations.AddField(
+            model_name='databasemodel',
+            name='rank',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='modelfield',
+            name='rank',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='viewfield',
+            name='rank',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.RunPython(backfill_ranks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='databasemodel',
+            index=models.Index(fields=['project', 'rank', 'name'], name='scaffolder_model_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='modelfield',
+            index=models.Index(fields=['database_model', 'rank', 'name'], name='scaffolder_field_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='viewfield',
+            index=models.Index(fields=['view', 'rank'], name='scaffolder_viewfield_rank_idx'),
+        ),
+    ]
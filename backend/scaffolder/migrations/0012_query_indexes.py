@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scaffolder', '0011_fractional_rank'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='generatedproject',
+            index=models.Index(fields=['project', '-generated_at'], name='scaffolder_generation_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='generatedproject',
+            index=models.Index(condition=models.Q(('status', 'completed')), fields=['project', '-version'], name='scaffolder_gen_completed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['owner', '-created_at', '-id'], name='scaffolder_project_owner_idx'),
+        ),
+    ]
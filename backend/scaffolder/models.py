@@ -1,7 +1,71 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.conf import settings
+from django.utils import timezone
 import uuid
 
+from .ranking import rank_after
+
+def _count_subquery(queryset, group_by):
+    """Correlated COUNT(*) for one parent row, without joining rows into the outer query"""
+    counts = queryset.order_by().values(group_by).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts), 0)
+
+def counter_expressions():
+    """COUNT(*) subqueries that the denormalized Project counters must equal"""
+    return {
+        'model_count': _count_subquery(
+            DatabaseModel.objects.filter(project=OuterRef('pk')), 'project'
+        ),
+        'field_count': _count_subquery(
+            ModelField.objects.filter(database_model__project=OuterRef('pk')), 'database_model__project'
+        ),
+        'relationship_count': _count_subquery(
+            Relationship.objects.filter(from_model__project=OuterRef('pk')), 'from_model__project'
+        ),
+        'view_count': _count_subquery(
+            View.objects.filter(project=OuterRef('pk')), 'project'
+        ),
+        'route_count': _count_subquery(
+            URLRoute.objects.filter(project=OuterRef('pk')), 'project'
+        ),
+    }
+
+class ProjectQuerySet(models.QuerySet):
+    def with_counts(self):
+        """Annotate the latest completed generation; the counts are columns"""
+        return self.annotate(last_generated_version=Subquery(self._latest_generation().values('version')[:1]))
+    
+    def with_last_generation(self):
+        """Annotate the latest completed generation's version and completion time"""
+        latest = self._latest_generation()
+        return self.annotate(
+            last_generated_version=Subquery(latest.values('version')[:1]),
+            last_generated_at=Subquery(latest.values('completed_at')[:1]),
+        )
+    
+    def _latest_generation(self):
+        return GeneratedProject.objects.filter(
+            project=OuterRef('pk'), status=GeneratedProject.STATUS_COMPLETED
+        ).order_by('-version')
+
+    def bump_schema_revision(self):
+        """Atomically advance schema_revision, e.g. after a child object changed"""
+        return self.update(schema_revision=F('schema_revision') + 1, schema_updated_at=timezone.now())
+    
+    def adjust_counters(self, **deltas):
+        """Atomically add deltas (e.g. field_count=-2) to the denormalized counters"""
+        return self.update(**{name: F(name) + delta for name, delta in deltas.items() if delta})
+    
+    def recount(self):
+        """Recompute the denormalized counters from the child tables"""
+        return self.update(**counter_expressions())
+    
+    def with_actual_counts(self):
+        """Annotate actual_<counter> for comparing the counters with the child tables"""
+        return self.annotate(**{f'actual_{name}': expression for name, expression in counter_expressions().items()})
+
 class Project(models.Model):
     FRAMEWORK_CHOICES = [
         ('django', 'Django + DRF'),
@@ -24,29 +88,93 @@ class Project(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Advanced on every change to the project or its schema (see scaffolder.signals)
+    schema_revision = models.PositiveBigIntegerField(default=0, editable=False)
+    schema_updated_at = models.DateTimeField(default=timezone.now, editable=False)
+    
+    # Denormalized child counts, kept in step by scaffolder.signals
+    model_count = models.PositiveIntegerField(default=0, editable=False)
+    field_count = models.PositiveIntegerField(default=0, editable=False)
+    relationship_count = models.PositiveIntegerField(default=0, editable=False)
+    view_count = models.PositiveIntegerField(default=0, editable=False)
+    route_count = models.PositiveIntegerField(default=0, editable=False)
+    
+    REVISION_FIELDS = ('schema_revision', 'schema_updated_at')
+    COUNTER_FIELDS = ('model_count', 'field_count', 'relationship_count', 'view_count', 'route_count')
+    
+    objects = ProjectQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
         unique_together = ['owner', 'name']
+        indexes = [
+            # An owner's projects in list/cursor order
+            models.Index(fields=['owner', '-created_at', '-id'], name='scaffolder_project_owner_idx'),
+        ]
     
     def __str__(self):
         return self.name
+    
+    def save(self, *args, **kwargs):
+        # Revision and counters only move through F() updates; never write back a stale copy
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.REVISION_FIELDS + self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
 
-class DatabaseModel(models.Model):
+class RankedModel(models.Model):
+    """Rows ordered within their parent (RANK_PARENT) by a lexicographic rank; see scaffolder.ranking"""
+    RANK_PARENT = None
+    
+    rank = models.CharField(max_length=255, blank=True, editable=False)
+    
+    class Meta:
+        abstract = True
+    
+    def rank_siblings(self):
+        parent_id = f'{self.RANK_PARENT}_id'
+        return type(self)._default_manager.filter(**{parent_id: getattr(self, parent_id)})
+    
+    def lock_rank_parent(self):
+        """Lock the parent row, so appends to it read each other's ranks one at a time"""
+        parent = self._meta.get_field(self.RANK_PARENT).related_model
+        parent_id = getattr(self, f'{self.RANK_PARENT}_id')
+        list(parent._default_manager.select_for_update().filter(pk=parent_id).values_list('pk'))
+    
+    def save(self, *args, **kwargs):
+        if self.rank:
+            return super().save(*args, **kwargs)
+        # New rows go last unless a rank was chosen for them
+        with transaction.atomic():
+            self.lock_rank_parent()
+            last = self.rank_siblings().aggregate(last=Max('rank'))['last']
+            self.rank = rank_after(last)
+            super().save(*args, **kwargs)
+
+class DatabaseModel(RankedModel):
+    RANK_PARENT = 'project'
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='database_models')
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     display_field = models.CharField(max_length=255, blank=True)  # Field to use for __str__
     order = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        ordering = ['order', 'name']
+        ordering = ['rank', 'name']
         unique_together = ['project', 'name']
+        indexes = [models.Index(fields=['project', 'rank', 'name'], name='scaffolder_model_rank_idx')]
     
     def __str__(self):
         return f"{self.project.name}.{self.name}"
 
-class ModelField(models.Model):
+class ModelField(RankedModel):
+    RANK_PARENT = 'database_model'
+    
     FIELD_TYPES = [
         ('char', 'CharField'),
         ('text', 'TextField'),
@@ -76,10 +204,12 @@ class ModelField(models.Model):
     help_text = models.CharField(max_length=255, blank=True)
     order = models.IntegerField(default=0)
     relationship_data = models.JSONField(null=True, blank=True)  
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        ordering = ['order', 'name']
+        ordering = ['rank', 'name']
         unique_together = ['database_model', 'name']
+        indexes = [models.Index(fields=['database_model', 'rank', 'name'], name='scaffolder_field_rank_idx')]
     
     def __str__(self):
         return f"{self.database_model.name}.{self.name}"
@@ -107,6 +237,7 @@ class Relationship(models.Model):
     related_name = models.CharField(max_length=255, blank=True)
     null = models.BooleanField(default=True)
     blank = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         unique_together = ['from_model', 'name']
@@ -115,19 +246,49 @@ class Relationship(models.Model):
         return f"{self.from_model.name}.{self.name} -> {self.to_model.name}"
 
 class GeneratedProject(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    FINISHED_STATUSES = (STATUS_COMPLETED, STATUS_FAILED)
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='generations')
-    generated_code = models.JSONField(default=dict)
+    generated_code = models.JSONField(default=dict)  # Archive path -> file content
     version = models.IntegerField(default=1)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    error = models.TextField(blank=True)
     generated_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         ordering = ['-generated_at']
         unique_together = ['project', 'version']
+        indexes = [
+            models.Index(fields=['project', '-generated_at'], name='scaffolder_generation_idx'),
+            # Latest completed version per project (ProjectQuerySet.with_counts)
+            models.Index(
+                fields=['project', '-version'], name='scaffolder_gen_completed_idx',
+                condition=Q(status='completed'),
+            ),
+        ]
     
     def __str__(self):
         return f"{self.project.name} v{self.version}"
     
+    @property
+    def is_finished(self):
+        return self.status in self.FINISHED_STATUSES
+    
     
 # In your models.py, add View and related models
 class View(models.Model):
@@ -172,15 +333,18 @@ class View(models.Model):
     def __str__(self):
         return f"{self.project.name}.{self.name}"
 
-class ViewField(models.Model):
+class ViewField(RankedModel):
+    RANK_PARENT = 'view'
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     view = models.ForeignKey(View, on_delete=models.CASCADE, related_name='included_fields')
     model_field = models.ForeignKey(ModelField, on_delete=models.CASCADE)
     order = models.IntegerField(default=0)
     
     class Meta:
-        ordering = ['order']
+        ordering = ['rank']
         unique_together = ['view', 'model_field']
+        indexes = [models.Index(fields=['view', 'rank'], name='scaffolder_viewfield_rank_idx')]
     
     def __str__(self):
         return f"{self.view.name}.{self.model_field.name}"
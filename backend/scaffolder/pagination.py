@@ -0,0 +1,13 @@
+from rest_framework.pagination import CursorPagination
+
+
+class ProjectCursorPagination(CursorPagination):
+    """
+    Keyset pagination for project lists.
+
+    Pages are selected with a WHERE on created_at (plus an offset only for
+    rows sharing a timestamp), so deep pages cost the same as the first.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -1,5 +1,5 @@
 from rest_framework import permissions
-from .models import Project, DatabaseModel, ModelField, Relationship
+from .models import Project, ModelField, Relationship, ViewField
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
     """
@@ -13,43 +13,29 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
             return True
             
         # Write permissions are only allowed to the owner of the project.
-        return obj.owner == request.user
+        return obj.owner_id == request.user.pk
 
 class IsProjectOwner(permissions.BasePermission):
     """
     Custom permission to only allow owners of a project to edit it.
+    
+    Compares ids along the object's path to its project, so it costs no
+    queries when the viewset's queryset select_related that path.
     """
     
     def has_object_permission(self, request, view, obj):
-        # Check if the user is the owner of the project
-        
-        # If obj is a Project
-        if isinstance(obj, Project):
-            return obj.owner == request.user
-        
-        # If obj is a DatabaseModel
-        elif isinstance(obj, DatabaseModel):
-            return obj.project.owner == request.user
-        
-        # If obj is a ModelField
-        elif isinstance(obj, ModelField):
-            return obj.database_model.project.owner == request.user
-        
-        # If obj is a Relationship
-        elif isinstance(obj, Relationship):
-            return obj.from_model.project.owner == request.user
-        
-        # If obj is a View
-        elif hasattr(obj, 'project'):
-            return obj.project.owner == request.user
-        
-        # If obj is a ViewField
-        elif hasattr(obj, 'view'):
-            return obj.view.project.owner == request.user
-        
-        # If obj is a URLRoute
-        elif hasattr(obj, 'project'):
-            return obj.project.owner == request.user
-        
-        # Default deny
-        return False
\ No newline at end of file
+        project = project_of(obj)
+        return project is not None and project.owner_id == request.user.pk
+
+def project_of(obj):
+    """Return the Project that obj belongs to, or None"""
+    if isinstance(obj, Project):
+        return obj
+    if isinstance(obj, ModelField):
+        return obj.database_model.project
+    if isinstance(obj, Relationship):
+        return obj.from_model.project
+    if isinstance(obj, ViewField):
+        return obj.view.project
+    # DatabaseModel, View and URLRoute hang directly off the project
+    return getattr(obj, 'project', None)
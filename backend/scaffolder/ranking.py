@@ -0,0 +1,89 @@
+"""
+Lexicographic rank keys for ordering rows within their parent.
+
+A rank is a base-36 fraction written as a string of lowercase digits; rows
+sort by plain string comparison. There is always room for another rank
+between two existing ones, so moving a row rewrites only that row. Ranks
+grow by about one character per repeated insert at the same spot, which
+rebalance_ranks periodically undoes by respacing a parent's rows evenly.
+Appends are the common case and grow only logarithmically (see rank_after).
+
+Ranks never end in '0' (the smallest digit), which is what guarantees a
+rank strictly between any two distinct ranks exists.
+"""
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+BASE = len(DIGITS)
+
+
+def _to_int(digits):
+    value = 0
+    for digit in digits:
+        value = value * BASE + DIGITS.index(digit)
+    return value
+
+
+def _to_digits(value, width):
+    digits = []
+    for _ in range(width):
+        value, digit = divmod(value, BASE)
+        digits.append(DIGITS[digit])
+    return ''.join(reversed(digits))
+
+
+def rank_after(before=None):
+    """
+    Return a short rank sorting strictly after `before` (None for an empty parent).
+
+    The rank is read as n leading 'z's followed by an (n + 1)-digit counter,
+    which is incremented; once its first digit would become 'z' the next level
+    starts, one 'z' and one counter digit longer. Level n holds about 36 ** (n + 1)
+    ranks, so a run of appends grows ranks logarithmically, not linearly.
+    """
+    if not before:
+        return DIGITS[BASE // 2]
+    level = len(before) - len(before.lstrip(DIGITS[-1]))
+    width = level + 1
+    value = _to_int(before[level:level + width].ljust(width, DIGITS[0])) + 1
+    if value >= (BASE - 1) * BASE ** (width - 1):
+        level, width, value = level + 1, width + 1, 1
+    return (DIGITS[-1] * level + _to_digits(value, width)).rstrip(DIGITS[0])
+
+
+def rank_between(before=None, after=None):
+    """Return a rank sorting strictly after `before` and before `after` (None is open)"""
+    if after is None:
+        return rank_after(before)
+    before = before or ''
+    if not before < after:
+        raise ValueError(f'Cannot rank between {before!r} and {after!r}')
+
+    digits, index = [], 0
+    while True:
+        low = DIGITS.index(before[index]) if index < len(before) else 0
+        high = DIGITS.index(after[index]) if after is not None and index < len(after) else BASE
+        if high - low > 1:
+            digits.append(DIGITS[(low + high) // 2])
+            return ''.join(digits)
+        digits.append(DIGITS[low])
+        if high - low == 1:
+            # Anything extending `before` from here on sorts below `after`
+            after = None
+        index += 1
+
+
+def ranks_after(last, count):
+    """Return count increasing ranks that all sort after `last` (None for an empty parent)"""
+    ranks = []
+    for _ in range(count):
+        last = rank_after(last)
+        ranks.append(last)
+    return ranks
+
+
+def evenly_spaced_ranks(count):
+    """Return count short, evenly spaced, increasing ranks"""
+    width = 1
+    while BASE ** width <= count:
+        width += 1
+    step = BASE ** width // (count + 1)
+    return [_to_digits(position * step, width).rstrip(DIGITS[0]) for position in range(1, count + 1)]
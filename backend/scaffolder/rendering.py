@@ -0,0 +1,118 @@
+"""
+Generated-code responses shared by the DRF actions (views.py) and their
+async counterparts (async_views.py).
+
+Each helper takes an already loaded ProjectSchema and does the blocking
+part of the request: rendering, fingerprinting, caching and compression.
+The views only load the project and schema their own way and pick how
+data becomes a response (`respond`, DRF's Response or a JsonResponse);
+async_views runs these helpers on the executor.
+"""
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from rest_framework import status
+
+from .code_generators import get_code_generator, iter_zip_stream
+from .generation_cache import generation_cache, preview_etag, schema_fingerprint
+from .parallel import get_render_executor
+
+
+def wants_stream(request):
+    return request.GET.get('stream', '').lower() in ('1', 'true', 'yes')
+
+
+def generate_archive(schema, stream=False):
+    """
+    Return the project archive as bytes, or as an iterator of chunks when
+    streaming was asked for and the archive is not cached yet.
+
+    Every file is rendered before this returns, so a failure is raised here
+    and not halfway through a response; only compression is streamed.
+    """
+    generator = get_code_generator(schema)
+    fingerprint = schema_fingerprint(schema)
+    executor = get_render_executor()
+
+    if stream and generation_cache.get(fingerprint, 'zip') is None:
+        entries = list(generator.iter_archive_entries(generator.generate_project(executor=executor)))
+        return generation_cache.iter_and_set(fingerprint, 'zip', iter_zip_stream(entries))
+
+    def build_zip():
+        project_structure = generator.generate_project(executor=executor)
+        return generator.create_zip_file(project_structure, executor=executor).getvalue()
+
+    return generation_cache.get_or_generate(fingerprint, 'zip', build_zip)
+
+
+def archive_response(project, archive, iterate=None):
+    """Attachment response for generate_archive's result; iterate wraps streamed chunks"""
+    if isinstance(archive, bytes):
+        response = HttpResponse(archive, content_type='application/zip')
+    else:
+        response = StreamingHttpResponse(iterate(archive) if iterate else archive, content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{project.name}_project.zip"'
+    return response
+
+
+def generate_response(request, project, schema, respond, iterate=None):
+    try:
+        archive = generate_archive(schema, stream=wants_stream(request))
+    except Exception as e:
+        return respond({'error': f'Generation failed: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    return archive_response(project, archive, iterate)
+
+
+def preview_response(request, schema, respond):
+    """
+    The preview, or one ?file= of it, with an ETag from the schema
+    fingerprint; a matching conditional request gets 304 without rendering.
+    """
+    file_path = request.GET.get('file')
+    try:
+        generator = get_code_generator(schema)
+        if file_path and file_path not in dict(generator.PROJECT_FILES):
+            return respond({'file': f'Unknown file "{file_path}".'}, status=status.HTTP_400_BAD_REQUEST)
+
+        fingerprint = schema_fingerprint(schema)
+        etag = preview_etag(fingerprint, file_path)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified['ETag'] = etag
+            return not_modified
+
+        if file_path:
+            preview_data = {
+                'file': file_path,
+                'content': generation_cache.get_or_generate(
+                    fingerprint, f'file:{file_path}', lambda: generator.render_file(file_path)
+                ),
+            }
+        else:
+            preview_data = generation_cache.get_or_generate(fingerprint, 'preview', generator.generate_preview)
+    except Exception as e:
+        return respond(
+            {'error': f'Preview generation failed: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    response = respond(preview_data)
+    response['ETag'] = etag
+    return response
+
+
+def preview_files_response(request, schema, respond):
+    """The files preview can render, with the ETag each would carry"""
+    fingerprint = schema_fingerprint(schema)
+    etag = preview_etag(fingerprint, 'manifest')
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        not_modified['ETag'] = etag
+        return not_modified
+
+    response = respond({
+        'fingerprint': fingerprint,
+        'files': [
+            {'path': file_path, 'etag': preview_etag(fingerprint, file_path)}
+            for file_path, _ in get_code_generator(schema).PROJECT_FILES
+        ],
+    })
+    response['ETag'] = etag
+    return response
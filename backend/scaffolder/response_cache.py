@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.http import http_date, quote_etag
+
+
+def schema_etag(project):
+    """Strong ETag shared by every representation of project at its current revision"""
+    return quote_etag(f'{project.pk}.{project.schema_revision}')
+
+
+def schema_last_modified(project):
+    """Last-Modified timestamp (whole seconds) matching schema_etag"""
+    return int(project.schema_updated_at.timestamp())
+
+
+def with_validators(response, etag, last_modified):
+    """Stamp ETag/Last-Modified on a 200 or 304 response"""
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def detail_etag(project):
+    """
+    schema_etag extended with the latest completed generation, which the
+    project detail shows but which completes without a schema change.
+    Expects project annotated by ProjectQuerySet.with_last_generation().
+    """
+    return quote_etag(f'{project.pk}.{project.schema_revision}.{project.last_generated_version or 0}')
+
+
+def detail_last_modified(project):
+    """Last-Modified timestamp (whole seconds) matching detail_etag"""
+    if project.last_generated_at is None:
+        return schema_last_modified(project)
+    return max(schema_last_modified(project), int(project.last_generated_at.timestamp()))
+
+
+class ResponseCache:
+    """
+    Serialized API payloads per project, keyed by Project.schema_revision.
+
+    Entries are never deleted explicitly: bumping the project's revision
+    (see scaffolder.signals) changes every key for that project, and the
+    stale entries expire or get evicted by the cache backend.
+    """
+    KEY_PREFIX = 'scaffolder:response'
+
+    def __init__(self, alias=None, timeout=None):
+        config = getattr(settings, 'SCAFFOLDER_RESPONSE_CACHE', {})
+        self.alias = alias or config.get('ALIAS', 'default')
+        self.timeout = timeout or config.get('TIMEOUT', 5 * 60)
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def make_key(self, project, kind):
+        return f'{self.KEY_PREFIX}:{project.pk}:{project.schema_revision}:{kind}'
+
+    def get_or_build(self, project, kind, build):
+        key = self.make_key(project, kind)
+        data = self.cache.get(key)
+        if data is None:
+            data = build()
+            self.cache.set(key, data, self.timeout)
+        return data
+
+    async def aget_or_build(self, project, kind, build):
+        """get_or_build for async views; build is a coroutine function"""
+        key = self.make_key(project, kind)
+        data = await self.cache.aget(key)
+        if data is None:
+            data = await build()
+            await self.cache.aset(key, data, self.timeout)
+        return data
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,127 @@
+"""
+Immutable intermediate representation of a project's schema.
+
+The generators render from these tuples instead of the ORM, so a schema is
+loaded once in a fixed number of queries and can be fingerprinted, cached
+or pickled to another process as-is.
+"""
+from collections import defaultdict, namedtuple
+
+from .models import DatabaseModel, ModelField, Relationship, View, ViewField, URLRoute
+
+
+class FieldSchema(namedtuple('FieldSchema', [
+    'id', 'name', 'field_type', 'max_length', 'null', 'blank', 'unique',
+    'primary_key', 'default_value', 'help_text', 'order', 'relationship_data',
+    'updated_at',
+])):
+    __slots__ = ()
+
+
+class RelationshipSchema(namedtuple('RelationshipSchema', [
+    'id', 'name', 'relationship_type', 'to_model_id', 'on_delete',
+    'related_name', 'null', 'blank', 'updated_at',
+])):
+    __slots__ = ()
+
+
+class ModelSchema(namedtuple('ModelSchema', [
+    'id', 'name', 'description', 'display_field', 'order', 'updated_at',
+    'fields', 'relationships',
+])):
+    __slots__ = ()
+
+
+class ViewSchema(namedtuple('ViewSchema', [
+    'id', 'name', 'model_id', 'view_type', 'description', 'permissions',
+    'pagination_enabled', 'page_size', 'ordering_fields', 'search_fields',
+    'filter_fields', 'field_ids', 'updated_at',
+])):
+    __slots__ = ()
+
+
+class RouteSchema(namedtuple('RouteSchema', [
+    'id', 'path', 'name', 'description', 'http_method', 'permission_level',
+    'associated_view', 'namespace', 'custom_regex', 'is_selected', 'updated_at',
+])):
+    __slots__ = ()
+
+
+class ProjectSchema(namedtuple('ProjectSchema', [
+    'id', 'name', 'framework', 'include_docker', 'include_cors',
+    'include_rate_limiting', 'include_logging', 'include_env_example',
+    'models', 'views', 'routes',
+])):
+    __slots__ = ()
+
+
+def _schema_queries(project):
+    """The six row queries a ProjectSchema is assembled from"""
+    return {
+        'fields': ModelField.objects.filter(database_model__project=project).order_by(
+            'rank', 'name'
+        ).values_list('database_model_id', *FieldSchema._fields),
+        'relationships': Relationship.objects.filter(from_model__project=project).order_by(
+            'name', 'pk'
+        ).values_list('from_model_id', *RelationshipSchema._fields),
+        'models': DatabaseModel.objects.filter(project=project).values_list(
+            'id', 'name', 'description', 'display_field', 'order', 'updated_at'
+        ),
+        'view_fields': ViewField.objects.filter(view__project=project).order_by(
+            'rank', 'pk'
+        ).values_list('view_id', 'model_field_id'),
+        'views': View.objects.filter(project=project).order_by('name').values_list(
+            'id', 'name', 'model_id', 'view_type', 'description', 'permissions',
+            'pagination_enabled', 'page_size', 'ordering_fields', 'search_fields',
+            'filter_fields', 'updated_at',
+        ),
+        'routes': URLRoute.objects.filter(project=project).values_list(*RouteSchema._fields),
+    }
+
+
+def _assemble_schema(project, rows):
+    fields_by_model = defaultdict(list)
+    for model_id, *row in rows['fields']:
+        fields_by_model[model_id].append(FieldSchema(*row))
+
+    relationships_by_model = defaultdict(list)
+    for model_id, *row in rows['relationships']:
+        relationships_by_model[model_id].append(RelationshipSchema(*row))
+
+    models = tuple(
+        ModelSchema(
+            model_id, name, description, display_field, order, updated_at,
+            tuple(fields_by_model[model_id]), tuple(relationships_by_model[model_id]),
+        )
+        for model_id, name, description, display_field, order, updated_at in rows['models']
+    )
+
+    field_ids_by_view = defaultdict(list)
+    for view_id, model_field_id in rows['view_fields']:
+        field_ids_by_view[view_id].append(model_field_id)
+
+    views = tuple(
+        ViewSchema(*row[:-1], tuple(field_ids_by_view[row[0]]), row[-1])
+        for row in rows['views']
+    )
+
+    routes = tuple(RouteSchema(*row) for row in rows['routes'])
+
+    return ProjectSchema(
+        project.pk, project.name, project.framework, project.include_docker,
+        project.include_cors, project.include_rate_limiting, project.include_logging,
+        project.include_env_example, models, views, routes,
+    )
+
+
+def load_project_schema(project):
+    """Load the full schema of project in six queries, regardless of its size"""
+    return _assemble_schema(project, _schema_queries(project))
+
+
+async def load_project_schema_async(project):
+    """load_project_schema for async views: the same six queries through the async ORM"""
+    rows = {}
+    for name, queryset in _schema_queries(project).items():
+        rows[name] = [row async for row in queryset]
+    return _assemble_schema(project, rows)
@@ -1,12 +1,130 @@
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Project, DatabaseModel, ModelField, Relationship, GeneratedProject, View, ViewField, URLRoute
+from .ranking import evenly_spaced_ranks, ranks_after
+from .signals import schema_batch
 
 class ModelFieldSerializer(serializers.ModelSerializer):
     class Meta:
         model = ModelField
         fields = ['id', 'name', 'field_type', 'max_length', 'null', 'blank', 
-                 'unique', 'primary_key', 'default_value', 'help_text', 'order', 'relationship_data']
-        read_only_fields = ('id',)
+                 'unique', 'primary_key', 'default_value', 'help_text', 'order', 'rank', 'relationship_data']
+        read_only_fields = ('id', 'order', 'rank')
+
+class ModelFieldBulkSerializer(serializers.Serializer):
+    """
+    One batch of field changes for a single model.
+    
+    The batch is validated as a whole against the model's current fields and
+    applied in one transaction; `order`, when given, lists every field left
+    after the deletes in its new order and created fields are appended after
+    them. Expects the target DatabaseModel in context['database_model'],
+    locked by the caller for the duration of validation and save.
+    """
+    
+    def get_fields(self):
+        # Declared here because `create` and `update` would shadow the save hooks
+        return {
+            'create': serializers.ListField(child=serializers.DictField(), required=False, default=list),
+            'update': serializers.ListField(child=serializers.DictField(), required=False, default=list),
+            'delete': serializers.ListField(child=serializers.UUIDField(), required=False, default=list),
+            'order': serializers.ListField(child=serializers.UUIDField(), required=False, default=list),
+        }
+    
+    def validate(self, attrs):
+        existing = {field.pk: field for field in self.context['database_model'].fields.all()}
+        deleted = set(attrs['delete'])
+        errors = {}
+        
+        unknown = [str(pk) for pk in deleted if pk not in existing]
+        if unknown:
+            errors['delete'] = [f'Unknown field ids: {", ".join(unknown)}.']
+        
+        creates = ModelFieldSerializer(data=attrs['create'], many=True)
+        if not creates.is_valid():
+            errors['create'] = creates.errors
+        
+        updates, update_errors, seen = [], [], set()
+        for item in attrs['update']:
+            try:
+                pk = serializers.UUIDField().to_internal_value(item.get('id'))
+            except serializers.ValidationError as e:
+                update_errors.append({'id': e.detail})
+                continue
+            if pk not in existing or pk in deleted or pk in seen:
+                update_errors.append({'id': ['Unknown, deleted or repeated field id.']})
+                continue
+            seen.add(pk)
+            serializer = ModelFieldSerializer(existing[pk], data=item, partial=True)
+            if serializer.is_valid():
+                updates.append((existing[pk], serializer.validated_data))
+                update_errors.append({})
+            else:
+                update_errors.append(serializer.errors)
+        if any(update_errors):
+            errors['update'] = update_errors
+        
+        # A partial order would leave unlisted fields' ranks colliding with the respaced ones
+        order = attrs['order']
+        if order and (len(order) != len(set(order)) or set(order) != set(existing) - deleted):
+            errors['order'] = ['Must list every field left after the deletes exactly once.']
+        
+        if errors:
+            raise serializers.ValidationError(errors)
+        
+        # Names must stay unique per model once the whole batch is applied
+        names = {pk: field.name for pk, field in existing.items() if pk not in deleted}
+        names.update((field.pk, data['name']) for field, data in updates if 'name' in data)
+        final_names = list(names.values()) + [data['name'] for data in creates.validated_data]
+        duplicates = sorted({name for name in final_names if final_names.count(name) > 1})
+        if duplicates:
+            raise serializers.ValidationError({'name': [f'Duplicate field names: {", ".join(duplicates)}.']})
+        
+        attrs['create'] = creates.validated_data
+        attrs['update'] = updates
+        attrs['existing'] = existing
+        return attrs
+    
+    def create(self, validated_data):
+        database_model = self.context['database_model']
+        existing = validated_data['existing']
+        changed, update_fields = {}, set()
+        
+        for field, data in validated_data['update']:
+            for attr, value in data.items():
+                setattr(field, attr, value)
+            update_fields.update(data)
+            changed[field.pk] = field
+        ranks = evenly_spaced_ranks(len(validated_data['order']))
+        for index, (pk, rank) in enumerate(zip(validated_data['order'], ranks)):
+            existing[pk].order = index
+            existing[pk].rank = rank
+            changed[pk] = existing[pk]
+            update_fields.update(('order', 'rank'))
+        
+        remaining = [field.rank for pk, field in existing.items() if pk not in validated_data['delete']]
+        new_fields = [ModelField(database_model=database_model, **data) for data in validated_data['create']]
+        for field, rank in zip(new_fields, ranks_after(max(remaining, default=None), len(new_fields))):
+            field.rank = rank
+        
+        with transaction.atomic(), schema_batch():
+            deleted = 0
+            if validated_data['delete']:
+                _, deleted_rows = ModelField.objects.filter(pk__in=validated_data['delete']).delete()
+                deleted = deleted_rows.get(ModelField._meta.label, 0)
+            if changed:
+                # bulk_update skips auto_now, so stamp updated_at explicitly
+                now = timezone.now()
+                for field in changed.values():
+                    field.updated_at = now
+                ModelField.objects.bulk_update(changed.values(), sorted(update_fields | {'updated_at'}))
+            created = ModelField.objects.bulk_create(new_fields)
+            # The whole batch is one counter update and one revision
+            project = Project.objects.filter(pk=database_model.project_id)
+            project.adjust_counters(field_count=len(created) - deleted)
+            project.bump_schema_revision()
+        return list(database_model.fields.all())
 
 class RelationshipSerializer(serializers.ModelSerializer):
     from_model_name = serializers.CharField(source='from_model.name', read_only=True)
@@ -25,27 +143,26 @@ class DatabaseModelSerializer(serializers.ModelSerializer):
     class Meta:
         model = DatabaseModel
         fields = [
-            'id', 'name', 'description', 'display_field', 'order',
+            'id', 'name', 'description', 'display_field', 'order', 'rank',
             'fields', 'outgoing_relationships', 'incoming_relationships'
         ]
-        read_only_fields = ('id',)
+        read_only_fields = ('id', 'order', 'rank')
     
     def get_incoming_relationships(self, obj):
-        relationships = Relationship.objects.filter(to_model=obj)
-        return RelationshipSerializer(relationships, many=True).data
+        # Served from the prefetch cache when the view loaded the model graph
+        return RelationshipSerializer(obj.incoming_relationships.all(), many=True).data
 
 class ProjectListSerializer(serializers.ModelSerializer):
     owner_username = serializers.CharField(source='owner.username', read_only=True)
-    model_count = serializers.SerializerMethodField()
+    # Annotated by ProjectQuerySet.with_counts()
+    last_generated_version = serializers.IntegerField(read_only=True, allow_null=True)
     
     class Meta:
         model = Project
         fields = ('id', 'name', 'description', 'framework', 'owner_username', 
-                 'created_at', 'model_count')
+                 'created_at', 'model_count', 'field_count', 'relationship_count',
+                 'view_count', 'route_count', 'last_generated_version')
         read_only_fields = ('id', 'created_at')
-    
-    def get_model_count(self, obj):
-        return obj.database_models.count()
 
 class ProjectDetailSerializer(ProjectListSerializer):
     database_models = DatabaseModelSerializer(many=True, read_only=True)
@@ -59,8 +176,9 @@ class ProjectDetailSerializer(ProjectListSerializer):
 class GeneratedProjectSerializer(serializers.ModelSerializer):
     class Meta:
         model = GeneratedProject
-        fields = '__all__'
-        read_only_fields = ('id', 'generated_at')
+        fields = ('id', 'project', 'version', 'status', 'error',
+                 'generated_at', 'started_at', 'completed_at')
+        read_only_fields = fields
         
         
 # In your serializers.py, add View serializers
@@ -70,8 +188,8 @@ class ViewFieldSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = ViewField
-        fields = ['id', 'model_field', 'field_name', 'field_type', 'order']
-        read_only_fields = ('id',)
+        fields = ['id', 'model_field', 'field_name', 'field_type', 'order', 'rank']
+        read_only_fields = ('id', 'order', 'rank')
 
 class ViewSerializer(serializers.ModelSerializer):
     included_fields = ViewFieldSerializer(many=True, read_only=True)
@@ -0,0 +1,131 @@
+"""
+Keep Project's schema_revision and denormalized counters in step with its schema,
+and UserProfile.project_count with the user's projects.
+
+The revision drives the response cache keys and the ETag/Last-Modified
+validators; the counters replace COUNT(*) queries and back the plan limits
+in scaffolder.limits. bulk_create/bulk_update
+and QuerySet.update() do not send these signals, so code using them must
+call bump_schema_revision() and adjust_counters() itself. Batch writers
+that also delete run inside schema_batch(), which folds the per-row
+handlers into the single update the writer applies at the end.
+"""
+import threading
+import weakref
+from contextlib import contextmanager
+
+from django.db.models import F, QuerySet
+from django.db.models.signals import post_delete, post_save
+
+from users.models import UserProfile
+from .models import Project, DatabaseModel, ModelField, Relationship, View, ViewField, URLRoute
+
+# How to reach the owning project's id from each schema model
+PROJECT_ID_PATHS = {
+    Project: lambda instance: instance.pk,
+    DatabaseModel: lambda instance: instance.project_id,
+    ModelField: lambda instance: instance.database_model.project_id,
+    Relationship: lambda instance: instance.from_model.project_id,
+    View: lambda instance: instance.project_id,
+    ViewField: lambda instance: instance.view.project_id,
+    URLRoute: lambda instance: instance.project_id,
+}
+
+COUNTERS = {
+    DatabaseModel: 'model_count',
+    ModelField: 'field_count',
+    Relationship: 'relationship_count',
+    View: 'view_count',
+    URLRoute: 'route_count',
+}
+
+# Projects already recounted per QuerySet.delete() call
+_recounted = weakref.WeakKeyDictionary()
+
+_batch = threading.local()
+
+
+@contextmanager
+def schema_batch():
+    """
+    Skip the per-row revision and counter handlers in this thread while active.
+
+    The caller owns every schema write made inside: it applies the counter
+    deltas (or a recount) and one bump_schema_revision() itself, as for
+    bulk_create.
+    """
+    _batch.depth = getattr(_batch, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _batch.depth -= 1
+
+
+def _in_batch():
+    return getattr(_batch, 'depth', 0) > 0
+
+
+def _is_cascade(sender, kwargs):
+    """True when a delete started from some other model and merely cascaded to sender"""
+    origin = kwargs.get('origin')
+    if origin is None:
+        return False
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return origin_model is not sender
+
+
+def on_schema_change(sender, instance, signal, **kwargs):
+    if kwargs.get('raw') or _in_batch():
+        return
+    if sender is Project and (kwargs.get('created') or signal is post_delete):
+        # New projects start at revision 0 and deleted ones need none
+        return
+    if _is_cascade(sender, kwargs):
+        # The object the delete started from bumps the project
+        return
+    Project.objects.filter(pk=PROJECT_ID_PATHS[sender](instance)).bump_schema_revision()
+
+
+def on_child_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and not _in_batch():
+        Project.objects.filter(pk=PROJECT_ID_PATHS[sender](instance)).adjust_counters(**{COUNTERS[sender]: 1})
+
+
+def on_child_deleted(sender, instance, **kwargs):
+    if _is_cascade(sender, kwargs) or _in_batch():
+        # Rows removed with a deleted model are covered by that model's recount
+        return
+    project_id = PROJECT_ID_PATHS[sender](instance)
+    if sender is not DatabaseModel:
+        Project.objects.filter(pk=project_id).adjust_counters(**{COUNTERS[sender]: -1})
+        return
+    # A model takes fields, relationships in both directions and views with it;
+    # recount once all of them are gone, and only once per project per QuerySet.delete()
+    origin = kwargs.get('origin')
+    if isinstance(origin, QuerySet):
+        recounted = _recounted.setdefault(origin, set())
+        if project_id in recounted:
+            return
+        recounted.add(project_id)
+    Project.objects.filter(pk=project_id).recount()
+
+
+def on_project_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        UserProfile.objects.filter(user_id=instance.owner_id).update(project_count=F('project_count') + 1)
+
+
+def on_project_deleted(sender, instance, **kwargs):
+    UserProfile.objects.filter(user_id=instance.owner_id).update(project_count=F('project_count') - 1)
+
+
+for model in PROJECT_ID_PATHS:
+    post_save.connect(on_schema_change, sender=model, dispatch_uid=f'schema_revision_save_{model.__name__}')
+    post_delete.connect(on_schema_change, sender=model, dispatch_uid=f'schema_revision_delete_{model.__name__}')
+
+for model in COUNTERS:
+    post_save.connect(on_child_saved, sender=model, dispatch_uid=f'counter_save_{model.__name__}')
+    post_delete.connect(on_child_deleted, sender=model, dispatch_uid=f'counter_delete_{model.__name__}')
+
+post_save.connect(on_project_saved, sender=Project, dispatch_uid='profile_project_count_save')
+post_delete.connect(on_project_deleted, sender=Project, dispatch_uid='profile_project_count_delete')
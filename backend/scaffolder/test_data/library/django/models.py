@@ -0,0 +1,46 @@
+from django.db import models
+from django.contrib.auth.models import User
+
+class Author(models.Model):
+    name = models.CharField(max_length=100)
+    email = models.EmailField(unique=True, help_text='Contact address')
+    bio = models.TextField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-id']
+        verbose_name = 'Author'
+        verbose_name_plural = 'Authors'
+
+    def __str__(self):
+        return str(self.name)
+
+class Book(models.Model):
+    title = models.CharField(max_length=200)
+    pages = models.IntegerField(default=0)
+    price = models.DecimalField(null=True, blank=True)
+    published = models.DateField(null=True)
+    in_print = models.BooleanField(default=True)
+    cover = models.ImageField(null=True, blank=True)
+    author = models.ForeignKey(Author, on_delete=models.CASCADE, related_name='author_set', null=True)
+
+    class Meta:
+        ordering = ['-id']
+        verbose_name = 'Book'
+        verbose_name_plural = 'Books'
+
+    def __str__(self):
+        return str(self.id)
+
+class Tag(models.Model):
+    label = models.CharField(max_length=50, unique=True)
+    metadata = models.JSONField(null=True, blank=True)
+    books = models.ManyToManyField(Book, related_name='books_set')
+
+    class Meta:
+        ordering = ['-id']
+        verbose_name = 'Tag'
+        verbose_name_plural = 'Tags'
+
+    def __str__(self):
+        return str(self.label)
+
@@ -0,0 +1,13 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from . import views
+
+router = DefaultRouter()
+
+router.register(r'author', views.AuthorViewSet)
+router.register(r'book', views.BookViewSet)
+router.register(r'tag', views.TagViewSet)
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -0,0 +1 @@
+// Express.js models would be generated here
@@ -0,0 +1 @@
+// Express.js validators would be generated here
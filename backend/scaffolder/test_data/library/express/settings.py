@@ -0,0 +1 @@
+// Express.js app configuration would be generated here
@@ -0,0 +1 @@
+// Express.js routes would be generated here
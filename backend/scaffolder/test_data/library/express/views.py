@@ -0,0 +1 @@
+// Express.js controllers would be generated here
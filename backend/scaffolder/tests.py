@@ -1,3 +1,1316 @@
-from django.test import TestCase
+import io
+import json
+import re
+import threading
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users.models import CustomUser, UserProfile
+from . import jobs
+from .benchmarks import NoFragmentCache, create_synthetic_project, interpreted_templates, synthetic_schema
+from .code_generators import BaseCodeGenerator, DjangoCodeGenerator, get_code_generator
+from .fragments import FragmentCache
+from .generation_cache import GenerationCache, generation_cache, schema_fingerprint
+from .limits import PlanLimitExceeded, check_project_limit, get_profile
+from .models import Project, DatabaseModel, ModelField, Relationship, GeneratedProject, View, ViewField, URLRoute
+from .parallel import DEFLATE_CHUNK_SIZE, build_zip
+from .ranking import ranks_after
+from .rendering import generate_archive
+from .schema import (
+    FieldSchema, ModelSchema, ProjectSchema, RelationshipSchema, load_project_schema, load_project_schema_async,
+)
+
+
+def create_project(owner, name, model_count=3, fields_per_model=2):
+    project = Project.objects.create(owner=owner, name=name)
+    previous = None
+    for index in range(model_count):
+        model = DatabaseModel.objects.create(project=project, name=f'Model{index}', order=index)
+        for order in range(fields_per_model):
+            ModelField.objects.create(database_model=model, name=f'field_{order}', order=order)
+        if previous:
+            Relationship.objects.create(
+                from_model=model, to_model=previous, relationship_type='foreign_key', name='previous'
+            )
+        previous = model
+    return project
+
+
+class ProjectListTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get('/api/projects/')
+        self.assertEqual(response.status_code, 200)
+        return len(captured)
+
+    def test_list_query_count_is_constant_in_number_of_projects(self):
+        for index in range(2):
+            create_project(self.user, f'Project {index}')
+        few = self.count_list_queries()
+
+        for index in range(2, 12):
+            create_project(self.user, f'Project {index}')
+        many = self.count_list_queries()
+
+        self.assertEqual(few, many)
+
+    def test_list_includes_annotated_counts(self):
+        project = create_project(self.user, 'Counted', model_count=3, fields_per_model=2)
+        GeneratedProject.objects.create(project=project, version=1, status=GeneratedProject.STATUS_COMPLETED)
+        GeneratedProject.objects.create(project=project, version=2, status=GeneratedProject.STATUS_FAILED)
+
+        result = self.client.get('/api/projects/').data['results'][0]
+
+        self.assertEqual(result['model_count'], 3)
+        self.assertEqual(result['field_count'], 6)
+        self.assertEqual(result['relationship_count'], 2)
+        self.assertEqual(result['last_generated_version'], 1)
+
+    def test_list_is_paginated_by_page_number_with_a_count(self):
+        for index in range(5):
+            create_project(self.user, f'Project {index}', model_count=0)
+
+        first = self.client.get('/api/projects/').data
+        self.assertEqual(first['count'], 5)
+        self.assertEqual(len(first['results']), 5)
+        self.assertEqual(first['results'][0]['name'], 'Project 4')
+
+    def test_list_can_opt_into_cursor_pagination(self):
+        for index in range(5):
+            create_project(self.user, f'Project {index}', model_count=0)
+
+        first = self.client.get('/api/projects/?paginate=cursor&page_size=3').data
+        self.assertNotIn('count', first)
+        second = self.client.get(first['next']).data
+
+        names = [project['name'] for project in first['results'] + second['results']]
+        self.assertEqual(len(names), 5)
+        self.assertEqual(len(set(names)), 5)
+        self.assertIsNone(second['next'])
+
+
+class ProjectDetailTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def count_detail_queries(self, project):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(f'/api/projects/{project.pk}/')
+        self.assertEqual(response.status_code, 200)
+        return len(captured), response.data
+
+    def test_detail_query_count_is_constant_in_project_size(self):
+        small, _ = self.count_detail_queries(create_project(self.user, 'Small', model_count=2))
+        large, data = self.count_detail_queries(create_project(self.user, 'Large', model_count=15))
+
+        self.assertEqual(small, large)
+        self.assertEqual(len(data['database_models']), 15)
+
+    def test_detail_stitches_incoming_and_outgoing_relationships(self):
+        project = create_project(self.user, 'Chain', model_count=3)
+
+        _, data = self.count_detail_queries(project)
+        models = {model['name']: model for model in data['database_models']}
+
+        self.assertEqual([rel['to_model_name'] for rel in models['Model1']['outgoing_relationships']], ['Model0'])
+        self.assertEqual([rel['from_model_name'] for rel in models['Model1']['incoming_relationships']], ['Model2'])
+        self.assertEqual(models['Model0']['outgoing_relationships'], [])
+
+
+class SchemaLoaderTests(TestCase):
+    # Projects of every row type, from benchmarks rather than create_project, which has no views or routes
+    SMALL = {'models': 2, 'fields_per_model': 2, 'relationship_density': 1.0}
+    LARGE = {'models': 40, 'fields_per_model': 8, 'relationship_density': 1.0, 'views_per_model': 2,
+             'routes_per_view': 2}
+
+    def setUp(self):
+        self.owner = CustomUser.objects.create_user(username='loader', email='loader@example.com', password='x')
+
+    def test_six_queries_regardless_of_project_size(self):
+        for scenario in (self.SMALL, self.LARGE):
+            project = create_synthetic_project(self.owner, **scenario)
+            with self.assertNumQueries(6):
+                schema = load_project_schema(project)
+            self.assertEqual(len(schema.models), scenario['models'])
+
+    def test_async_loader_runs_the_same_six_queries(self):
+        project = create_synthetic_project(self.owner, **self.LARGE)
+
+        with self.assertNumQueries(6):
+            async_to_sync(load_project_schema_async)(project)
+
+    def test_schema_holds_every_row(self):
+        project = create_synthetic_project(self.owner, **self.LARGE)
+
+        schema = load_project_schema(project)
+
+        self.assertEqual(
+            sum(len(model.fields) for model in schema.models),
+            ModelField.objects.filter(database_model__project=project).count(),
+        )
+        self.assertEqual(
+            sum(len(model.relationships) for model in schema.models),
+            Relationship.objects.filter(from_model__project=project).count(),
+        )
+        self.assertEqual(len(schema.views), View.objects.filter(project=project).count())
+        self.assertEqual(
+            sum(len(view.field_ids) for view in schema.views),
+            ViewField.objects.filter(view__project=project).count(),
+        )
+        self.assertEqual(len(schema.routes), URLRoute.objects.filter(project=project).count())
+        # Fields come in rank order; the relationship field was ranked last
+        self.assertEqual([field.name for field in schema.models[0].fields], [f'field_{order}' for order in range(8)])
+
+
+class ModelFieldBulkTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.project = create_project(self.user, 'Bulk', model_count=1, fields_per_model=3)
+        self.model = self.project.database_models.get()
+        self.url = f'/api/projects/{self.project.pk}/models/{self.model.pk}/fields/bulk/'
+
+    def test_applies_whole_batch(self):
+        first, second, third = self.model.fields.all()
+
+        response = self.client.post(self.url, {
+            'create': [{'name': f'extra_{index}', 'order': 10 + index} for index in range(40)],
+            'update': [{'id': str(first.pk), 'name': 'renamed'}],
+            'delete': [str(second.pk)],
+            'order': [str(third.pk), str(first.pk)],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([field['name'] for field in response.data[:2]], ['field_2', 'renamed'])
+        self.assertEqual(len(response.data), 42)
+        self.assertFalse(ModelField.objects.filter(pk=second.pk).exists())
+
+    def test_rejects_partial_order(self):
+        first, second, third = self.model.fields.all()
+
+        response = self.client.post(self.url, {'order': [str(third.pk), str(first.pk)]}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('order', response.data)
+        self.assertEqual(list(self.model.fields.values_list('name', flat=True)), ['field_0', 'field_1', 'field_2'])
+
+    def test_full_order_keeps_ranks_distinct(self):
+        first, second, third = self.model.fields.all()
+
+        response = self.client.post(self.url, {
+            'create': [{'name': 'extra'}],
+            'order': [str(third.pk), str(first.pk), str(second.pk)],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([field['name'] for field in response.data], ['field_2', 'field_0', 'field_1', 'extra'])
+        ranks = [field['rank'] for field in response.data]
+        self.assertEqual(ranks, sorted(set(ranks)))
+
+    def apply_deletes(self, count):
+        """Bulk-delete count fresh fields; return the queries run and the revision delta"""
+        fields = ModelField.objects.bulk_create([
+            ModelField(database_model=self.model, name=f'doomed_{index}') for index in range(count)
+        ])
+        Project.objects.filter(pk=self.project.pk).adjust_counters(field_count=count)
+        revision = Project.objects.get(pk=self.project.pk).schema_revision
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post(self.url, {
+                'create': [{'name': 'added'}], 'delete': [str(field.pk) for field in fields],
+            }, format='json')
+        self.assertEqual(response.status_code, 200)
+        project = Project.objects.get(pk=self.project.pk)
+        self.assertEqual(project.field_count, 4)
+        ModelField.objects.filter(database_model=self.model, name='added').delete()
+        return len(captured), project.schema_revision - revision
+
+    def test_deletes_are_one_batched_apply(self):
+        few_queries, few_revisions = self.apply_deletes(2)
+        many_queries, many_revisions = self.apply_deletes(20)
+
+        self.assertEqual(few_queries, many_queries)
+        self.assertEqual((few_revisions, many_revisions), (1, 1))
+
+    def test_rejects_batch_with_duplicate_names(self):
+        first = self.model.fields.first()
+
+        response = self.client.post(self.url, {
+            'create': [{'name': 'field_1'}],
+            'update': [{'id': str(first.pk), 'name': 'new_name'}],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(self.model.fields.values_list('name', flat=True)), {'field_0', 'field_1', 'field_2'})
+
+
+class GenerationJobTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.project = create_project(self.user, 'Jobs', model_count=2)
+        self.url = f'/api/projects/{self.project.pk}/generations/'
+
+    def submit(self):
+        # Jobs start on commit; the tests run them inline instead of on the worker pool
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            response = self.client.post(self.url)
+        self.assertEqual(len(callbacks), 1)
+        jobs.worker_pool.release()
+        return response
+
+    def test_submit_responds_accepted_with_the_status_url(self):
+        response = self.submit()
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], GeneratedProject.STATUS_PENDING)
+        self.assertTrue(response['Location'].endswith(f'{self.url}{response.data["id"]}/'))
+        self.assertEqual(self.client.get(response['Location']).status_code, 202)
+
+    def test_completed_job_has_files_and_shows_in_the_detail(self):
+        generation_id = self.submit().data['id']
+        detail = self.client.get(f'/api/projects/{self.project.pk}/')
+        revision = Project.objects.get(pk=self.project.pk).schema_revision
+
+        jobs.run_generation(generation_id)
+
+        response = self.client.get(f'{self.url}{generation_id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], GeneratedProject.STATUS_COMPLETED)
+        self.assertIsNotNone(response.data['started_at'])
+        self.assertIn('requirements.txt', GeneratedProject.objects.get(pk=generation_id).generated_code)
+        # Completion is not a schema change, but the detail still shows it
+        self.assertEqual(Project.objects.get(pk=self.project.pk).schema_revision, revision)
+        refreshed = self.client.get(f'/api/projects/{self.project.pk}/', HTTP_IF_NONE_MATCH=detail['ETag'])
+        self.assertEqual(refreshed.status_code, 200)
+        self.assertEqual(refreshed.data['last_generated_version'], 1)
+
+    def test_failure_is_recorded(self):
+        generation_id = self.submit().data['id']
+
+        with mock.patch('scaffolder.jobs.get_code_generator', side_effect=RuntimeError('Template missing')):
+            jobs.run_generation(generation_id)
+
+        generation = GeneratedProject.objects.get(pk=generation_id)
+        self.assertEqual(generation.status, GeneratedProject.STATUS_FAILED)
+        self.assertIn('Template missing', generation.error)
+        self.assertEqual(self.client.get(f'{self.url}{generation_id}/download/').status_code, 409)
+
+    def test_full_queue_is_rejected(self):
+        pool = jobs.GenerationWorkerPool(max_workers=1, max_pending=0)
+        pool.reserve()
+
+        with self.assertRaises(jobs.GenerationQueueFull):
+            jobs.submit_generation(self.project, pool=pool)
+        self.assertFalse(self.project.generations.exists())
+
+    def test_stale_jobs_are_failed(self):
+        now = timezone.now()
+        running = GeneratedProject.objects.create(
+            project=self.project, version=1, status=GeneratedProject.STATUS_RUNNING,
+            started_at=now - timedelta(hours=1),
+        )
+        fresh = GeneratedProject.objects.create(
+            project=self.project, version=2, status=GeneratedProject.STATUS_RUNNING, started_at=now,
+        )
+        pending = GeneratedProject.objects.create(project=self.project, version=3)
+        GeneratedProject.objects.filter(pk=pending.pk).update(generated_at=now - timedelta(hours=1))
+
+        self.assertEqual(jobs.fail_stale_generations(older_than=600, now=now), 2)
+
+        statuses = dict(self.project.generations.values_list('pk', 'status'))
+        self.assertEqual(statuses[running.pk], GeneratedProject.STATUS_FAILED)
+        self.assertEqual(statuses[pending.pk], GeneratedProject.STATUS_FAILED)
+        self.assertEqual(statuses[fresh.pk], GeneratedProject.STATUS_RUNNING)
+
+
+class ProjectImportTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.project = Project.objects.create(owner=self.user, name='Imported')
+        self.url = f'/api/projects/{self.project.pk}/import/'
+
+    def document(self, **overrides):
+        document = {
+            'models': [
+                {'name': 'Author', 'fields': [
+                    {'name': 'name', 'field_type': 'char', 'order': 1},
+                    {'name': 'email', 'field_type': 'email', 'order': 0},
+                ]},
+                {'name': 'Book', 'fields': [{'name': 'title', 'field_type': 'char'}], 'relationships': [
+                    {'name': 'author', 'to_model': 'Author', 'relationship_type': 'foreign_key'},
+                ]},
+            ],
+            'views': [{'name': 'BookList', 'model': 'Book', 'view_type': 'list', 'fields': ['title']}],
+            'routes': [{'path': '/books/', 'name': 'books'}],
+        }
+        document.update(overrides)
+        return document
+
+    def test_imports_the_whole_schema(self):
+        response = self.client.post(self.url, self.document(), format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['imported'], {
+            'models': 2, 'fields': 3, 'relationships': 1, 'views': 1, 'view_fields': 1, 'routes': 1,
+        })
+        author = self.project.database_models.get(name='Author')
+        self.assertEqual(list(author.fields.values_list('name', flat=True)), ['email', 'name'])
+        self.assertEqual(ViewField.objects.get(view__project=self.project).model_field.name, 'title')
+        project = Project.objects.get(pk=self.project.pk)
+        self.assertEqual((project.model_count, project.field_count, project.relationship_count), (2, 3, 1))
+
+    def test_relationships_resolve_model_names(self):
+        self.client.post(self.url, self.document(), format='json')
+
+        relationship = Relationship.objects.get(from_model__project=self.project)
+        self.assertEqual((relationship.from_model.name, relationship.to_model.name), ('Book', 'Author'))
+
+    def test_rejects_unknown_models_and_duplicate_names(self):
+        document = self.document()
+        document['models'][1]['relationships'][0]['to_model'] = 'Publisher'
+        document['models'].append({'name': 'Author'})
+        document['views'][0]['model'] = 'Missing'
+
+        response = self.client.post(self.url, document, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Duplicate model names: Author.', response.data['models'])
+        self.assertIn('Book.author: unknown model "Publisher".', response.data['models'])
+        self.assertEqual(response.data['views'], ['BookList: unknown model "Missing".'])
+        self.assertFalse(self.project.database_models.exists())
+
+    def test_existing_schema_is_only_overwritten_with_replace(self):
+        self.client.post(self.url, self.document(), format='json')
+        replacement = {'models': [{'name': 'Tag', 'fields': [{'name': 'label', 'field_type': 'char'}]}]}
+
+        response = self.client.post(self.url, replacement, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('replace', response.data)
+
+        response = self.client.post(self.url, dict(replacement, replace=True), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(list(self.project.database_models.values_list('name', flat=True)), ['Tag'])
+        self.assertFalse(self.project.views.exists() or self.project.url_routes.exists())
+        project = Project.objects.get(pk=self.project.pk)
+        self.assertEqual((project.model_count, project.field_count, project.relationship_count), (1, 1, 0))
+
+
+    def replace_queries(self, model_count):
+        """Import a model_count-model schema, then time replacing it"""
+        document = self.document(replace=True)
+        document['models'] += [
+            {'name': f'Extra{index}', 'fields': [{'name': f'field_{order}'} for order in range(5)], 'relationships': [
+                {'name': 'book', 'to_model': 'Book', 'relationship_type': 'foreign_key'},
+            ]}
+            for index in range(model_count - 2)
+        ]
+        document['views'] += [
+            {'name': f'Extra{index}List', 'model': f'Extra{index}', 'fields': ['field_0']}
+            for index in range(model_count - 2)
+        ]
+        document['routes'] += [{'path': f'/extra/{index}/', 'name': f'extra{index}'} for index in range(model_count)]
+        response = self.client.post(self.url, document, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+
+        revision = Project.objects.get(pk=self.project.pk).schema_revision
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post(self.url, self.document(replace=True), format='json')
+        self.assertEqual(response.status_code, 201)
+        project = Project.objects.get(pk=self.project.pk)
+        self.assertEqual(
+            (project.model_count, project.field_count, project.relationship_count, project.view_count,
+             project.route_count),
+            (2, 3, 1, 1, 1),
+        )
+        return len(captured), project.schema_revision - revision
+
+    def test_replace_cost_is_independent_of_the_replaced_schema(self):
+        few_queries, few_revisions = self.replace_queries(3)
+        many_queries, many_revisions = self.replace_queries(10)
+
+        self.assertEqual(few_queries, many_queries)
+        self.assertEqual((few_revisions, many_revisions), (1, 1))
+
+
+class NestedOwnershipTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='x')
+        self.other = CustomUser.objects.create_user(username='other', email='other@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.project = create_project(self.user, 'Mine', model_count=2)
+        self.model = self.project.database_models.first()
+
+    def test_field_detail_checks_ownership_without_walking_relations(self):
+        field = self.model.fields.first()
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.patch(
+                f'/api/projects/{self.project.pk}/models/{self.model.pk}/fields/{field.pk}/',
+                {'help_text': 'changed'}, format='json'
+            )
+
+        self.assertEqual(response.status_code, 200)
+        statements = [query['sql'] for query in captured if not query['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+        # The scoped lookup, the UPDATE and the revision bump
+        self.assertEqual(len(statements), 3)
+
+    def test_other_users_cannot_see_nested_objects(self):
+        self.client.force_authenticate(self.other)
+        field = self.model.fields.first()
+
+        listed = self.client.get(f'/api/projects/{self.project.pk}/models/')
+        detail = self.client.get(f'/api/projects/{self.project.pk}/models/{self.model.pk}/fields/{field.pk}/')
+        created = self.client.post(f'/api/projects/{self.project.pk}/urls/', {'path': '/x/', 'name': 'x'})
+
+        self.assertEqual(listed.status_code, 404)
+        self.assertEqual(detail.status_code, 404)
+        self.assertEqual(created.status_code, 404)
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.project = create_project(self.user, 'Cached', model_count=3)
+        self.url = f'/api/projects/{self.project.pk}/'
+
+    def test_repeated_detail_is_served_from_cache(self):
+        self.client.get(self.url)
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(captured), 1)
+
+    def test_schema_changes_invalidate_detail(self):
+        self.client.get(self.url)
+
+        model = self.project.database_models.get(name='Model0')
+        ModelField.objects.create(database_model=model, name='added')
+        names = [field['name'] for field in self.client.get(self.url).data['database_models'][0]['fields']]
+        self.assertIn('added', names)
+
+        model.delete()
+        self.assertEqual(len(self.client.get(self.url).data['database_models']), 2)
+
+    def test_route_list_is_invalidated_by_new_route(self):
+        routes_url = f'/api/projects/{self.project.pk}/urls/'
+        self.assertEqual(self.client.get(routes_url).data['count'], 0)
+
+        self.client.post(routes_url, {'path': '/items/', 'name': 'items'})
+
+        self.assertEqual(self.client.get(routes_url).data['count'], 1)
+
+
+class GenerationCacheTests(TestCase):
+    def setUp(self):
+        generation_cache.cache.clear()
+        self.user = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.project = create_project(self.user, 'Generated', model_count=2)
+        self.url = f'/api/projects/{self.project.pk}/preview/'
+
+    def preview(self):
+        with mock.patch.object(BaseCodeGenerator, 'generate_preview', autospec=True,
+                               side_effect=BaseCodeGenerator.generate_preview) as generate_preview:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.data, generate_preview.call_count
+
+    def test_miss_renders_then_hit_is_served_from_cache(self):
+        first, first_renders = self.preview()
+        second, second_renders = self.preview()
+
+        self.assertEqual((first_renders, second_renders), (1, 0))
+        self.assertEqual(first, second)
+
+    def test_schema_change_misses_with_a_new_fingerprint(self):
+        self.preview()
+
+        field = ModelField.objects.get(database_model__project=self.project, database_model__name='Model0', name='field_0')
+        field.name = 'renamed'
+        field.save()
+        data, renders = self.preview()
+
+        self.assertEqual(renders, 1)
+        self.assertIn('renamed', json.dumps(data))
+
+    def test_artifacts_are_evicted_from_their_own_alias(self):
+        caches['default'].set('unrelated', 'kept')
+
+        for index in range(100):
+            generation_cache.set(f'fingerprint-{index}', 'zip', b'x' * 1024)
+
+        self.assertNotEqual(generation_cache.alias, 'default')
+        self.assertEqual(caches['default'].get('unrelated'), 'kept')
+        self.assertIsNone(generation_cache.get('fingerprint-0', 'zip'))
+        self.assertIsNotNone(generation_cache.get('fingerprint-99', 'zip'))
+
+    def test_oversized_artifacts_are_not_cached(self):
+        cache = GenerationCache(max_item_bytes=10)
+
+        cache.set('fingerprint', 'file:big', 'x' * 11)
+        cache.set('fingerprint', 'file:small', 'x' * 10)
+
+        self.assertIsNone(cache.get('fingerprint', 'file:big'))
+        self.assertEqual(cache.get('fingerprint', 'file:small'), 'x' * 10)
+
+
+class FragmentCacheTests(TestCase):
+    def setUp(self):
+        owner = CustomUser.objects.create_user(username='fragments', email='fragments@example.com', password='x')
+        project = Project.objects.create(owner=owner, name='Library')
+        self.author = DatabaseModel.objects.create(project=project, name='Author')
+        self.book = DatabaseModel.objects.create(project=project, name='Book')
+        self.author_name = ModelField.objects.create(database_model=self.author, name='name', max_length=100)
+        ModelField.objects.create(database_model=self.book, name='title', max_length=200)
+        self.project = project
+        self.fragments = FragmentCache()
+
+    def render_models(self):
+        generator = DjangoCodeGenerator(load_project_schema(self.project), fragments=self.fragments)
+        with mock.patch.object(DjangoCodeGenerator, '_generate_model_class', autospec=True,
+                               side_effect=DjangoCodeGenerator._generate_model_class) as render:
+            code = generator.generate_models_code()
+        # Called as (generator, model)
+        return code, sorted(call.args[1].name for call in render.call_args_list)
+
+    def test_unchanged_models_reuse_their_fragments(self):
+        first, first_rendered = self.render_models()
+        second, second_rendered = self.render_models()
+
+        self.assertEqual((first_rendered, second_rendered), (['Author', 'Book'], []))
+        self.assertEqual(first, second)
+
+    def test_field_change_rerenders_only_its_model(self):
+        self.render_models()
+
+        self.author_name.help_text = 'Full name'
+        self.author_name.save()
+        code, rendered = self.render_models()
+
+        self.assertEqual(rendered, ['Author'])
+        self.assertIn("help_text='Full name'", code)
+
+    def test_updated_at_alone_invalidates(self):
+        self.render_models()
+
+        ModelField.objects.filter(pk=self.author_name.pk).update(updated_at=timezone.now() + timedelta(seconds=1))
+        _, rendered = self.render_models()
+
+        self.assertEqual(rendered, ['Author'])
+
+
+class StreamedGenerationTests(TestCase):
+    def setUp(self):
+        generation_cache.cache.clear()
+        self.user = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.project = create_project(self.user, 'Streamed', model_count=3)
+        self.url = f'/api/projects/{self.project.pk}/generate/?stream=true'
+
+    def read_zip(self, data):
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            return {name: archive.read(name) for name in archive.namelist()}, archive.namelist()
+
+    def test_streamed_archive_matches_create_zip_file(self):
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, 200)
+        streamed = b''.join(response.streaming_content)
+
+        generator = get_code_generator(load_project_schema(self.project))
+        expected = generator.create_zip_file(generator.generate_project()).getvalue()
+        self.assertEqual(self.read_zip(streamed), self.read_zip(expected))
+
+    def test_completed_stream_is_cached(self):
+        streamed = b''.join(self.client.post(self.url).streaming_content)
+
+        fingerprint = schema_fingerprint(load_project_schema(self.project))
+        self.assertEqual(generation_cache.get(fingerprint, 'zip'), streamed)
+        self.assertEqual(self.client.post(self.url).content, streamed)
+
+    def test_render_failure_is_reported_before_streaming(self):
+        with mock.patch.object(DjangoCodeGenerator, 'generate_views_code', side_effect=RuntimeError('Bad template')):
+            response = self.client.post(self.url)
+
+        self.assertEqual(response.status_code, 500)
+        self.assertFalse(response.streaming)
+        self.assertIn('Bad template', response.data['error'])
+
+
+GOLDEN_DIR = Path(__file__).parent / 'test_data' / 'library'
+
+GOLDEN_STAMP = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def library_schema(framework):
+    """A fixed three-model schema covering every field option and relationship kind the generators emit"""
+    def field(number, name, field_type, order, max_length=None, null=False, blank=False, unique=False,
+              default_value='', help_text='', relationship_data=None):
+        return FieldSchema(uuid.UUID(int=number), name, field_type, max_length, null, blank, unique, False,
+                           default_value, help_text, order, relationship_data, GOLDEN_STAMP)
+
+    author = ModelSchema(uuid.UUID(int=1), 'Author', 'A book author', 'name', 0, GOLDEN_STAMP, (
+        field(11, 'name', 'char', 0, max_length=100),
+        field(12, 'email', 'email', 1, unique=True, help_text='Contact address'),
+        field(13, 'bio', 'text', 2, null=True, blank=True),
+    ), ())
+    book = ModelSchema(uuid.UUID(int=2), 'Book', '', '', 1, GOLDEN_STAMP, (
+        field(21, 'title', 'char', 0, max_length=200),
+        field(22, 'pages', 'integer', 1, default_value='0'),
+        field(23, 'price', 'decimal', 2, null=True, blank=True),
+        field(24, 'published', 'date', 3, null=True),
+        field(25, 'in_print', 'boolean', 4, default_value='True'),
+        field(26, 'author_id', 'integer', 5, null=True, relationship_data={
+            'references': {'model': 'Author', 'field': 'id'}, 'relationshipType': '1:M',
+            'onDelete': 'CASCADE', 'null': True,
+        }),
+        field(27, 'cover', 'image', 6, null=True, blank=True),
+    ), (
+        RelationshipSchema(uuid.UUID(int=31), 'author', 'foreign_key', uuid.UUID(int=1), 'cascade', 'books',
+                           True, False, GOLDEN_STAMP),
+    ))
+    tag = ModelSchema(uuid.UUID(int=3), 'Tag', '', 'label', 2, GOLDEN_STAMP, (
+        field(41, 'label', 'char', 0, max_length=50, unique=True),
+        field(42, 'books', 'integer', 1, blank=True, relationship_data={
+            'references': {'model': 'Book', 'field': 'id'}, 'relationshipType': 'M:M',
+        }),
+        field(43, 'metadata', 'json', 2, null=True, blank=True),
+    ), ())
+    return ProjectSchema(uuid.UUID(int=100), 'Library', framework, True, True, False, False, True,
+                         (author, book, tag), (), ())
+
+
+class GoldenOutputTests(TestCase):
+    """
+    Every archive file for library_schema, byte for byte, against
+    test_data/library/<framework>/, which was rendered by the generators
+    before templates were compiled (README.md has since lost its generation
+    timestamp). Regenerate the files only for an intended output change.
+    """
+
+    def render_archive(self, framework):
+        generator = get_code_generator(library_schema(framework))
+        generator.fragments = NoFragmentCache()
+        return dict(generator.iter_archive_entries(generator.generate_project()))
+
+    def assertMatchesGolden(self, framework, files):
+        golden = GOLDEN_DIR / framework
+        self.assertEqual(sorted(files), sorted(path.name for path in golden.iterdir()))
+        for file_path, content in files.items():
+            with open(golden / file_path, newline='') as golden_file:
+                self.assertEqual(content, golden_file.read(), f'{framework}/{file_path}')
+
+    def test_django_output_is_unchanged(self):
+        self.assertMatchesGolden('django', self.render_archive('django'))
+
+    def test_express_output_is_unchanged(self):
+        self.assertMatchesGolden('express', self.render_archive('express'))
+
+    def test_interpreted_templates_render_the_same_bytes(self):
+        with interpreted_templates():
+            interpreted = self.render_archive('django')
+
+        self.assertEqual(interpreted, self.render_archive('django'))
+
+
+class ParallelRenderingTests(TestCase):
+    def setUp(self):
+        generation_cache.cache.clear()
+        # Large enough that models.py spans more than one deflate chunk
+        self.schema = synthetic_schema(models=300, fields_per_model=12, seed=7)
+
+    def generate(self, enabled):
+        generation_cache.cache.clear()
+        with override_settings(SCAFFOLDER_PARALLEL_RENDERING={'ENABLED': enabled, 'MAX_WORKERS': 4}), \
+                mock.patch('scaffolder.code_generators.build_zip', wraps=build_zip) as parallel_zip:
+            archive = generate_archive(self.schema)
+        self.assertEqual(parallel_zip.called, enabled)
+        return archive
+
+    def read_zip(self, data):
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            self.assertIsNone(archive.testzip())
+            return [(info.filename, archive.read(info)) for info in archive.infolist()]
+
+    def test_archive_contents_match_with_parallel_rendering_on_and_off(self):
+        serial = self.read_zip(self.generate(enabled=False))
+        parallel = self.read_zip(self.generate(enabled=True))
+
+        self.assertEqual(parallel, serial)
+        self.assertGreater(len(dict(serial)['models.py']), DEFLATE_CHUNK_SIZE)
+
+    def test_build_zip_is_a_valid_deterministic_archive(self):
+        entries = [
+            ('empty.txt', ''),
+            ('unicodé/naïve.py', 'café = "ünïcode"\n'),
+            # Not compressible in one back-reference window, so chunk seams matter
+            ('chunked.txt', ''.join(f'{index:06d} {uuid.UUID(int=index * 7919)}\n' for index in range(2000))),
+        ]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            first = build_zip(entries, executor, chunk_size=4096, date_time=(2025, 1, 1, 12, 0, 0)).getvalue()
+            second = build_zip(entries, executor, chunk_size=4096, date_time=(2025, 1, 1, 12, 0, 0)).getvalue()
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.read_zip(first), [(path, content.encode()) for path, content in entries])
+        with zipfile.ZipFile(io.BytesIO(first)) as archive:
+            self.assertEqual({info.compress_type for info in archive.infolist()}, {zipfile.ZIP_DEFLATED})
+            self.assertEqual(archive.getinfo('chunked.txt').date_time, (2025, 1, 1, 12, 0, 0))
+
+
+class PreviewFileETagTests(TestCase):
+    def setUp(self):
+        user = CustomUser.objects.create_user(username='etags', email='etags@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        # Built through the API, the way the editor builds it
+        project_id = self.client.post('/api/projects/', {'name': 'Shop'}).data['id']
+        self.models_url = f'/api/projects/{project_id}/models/'
+        order_id = self.client.post(self.models_url, {'name': 'Order'}).data['id']
+        self.fields_url = f'{self.models_url}{order_id}/fields/'
+        self.client.post(self.fields_url, {'name': 'total', 'field_type': 'decimal'})
+        self.preview_url = f'/api/projects/{project_id}/preview/'
+
+    def preview_file(self, file_path, if_none_match=None):
+        headers = {'If-None-Match': if_none_match} if if_none_match else {}
+        with mock.patch.object(BaseCodeGenerator, 'render_file', autospec=True,
+                               side_effect=BaseCodeGenerator.render_file) as render_file:
+            response = self.client.get(self.preview_url, {'file': file_path}, headers=headers)
+        return response, render_file.call_count
+
+    def test_matching_etag_is_not_modified_without_rendering(self):
+        response, _ = self.preview_file('models.py')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        for if_none_match in (etag, f'"other", {etag}', f'W/{etag}'):
+            not_modified, renders = self.preview_file('models.py', if_none_match)
+            self.assertEqual((not_modified.status_code, renders), (304, 0), if_none_match)
+            self.assertEqual(not_modified['ETag'], etag)
+            self.assertEqual(not_modified.content, b'')
+
+    def test_etag_is_scoped_to_one_file(self):
+        models_etag = self.preview_file('models.py')[0]['ETag']
+
+        response, renders = self.preview_file('urls.py', models_etag)
+
+        self.assertEqual((response.status_code, renders), (200, 1))
+        self.assertNotEqual(response['ETag'], models_etag)
+        manifest = {entry['path']: entry['etag'] for entry in self.client.get(f'{self.preview_url}files/').data['files']}
+        self.assertEqual(manifest['urls.py'], response['ETag'])
+
+    def test_schema_change_gives_a_new_etag(self):
+        etag = self.preview_file('models.py')[0]['ETag']
+
+        self.client.post(self.fields_url, {'name': 'placed_at', 'field_type': 'datetime'})
+        response, renders = self.preview_file('models.py', etag)
+
+        self.assertEqual((response.status_code, renders), (200, 1))
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('placed_at', response.data['content'])
+
+
+class ProjectGraphTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.project = create_project(self.user, 'Graph', model_count=3)
+        self.url = f'/api/projects/{self.project.pk}/graph/'
+
+    def test_graph_is_one_query_per_type(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        # Project ownership/revision lookup plus one per type
+        self.assertEqual(len(captured), 1 + 7)
+        self.assertEqual([model['name'] for model in response.data['models']], ['Model0', 'Model1', 'Model2'])
+        self.assertEqual(len(response.data['fields']), 6)
+        self.assertEqual(len(response.data['relationships']), 2)
+        self.assertEqual(response.data['project']['model_count'], 3)
+
+    def test_sparse_fieldsets(self):
+        response = self.client.get(self.url, {'include': 'models,fields', 'fields[fields]': 'name,database_model'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data), {'models', 'fields'})
+        self.assertEqual(set(response.data['fields'][0]), {'id', 'name', 'database_model'})
+        self.assertIn('description', response.data['models'][0])
+
+    def test_unknown_type_or_field_is_rejected(self):
+        self.assertEqual(self.client.get(self.url, {'include': 'secrets'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'fields[models]': 'owner'}).status_code, 400)
+
+    def test_graph_is_cached_and_conditional(self):
+        response = self.client.get(self.url, {'include': 'models'})
+
+        with CaptureQueriesContext(connection) as captured:
+            cached = self.client.get(self.url, {'include': 'models'})
+        self.assertEqual(len(captured), 1)
+        self.assertEqual(cached.data, response.data)
+
+        not_modified = self.client.get(self.url, {'include': 'models'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+        DatabaseModel.objects.create(project=self.project, name='Added')
+        self.assertEqual(len(self.client.get(self.url, {'include': 'models'}).data['models']), 4)
+
+    def test_other_users_graph_is_not_found(self):
+        other = CustomUser.objects.create_user(username='other', email='other@example.com', password='x')
+        self.client.force_authenticate(other)
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='x')
+        self.project = create_project(self.user, 'Async', model_count=3)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.headers = {'Authorization': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+
+    def urls(self, action):
+        return f'/api/projects/{self.project.pk}/{action}/', f'/api/async/projects/{self.project.pk}/{action}/'
+
+    async def test_async_schema_load_matches_sync(self):
+        expected = await sync_to_async(load_project_schema)(self.project)
+
+        self.assertEqual(await load_project_schema_async(self.project), expected)
+
+    async def test_preview_and_graph_match_the_drf_views(self):
+        for action, params in (('preview', {}), ('preview', {'file': 'requirements.txt'}),
+                               ('preview/files', {}), ('graph', {'include': 'models,fields'})):
+            sync_url, async_url = self.urls(action)
+            expected = await sync_to_async(self.client.get)(sync_url, params)
+            response = await self.async_client.get(async_url, params, headers=self.headers)
+
+            self.assertEqual(response.status_code, 200, action)
+            self.assertEqual(response.json(), json.loads(expected.content), action)
+            self.assertEqual(response['ETag'], expected['ETag'], action)
+
+            not_modified = await self.async_client.get(
+                async_url, params, headers=dict(self.headers, **{'If-None-Match': response['ETag']})
+            )
+            self.assertEqual(not_modified.status_code, 304, action)
+
+    async def test_generate(self):
+        _, url = self.urls('generate')
+
+        streamed = await self.async_client.post(f'{url}?stream=1', headers=self.headers)
+        archive = b''.join([chunk async for chunk in streamed.streaming_content])
+        response = await self.async_client.post(url, headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertEqual(
+            zipfile.ZipFile(io.BytesIO(archive)).namelist(),
+            zipfile.ZipFile(io.BytesIO(response.content)).namelist(),
+        )
+
+    async def test_authentication_and_ownership(self):
+        _, url = self.urls('graph')
+        self.assertEqual((await self.async_client.get(url)).status_code, 401)
+
+        other = await CustomUser.objects.acreate(username='other', email='other@example.com')
+        headers = {'Authorization': f'Bearer {RefreshToken.for_user(other).access_token}'}
+        self.assertEqual((await self.async_client.get(url, headers=headers)).status_code, 404)
+
+
+class SchemaRevisionTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.project = create_project(self.user, 'Revised', model_count=2)
+        self.models_url = f'/api/projects/{self.project.pk}/models/'
+
+    def test_child_changes_advance_revision(self):
+        before = Project.objects.get(pk=self.project.pk).schema_revision
+
+        model = self.project.database_models.first()
+        ModelField.objects.create(database_model=model, name='extra')
+        model.delete()
+
+        self.assertEqual(Project.objects.get(pk=self.project.pk).schema_revision, before + 2)
+
+    def test_stale_project_save_keeps_revision(self):
+        stale = Project.objects.get(pk=self.project.pk)
+        Project.objects.filter(pk=self.project.pk).bump_schema_revision()
+        current = Project.objects.get(pk=self.project.pk).schema_revision
+
+        stale.description = 'edited'
+        stale.save()
+
+        self.assertEqual(Project.objects.get(pk=self.project.pk).schema_revision, current + 1)
+
+    def test_conditional_get_returns_304_with_one_query(self):
+        response = self.client.get(self.models_url)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+
+        with CaptureQueriesContext(connection) as captured:
+            not_modified = self.client.get(self.models_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], etag)
+        self.assertEqual(len(captured), 1)
+
+        DatabaseModel.objects.create(project=self.project, name='Added')
+        self.assertEqual(self.client.get(self.models_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class ProjectCounterTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.project = create_project(self.user, 'Counted', model_count=3, fields_per_model=2)
+
+    def counters(self):
+        return Project.objects.values(*Project.COUNTER_FIELDS).get(pk=self.project.pk)
+
+    def assertCountersMatchTables(self):
+        project = Project.objects.with_actual_counts().get(pk=self.project.pk)
+        for name in Project.COUNTER_FIELDS:
+            self.assertEqual(getattr(project, name), getattr(project, f'actual_{name}'), name)
+
+    def test_counters_follow_creates_and_cascading_deletes(self):
+        self.assertEqual(self.counters(), {
+            'model_count': 3, 'field_count': 6, 'relationship_count': 2, 'view_count': 0, 'route_count': 0,
+        })
+
+        middle = self.project.database_models.get(name='Model1')
+        View.objects.create(project=self.project, name='Middle', model=middle)
+        URLRoute.objects.create(project=self.project, path='/middle/', name='middle')
+        middle.delete()
+
+        self.assertEqual(self.counters(), {
+            'model_count': 2, 'field_count': 4, 'relationship_count': 0, 'view_count': 0, 'route_count': 1,
+        })
+        self.assertCountersMatchTables()
+
+    def test_bulk_paths_keep_counters_in_step(self):
+        model = self.project.database_models.get(name='Model0')
+        self.client.post(f'/api/projects/{self.project.pk}/models/{model.pk}/fields/bulk/', {
+            'create': [{'name': 'bulk_a'}, {'name': 'bulk_b'}],
+            'delete': [str(model.fields.get(name='field_0').pk)],
+        }, format='json')
+        self.assertCountersMatchTables()
+
+        self.client.post(f'/api/projects/{self.project.pk}/import/', {
+            'replace': True,
+            'models': [{'name': 'Only', 'fields': [{'name': 'title'}]}],
+            'routes': [{'path': '/only/', 'name': 'only'}],
+        }, format='json')
+        self.assertEqual(self.counters()['field_count'], 1)
+        self.assertCountersMatchTables()
+
+    def test_recount_command_repairs_drift(self):
+        Project.objects.filter(pk=self.project.pk).update(field_count=99)
+
+        with self.assertRaises(CommandError):
+            call_command('recount_project_counters', '--check', stdout=StringIO())
+        call_command('recount_project_counters', stdout=StringIO())
+
+        self.assertEqual(self.counters()['field_count'], 6)
+
+
+class PlanLimitTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='x')
+        self.profile = UserProfile.objects.create(user=self.user, projects_limit=2, models_per_project_limit=3)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_project(self, name):
+        return self.client.post('/api/projects/', {'name': name})
+
+    def test_project_limit(self):
+        self.assertEqual(self.create_project('One').status_code, 201)
+        self.assertEqual(self.create_project('Two').status_code, 201)
+        self.assertEqual(self.create_project('Three').status_code, 403)
+
+        self.client.delete(f'/api/projects/{Project.objects.get(name="One").pk}/')
+        self.assertEqual(self.create_project('Three').status_code, 201)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.project_count, 2)
+
+    def test_profile_is_created_with_the_current_count(self):
+        self.profile.delete()
+        create_project(self.user, 'Existing', model_count=0)
+
+        self.assertEqual(self.create_project('New').status_code, 201)
+        self.assertEqual(UserProfile.objects.get(user=self.user).project_count, 2)
+
+    def test_profile_created_concurrently_is_fetched(self):
+        self.profile.delete()
+        concurrent = UserProfile.objects.create(user=self.user, projects_limit=7)
+
+        # As if the first lookup ran before the other request's insert
+        with mock.patch.object(UserProfile.objects, 'get', side_effect=[UserProfile.DoesNotExist, concurrent]):
+            self.assertEqual(get_profile(self.user), concurrent)
+
+        # The failed insert was rolled back to its savepoint only
+        self.assertEqual(UserProfile.objects.get(user=self.user).projects_limit, 7)
+
+    def test_check_claims_against_the_stored_count(self):
+        create_project(self.user, 'Existing', model_count=0)
+        profile = UserProfile.objects.get(user=self.user)
+
+        with CaptureQueriesContext(connection) as captured:
+            check_project_limit(self.user)
+        self.assertEqual(len(captured), 1)
+        with self.assertRaises(PlanLimitExceeded):
+            check_project_limit(self.user, count=2)
+
+        # A concurrent create committed after profile was read leaves it stale
+        create_project(self.user, 'Concurrent', model_count=0)
+        self.assertEqual(profile.project_count, 1)
+        with self.assertRaises(PlanLimitExceeded):
+            check_project_limit(self.user)
+        self.assertEqual(UserProfile.objects.get(user=self.user).project_count, 2)
+
+    def test_model_limit(self):
+        project = create_project(self.user, 'Limited', model_count=2)
+        url = f'/api/projects/{project.pk}/models/'
+
+        self.assertEqual(self.client.post(url, {'name': 'Third'}).status_code, 201)
+        self.assertEqual(self.client.post(url, {'name': 'Fourth'}).status_code, 403)
+        self.assertEqual(project.database_models.count(), 3)
+
+    def test_check_locks_the_counter_row_before_inserting(self):
+        with CaptureQueriesContext(connection) as captured:
+            self.create_project('Locked')
+
+        quote = connection.ops.quote_name
+        statements = [query['sql'] for query in captured]
+        check = next(index for index, sql in enumerate(statements) if sql.startswith(f'UPDATE {quote("users_userprofile")}'))
+        insert = next(index for index, sql in enumerate(statements) if sql.startswith(f'INSERT INTO {quote("scaffolder_project")}'))
+        self.assertIn(quote('projects_limit'), statements[check])
+        self.assertLess(check, insert)
+
+    def test_import_is_checked_as_a_whole(self):
+        project = create_project(self.user, 'Imported', model_count=2)
+        url = f'/api/projects/{project.pk}/import/'
+
+        response = self.client.post(url, {
+            'replace': True, 'models': [{'name': f'M{index}'} for index in range(4)],
+        }, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(project.database_models.count(), 2)
+
+        response = self.client.post(url, {
+            'replace': True, 'models': [{'name': f'M{index}'} for index in range(3)],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+
+@skipUnless(connection.vendor in ('postgresql', 'mysql'), 'Needs row locks; in-memory SQLite rejects concurrent writers')
+class ConcurrentPlanLimitTests(TransactionTestCase):
+    """Parallel creates must not get past a limit between check and insert"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='x')
+        UserProfile.objects.create(user=self.user, projects_limit=3, models_per_project_limit=3)
+
+    def run_in_parallel(self, method, url, payloads):
+        barrier = threading.Barrier(len(payloads))
+        statuses = []
+
+        def worker(payload):
+            client = APIClient()
+            client.force_authenticate(self.user)
+            barrier.wait()
+            try:
+                statuses.append(getattr(client, method)(url, payload, format='json').status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(payload,)) for payload in payloads]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return statuses
+
+    def test_parallel_project_creates_stay_within_the_limit(self):
+        statuses = self.run_in_parallel('post', '/api/projects/', [{'name': f'P{index}'} for index in range(8)])
+
+        self.assertEqual(sorted(statuses), [201] * 3 + [403] * 5)
+        created = Project.objects.filter(owner=self.user).count()
+        self.assertEqual(created, 3)
+        self.assertEqual(UserProfile.objects.get(user=self.user).project_count, created)
+
+    def test_parallel_model_creates_stay_within_the_limit(self):
+        project = Project.objects.create(owner=self.user, name='Parallel')
+        statuses = self.run_in_parallel(
+            'post', f'/api/projects/{project.pk}/models/', [{'name': f'M{index}'} for index in range(8)]
+        )
+
+        self.assertEqual(sorted(statuses), [201] * 3 + [403] * 5)
+        created = project.database_models.count()
+        self.assertEqual(created, 3)
+        self.assertEqual(Project.objects.get(pk=project.pk).model_count, created)
+
+
+class RankOrderingTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.project = create_project(self.user, 'Ranked', model_count=1, fields_per_model=4)
+        self.model = self.project.database_models.get()
+        self.fields_url = f'/api/projects/{self.project.pk}/models/{self.model.pk}/fields/'
+
+    def field_names(self):
+        return list(self.model.fields.values_list('name', flat=True))
+
+    def move(self, name, **neighbours):
+        field = self.model.fields.get(name=name)
+        data = {key: str(self.model.fields.get(name=value).pk) for key, value in neighbours.items()}
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post(f'{self.fields_url}{field.pk}/move/', data, format='json')
+        self.assertEqual(response.status_code, 200)
+        return captured
+
+    def test_move_rewrites_only_the_moved_row(self):
+        captured = self.move('field_3', after='field_0')
+
+        self.assertEqual(self.field_names(), ['field_0', 'field_3', 'field_1', 'field_2'])
+        writes = [query['sql'] for query in captured if query['sql'].startswith('UPDATE "scaffolder_modelfield"')]
+        self.assertEqual(len(writes), 1)
+
+    def test_move_to_either_end(self):
+        self.move('field_2', before='field_0')
+        self.move('field_0')
+
+        self.assertEqual(self.field_names(), ['field_2', 'field_1', 'field_3', 'field_0'])
+
+    def test_rebalance_keeps_order_and_shortens_ranks(self):
+        for _ in range(30):
+            self.move('field_3', before='field_0')
+            self.move('field_0', before='field_3')
+        order = self.field_names()
+
+        call_command('rebalance_ranks', '--max-length', '4', stdout=StringIO())
+
+        self.assertEqual(self.field_names(), order)
+        self.assertTrue(all(len(rank) <= 2 for rank in self.model.fields.values_list('rank', flat=True)))
+
+    def test_appended_ranks_grow_logarithmically(self):
+        ranks = ranks_after(None, 5000)
+
+        self.assertEqual(ranks, sorted(set(ranks)))
+        self.assertLessEqual(max(len(rank) for rank in ranks), 5)
+
+    def test_created_rows_go_last(self):
+        for index in range(40):
+            ModelField.objects.create(database_model=self.model, name=f'extra_{index}', field_type='char')
+
+        self.assertEqual(self.field_names()[4:], [f'extra_{index}' for index in range(40)])
+        self.assertTrue(all(len(rank) <= 3 for rank in self.model.fields.values_list('rank', flat=True)))
+
+    def test_order_is_read_only(self):
+        response = self.client.post(self.fields_url, {'name': 'first', 'field_type': 'char', 'order': 0}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.field_names()[-1], 'first')
+
+
+@skipUnless(connection.vendor in ('sqlite', 'postgresql'), 'Plan assertions are written for SQLite and PostgreSQL')
+class QueryPlanTests(TestCase):
+    """Hot lookups must stay index searches; fails when a plan regresses to a full table scan"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='owner', email='owner@example.com', password='x')
+        self.project_id = create_project(self.user, 'Planned', model_count=3).pk
+
+    def explain(self, queryset):
+        if connection.vendor == 'postgresql':
+            # Tiny test tables make a sequential scan the cheapest plan; ask whether an index exists
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def assertSearches(self, queryset, *tables):
+        plan = self.explain(queryset)
+        for table in tables:
+            if connection.vendor == 'sqlite':
+                self.assertNotRegex(plan, rf'\bSCAN {table}\b', f'Full scan of {table}:\n{plan}')
+                self.assertRegex(plan, rf'\bSEARCH {table} USING (COVERING )?INDEX', plan)
+            else:
+                self.assertNotRegex(plan, rf'Seq Scan on {table}\b', f'Full scan of {table}:\n{plan}')
+        return plan
+
+    def assertNoSort(self, plan):
+        if connection.vendor == 'sqlite':
+            self.assertNotIn('TEMP B-TREE', plan)
+        else:
+            self.assertIsNone(re.search(r'^\s*(->\s*)?Sort\b', plan, re.MULTILINE), plan)
+
+    def test_schema_loader_lookups_use_indexes(self):
+        self.assertSearches(
+            ModelField.objects.filter(database_model__project_id=self.project_id),
+            'scaffolder_databasemodel', 'scaffolder_modelfield',
+        )
+        self.assertSearches(
+            Relationship.objects.filter(from_model__project_id=self.project_id),
+            'scaffolder_databasemodel', 'scaffolder_relationship',
+        )
+        self.assertSearches(
+            ViewField.objects.filter(view__project_id=self.project_id),
+            'scaffolder_view', 'scaffolder_viewfield',
+        )
+        self.assertSearches(URLRoute.objects.filter(project_id=self.project_id), 'scaffolder_urlroute')
+
+    def test_incoming_relationships_use_index(self):
+        self.assertSearches(Relationship.objects.filter(to_model_id__in=[uuid.uuid4()]), 'scaffolder_relationship')
+
+    def test_ranked_children_are_read_in_index_order(self):
+        self.assertNoSort(self.assertSearches(
+            DatabaseModel.objects.filter(project_id=self.project_id), 'scaffolder_databasemodel'
+        ))
+        model_id = DatabaseModel.objects.filter(project_id=self.project_id).values_list('pk', flat=True).first()
+        self.assertNoSort(self.assertSearches(
+            ModelField.objects.filter(database_model_id=model_id), 'scaffolder_modelfield'
+        ))
+
+    def test_project_list_page_is_read_in_index_order(self):
+        queryset = Project.objects.filter(owner=self.user).with_counts().order_by('-created_at', '-id')[:20]
+        plan = self.assertSearches(queryset, 'scaffolder_project')
+        self.assertNoSort(plan)
+        # The latest completed version comes from the partial index
+        self.assertIn('scaffolder_gen_completed_idx', plan)
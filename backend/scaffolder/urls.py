@@ -10,6 +10,7 @@ project_router = DefaultRouter()
 project_router.register(r'models', views.DatabaseModelViewSet, basename='model')
 project_router.register(r'relationships', views.RelationshipViewSet, basename='relationship')
 project_router.register(r'urls', views.URLRouteViewSet, basename='url')  
+project_router.register(r'generations', views.GeneratedProjectViewSet, basename='generation')
 
 # Nested router for model fields
 model_router = DefaultRouter()
@@ -24,4 +25,5 @@ urlpatterns = [
     path('projects/<uuid:project_pk>/views/<uuid:pk>/', views.ViewViewSet.as_view({'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}), name='view-detail'),
     path('projects/<uuid:project_pk>/views/<uuid:view_pk>/fields/', views.ViewFieldViewSet.as_view({'get': 'list', 'post': 'create'}), name='viewfield-list'),
     path('projects/<uuid:project_pk>/views/<uuid:view_pk>/fields/<uuid:pk>/', views.ViewFieldViewSet.as_view({'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}), name='viewfield-detail'),
+    path('projects/<uuid:project_pk>/views/<uuid:view_pk>/fields/<uuid:pk>/move/', views.ViewFieldViewSet.as_view({'post': 'move'}), name='viewfield-move'),
 ]
\ No newline at end of file
@@ -1,27 +1,181 @@
-from rest_framework import viewsets, status
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
+from django.db import transaction
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.db.models import Max, Prefetch
 from django.shortcuts import get_object_or_404
-import zipfile
-import io
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
 
-from .models import Project, DatabaseModel, ModelField, Relationship, View, ViewField, URLRoute
+from .models import Project, GeneratedProject, DatabaseModel, ModelField, Relationship, View, ViewField, URLRoute
 from .serializers import (
     ProjectListSerializer, ProjectDetailSerializer, 
-    DatabaseModelSerializer, ModelFieldSerializer, 
+    DatabaseModelSerializer, ModelFieldSerializer, ModelFieldBulkSerializer,
     RelationshipSerializer, GeneratedProjectSerializer,
     ViewSerializer, ViewFieldSerializer, URLRouteSerializer
 )
 from .permissions import IsOwnerOrReadOnly, IsProjectOwner
-from .code_generators import DjangoCodeGenerator, ExpressCodeGenerator
+from .pagination import ProjectCursorPagination
+from .code_generators import iter_zip_stream
+from .rendering import generate_response, preview_files_response, preview_response
+from .schema import load_project_schema
+from .importer import ProjectImportSerializer
+from .limits import check_model_limit, check_project_limit
+from .graph import GraphQueryError, graph_cache_kind, load_project_graph, parse_graph_selection
+from .response_cache import (
+    detail_etag, detail_last_modified, response_cache, schema_etag, schema_last_modified, with_validators
+)
+from .ranking import rank_between
+from .jobs import GenerationQueueFull, poll_interval, submit_generation
+
+# Everything DatabaseModelSerializer reads, loaded in one query per relation
+MODEL_GRAPH_PREFETCH = (
+    'fields',
+    Prefetch('outgoing_relationships', queryset=Relationship.objects.select_related('from_model', 'to_model')),
+    Prefetch('incoming_relationships', queryset=Relationship.objects.select_related('from_model', 'to_model')),
+)
+
+class ProjectScopedMixin:
+    """
+    For viewsets nested under projects/<project_pk>/.
+    
+    get_project() resolves the requesting user's project once per request
+    and caches it on the request; querysets are scoped to the owner directly.
+    """
+    
+    def get_project(self):
+        project = getattr(self.request, 'project', None)
+        if project is None:
+            project = get_object_or_404(Project, pk=self.kwargs['project_pk'], owner=self.request.user)
+            self.request.project = project
+        return project
+
+class SchemaConditionalMixin:
+    """
+    GETs carry ETag/Last-Modified validators from the project's schema
+    revision; a matching conditional request gets 304 after one project lookup.
+    """
+    
+    def list(self, request, *args, **kwargs):
+        return self.conditional_on_schema(super().list, request, *args, **kwargs)
+    
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_on_schema(super().retrieve, request, *args, **kwargs)
+    
+    def conditional_on_schema(self, handler, request, *args, project=None, etag=None, last_modified=None, **kwargs):
+        project = project or self.get_project()
+        etag = etag or schema_etag(project)
+        last_modified = last_modified or schema_last_modified(project)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        return with_validators(response, etag, last_modified)
+
+class CachedListMixin:
+    """Serve list responses from response_cache, when cache_kind is set, until the schema revision changes"""
+    cache_kind = None
+    
+    def list(self, request, *args, **kwargs):
+        build = super().list
+        if self.cache_kind is None:
+            return build(request, *args, **kwargs)
+        data = response_cache.get_or_build(
+            self.get_project(),
+            f'{self.cache_kind}?{request.GET.urlencode()}',
+            lambda: build(request, *args, **kwargs).data
+        )
+        return Response(data)
+
+class SchemaViewSet(ProjectScopedMixin, SchemaConditionalMixin, CachedListMixin, viewsets.ModelViewSet):
+    """
+    Base for the schema objects nested under a project.
+    
+    Writes run in one transaction with the signal handlers that keep the
+    project's revision and counters in step (post_save fires after save()'s
+    own transaction has ended).
+    """
+    
+    def create(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().create(request, *args, **kwargs)
+    
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().update(request, *args, **kwargs)
+    
+    def destroy(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().destroy(request, *args, **kwargs)
+
+class MoveMixin:
+    """
+    POST <detail>/move/ with {"after": <id>} and/or {"before": <id>} places the
+    object right after / before those siblings (last when neither is given)
+    by rewriting only its own rank.
+    """
+    
+    @action(detail=True, methods=['post'])
+    def move(self, request, *args, **kwargs):
+        obj = self.get_object()
+        with transaction.atomic():
+            # Serializes with appends and other moves under the same parent
+            obj.lock_rank_parent()
+            siblings = obj.rank_siblings().exclude(pk=obj.pk).values_list('rank', flat=True)
+            
+            neighbours = {}
+            for key in ('after', 'before'):
+                if request.data.get(key):
+                    try:
+                        neighbours[key] = siblings.get(pk=request.data[key])
+                    except (ObjectDoesNotExist, ValidationError):
+                        return Response({key: 'Must be the id of a sibling.'}, status=status.HTTP_400_BAD_REQUEST)
+            
+            after, before = neighbours.get('after'), neighbours.get('before')
+            if 'before' not in neighbours:
+                if 'after' in neighbours:
+                    before = siblings.filter(rank__gt=after).order_by('rank').first()
+                else:
+                    after = siblings.aggregate(last=Max('rank'))['last']
+            elif 'after' not in neighbours:
+                after = siblings.filter(rank__lt=before).order_by('-rank').first()
+            
+            try:
+                obj.rank = rank_between(after, before)
+            except ValueError:
+                return Response(
+                    {'before': 'Must sort after "after"; if it already does, the ranks need rebalancing.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            obj.save(update_fields=['rank', 'updated_at'] if hasattr(obj, 'updated_at') else ['rank'])
+        return Response(self.get_serializer(obj).data)
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(SchemaConditionalMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
     
+    @property
+    def paginator(self):
+        # Page numbers with a count by default; ?paginate=cursor opts into keyset pages, which skip the COUNT
+        if not hasattr(self, '_paginator'):
+            if self.request.query_params.get('paginate') == 'cursor':
+                self._paginator = ProjectCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+    
     def get_queryset(self):
-        return Project.objects.filter(owner=self.request.user).prefetch_related('database_models')
+        queryset = Project.objects.filter(owner=self.request.user).select_related('owner').with_counts()
+        if self.action == 'list':
+            # A total order, so page-number pages neither skip nor repeat projects created together
+            queryset = queryset.order_by(*ProjectCursorPagination.ordering)
+        if self.action in ('retrieve', 'update', 'partial_update'):
+            # The detail serializer renders the whole model graph
+            return queryset.prefetch_related(
+                Prefetch('database_models', queryset=DatabaseModel.objects.prefetch_related(*MODEL_GRAPH_PREFETCH))
+            )
+        return queryset
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -29,134 +183,283 @@ class ProjectViewSet(viewsets.ModelViewSet):
         return ProjectDetailSerializer
     
     def perform_create(self, serializer):
-        serializer.save(owner=self.request.user)
+        with transaction.atomic():
+            check_project_limit(self.request.user)
+            serializer.save(owner=self.request.user)
+    
+    def list(self, request, *args, **kwargs):
+        # Spans many projects, so there is no single revision to validate against
+        return viewsets.ModelViewSet.list(self, request, *args, **kwargs)
+    
+    def retrieve(self, request, *args, **kwargs):
+        # Check ownership cheaply; the full graph is only loaded on a cache miss
+        project = get_object_or_404(
+            Project.objects.filter(owner=request.user).only('pk', 'owner', *Project.REVISION_FIELDS)
+            .with_last_generation(),
+            pk=kwargs['pk']
+        )
+        
+        def build(request, *args, **kwargs):
+            data = response_cache.get_or_build(
+                project, 'detail', lambda: self.get_serializer(self.get_object()).data
+            )
+            # Generations complete without a schema change, so this is not part of the cached payload
+            return Response({**data, 'last_generated_version': project.last_generated_version})
+        
+        return self.conditional_on_schema(
+            build, request, *args, project=project,
+            etag=detail_etag(project), last_modified=detail_last_modified(project), **kwargs
+        )
+    
+    @action(detail=True, methods=['get'])
+    def graph(self, request, pk=None):
+        """
+        The project's whole schema graph in one response.
+        
+        ?include=models,fields,... picks the types and ?fields[<type>]=a,b
+        their columns; see scaffolder.graph. Cached and validated per
+        schema revision like the detail view.
+        """
+        try:
+            selection = parse_graph_selection(request.query_params)
+        except GraphQueryError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        project = get_object_or_404(
+            Project.objects.filter(owner=request.user).only('pk', 'owner', *Project.REVISION_FIELDS),
+            pk=pk
+        )
+        
+        def build(request, *args, **kwargs):
+            return Response(response_cache.get_or_build(
+                project, graph_cache_kind(selection), lambda: load_project_graph(project.pk, selection)
+            ))
+        
+        return self.conditional_on_schema(build, request, project=project)
     
     @action(detail=True, methods=['post'])
     def generate(self, request, pk=None):
+        """The generated project as a ZIP; ?stream=true streams it while it is compressed"""
         project = self.get_object()
+        return generate_response(request, project, load_project_schema(project), Response)
+    
+    @action(detail=True, methods=['post'], url_path='import')
+    def import_schema(self, request, pk=None):
+        """
+        Create a project's whole schema from one JSON document.
         
-        # Determine the generator based on framework
-        if project.framework == 'django':
-            generator = DjangoCodeGenerator(project)
-        else:
-            generator = ExpressCodeGenerator(project)
+        Models, fields, relationships, views, view fields and routes are
+        validated together and written in a single transaction; see
+        scaffolder.importer for the document format.
+        """
+        project = self.get_object()
+        serializer = ProjectImportSerializer(data=request.data, context={'project': project})
+        serializer.is_valid(raise_exception=True)
+        counts = serializer.save()
+        return Response({'imported': counts}, status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['get'])
+    def preview(self, request, pk=None):
+        """
+        Preview the generated code without downloading.
         
+        ?file=<path> renders a single file from the preview manifest. Responses
+        carry an ETag derived from the schema fingerprint and conditional
+        requests for an unchanged schema get 304 without rendering.
+        """
+        project = self.get_object()
         try:
-            # Generate the project structure
-            project_structure = generator.generate_project()
-            
-            # Create ZIP file
-            zip_buffer = generator.create_zip_file(project_structure)
-            
-            # Prepare response
-            response = HttpResponse(
-                zip_buffer.getvalue(),
-                content_type='application/zip'
-            )
-            response['Content-Disposition'] = f'attachment; filename="{project.name}_project.zip"'
-            
-            return response
-            
+            schema = load_project_schema(project)
         except Exception as e:
             return Response(
-                {'error': f'Generation failed: {str(e)}'},
+                {'error': f'Preview generation failed: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+        return preview_response(request, schema, Response)
     
-    @action(detail=True, methods=['get'])
-    def preview(self, request, pk=None):
-        """Preview the generated code without downloading"""
+    @action(detail=True, methods=['get'], url_path='preview/files')
+    def preview_files(self, request, pk=None):
+        """List the files preview can render, with the ETag each would carry"""
         project = self.get_object()
-        
-        if project.framework == 'django':
-            generator = DjangoCodeGenerator(project)
-        else:
-            generator = ExpressCodeGenerator(project)
-        
+        return preview_files_response(request, load_project_schema(project), Response)
+
+class GeneratedProjectViewSet(ProjectScopedMixin, mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Asynchronous generation jobs: submit, poll and download.
+    
+    Unfinished jobs respond 202 with the status URL in Location and a
+    Retry-After hint; poll it until it responds 200.
+    """
+    serializer_class = GeneratedProjectSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        queryset = GeneratedProject.objects.filter(
+            project_id=self.kwargs['project_pk'],
+            project__owner=self.request.user
+        )
+        # Keep status polling cheap; the archive contents are only needed for download
+        if self.action != 'download':
+            queryset = queryset.defer('generated_code')
+        return queryset
+    
+    def create(self, request, *args, **kwargs):
         try:
-            preview_data = generator.generate_preview()
-            return Response(preview_data)
-        except Exception as e:
+            generation = submit_generation(self.get_project())
+        except GenerationQueueFull:
+            response = Response(
+                {'error': 'Too many generations in progress. Please retry shortly.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+            response['Retry-After'] = '5'
+            return response
+        
+        return self.status_response(generation)
+    
+    def retrieve(self, request, *args, **kwargs):
+        return self.status_response(self.get_object())
+    
+    def status_response(self, generation):
+        if generation.is_finished:
+            return Response(self.get_serializer(generation).data)
+        response = Response(self.get_serializer(generation).data, status=status.HTTP_202_ACCEPTED)
+        response['Location'] = self.request.build_absolute_uri(reverse(
+            'generation-detail', kwargs={'project_pk': generation.project_id, 'pk': generation.pk}
+        ))
+        response['Retry-After'] = str(poll_interval())
+        return response
+    
+    @action(detail=True, methods=['get'])
+    def download(self, request, project_pk=None, pk=None):
+        generation = self.get_object()
+        if generation.status != GeneratedProject.STATUS_COMPLETED:
             return Response(
-                {'error': f'Preview generation failed: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {'error': f'Generation is {generation.status}.'},
+                status=status.HTTP_409_CONFLICT
             )
+        
+        response = StreamingHttpResponse(
+            iter_zip_stream(generation.generated_code.items()),
+            content_type='application/zip'
+        )
+        filename = f'{generation.project.name}_project_v{generation.version}.zip'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
 
-class DatabaseModelViewSet(viewsets.ModelViewSet):
+class DatabaseModelViewSet(MoveMixin, SchemaViewSet):
     serializer_class = DatabaseModelSerializer
     permission_classes = [IsAuthenticated, IsProjectOwner]
     
     def get_queryset(self):
-        return DatabaseModel.objects.filter(project_id=self.kwargs['project_pk'])
+        return DatabaseModel.objects.filter(
+            project_id=self.kwargs['project_pk'],
+            project__owner=self.request.user
+        ).select_related('project').prefetch_related(*MODEL_GRAPH_PREFETCH)
     
     def perform_create(self, serializer):
-        project = get_object_or_404(Project, pk=self.kwargs['project_pk'], owner=self.request.user)
+        project = self.get_project()
+        check_model_limit(project)
         serializer.save(project=project)
 
-class ModelFieldViewSet(viewsets.ModelViewSet):
+class ModelFieldViewSet(MoveMixin, SchemaViewSet):
     serializer_class = ModelFieldSerializer
     permission_classes = [IsAuthenticated, IsProjectOwner]
     
     def get_queryset(self):
-        return ModelField.objects.filter(database_model__project_id=self.kwargs['project_pk'])
+        return ModelField.objects.filter(
+            database_model__project_id=self.kwargs['project_pk'],
+            database_model__project__owner=self.request.user
+        ).select_related('database_model__project')
     
-    def perform_create(self, serializer):
-        database_model = get_object_or_404(
+    def get_database_model(self):
+        return get_object_or_404(
             DatabaseModel, 
             pk=self.kwargs['model_pk'],
-            project_id=self.kwargs['project_pk']
+            project=self.get_project()
         )
-        serializer.save(database_model=database_model)
+    
+    def perform_create(self, serializer):
+        serializer.save(database_model=self.get_database_model())
+    
+    @action(detail=False, methods=['post'])
+    def bulk(self, request, project_pk=None, model_pk=None):
+        """
+        Apply a batch of field creates, updates, deletes and a reorder at once.
+        
+        Body: {"create": [...], "update": [{"id": ..., ...}], "delete": [ids],
+        "order": [ids]}. Responds with the model's fields after the batch.
+        """
+        database_model = self.get_database_model()
+        with transaction.atomic():
+            # Validate against the fields as they are when the batch is applied
+            list(DatabaseModel.objects.select_for_update().filter(pk=database_model.pk).values_list('pk'))
+            serializer = ModelFieldBulkSerializer(data=request.data, context={'database_model': database_model})
+            serializer.is_valid(raise_exception=True)
+            fields = serializer.save()
+        return Response(ModelFieldSerializer(fields, many=True).data)
 
-class RelationshipViewSet(viewsets.ModelViewSet):
+class RelationshipViewSet(SchemaViewSet):
     serializer_class = RelationshipSerializer
     permission_classes = [IsAuthenticated, IsProjectOwner]
     
     def get_queryset(self):
-        return Relationship.objects.filter(from_model__project_id=self.kwargs['project_pk'])
+        return Relationship.objects.filter(
+            from_model__project_id=self.kwargs['project_pk'],
+            from_model__project__owner=self.request.user
+        ).select_related('from_model__project', 'to_model')
     
     def perform_create(self, serializer):
-        project = get_object_or_404(Project, pk=self.kwargs['project_pk'], owner=self.request.user)
+        project = self.get_project()
         from_model = get_object_or_404(DatabaseModel, pk=self.request.data.get('from_model'), project=project)
         to_model = get_object_or_404(DatabaseModel, pk=self.request.data.get('to_model'), project=project)
         serializer.save(from_model=from_model, to_model=to_model)
         
         
-class ViewViewSet(viewsets.ModelViewSet):
+class ViewViewSet(SchemaViewSet):
     serializer_class = ViewSerializer
+    cache_kind = 'views'
     permission_classes = [IsAuthenticated, IsProjectOwner]
     
     def get_queryset(self):
-        return View.objects.filter(project_id=self.kwargs['project_pk']).prefetch_related('included_fields')
+        return View.objects.filter(
+            project_id=self.kwargs['project_pk'],
+            project__owner=self.request.user
+        ).select_related('project', 'model').prefetch_related(
+            Prefetch('included_fields', queryset=ViewField.objects.select_related('model_field'))
+        )
     
     def perform_create(self, serializer):
-        project = get_object_or_404(Project, pk=self.kwargs['project_pk'], owner=self.request.user)
-        serializer.save(project=project)
+        serializer.save(project=self.get_project())
 
-class ViewFieldViewSet(viewsets.ModelViewSet):
+class ViewFieldViewSet(MoveMixin, SchemaViewSet):
     serializer_class = ViewFieldSerializer
     permission_classes = [IsAuthenticated, IsProjectOwner]
     
     def get_queryset(self):
-        return ViewField.objects.filter(view__project_id=self.kwargs['project_pk'])
+        return ViewField.objects.filter(
+            view__project_id=self.kwargs['project_pk'],
+            view__project__owner=self.request.user
+        ).select_related('view__project', 'model_field')
     
     def perform_create(self, serializer):
         view = get_object_or_404(
             View, 
             pk=self.kwargs['view_pk'],
-            project_id=self.kwargs['project_pk']
+            project=self.get_project()
         )
         serializer.save(view=view)
         
         
 # In your views.py, add the URL viewset
-class URLRouteViewSet(viewsets.ModelViewSet):
+class URLRouteViewSet(SchemaViewSet):
     serializer_class = URLRouteSerializer
+    cache_kind = 'routes'
     permission_classes = [IsAuthenticated, IsProjectOwner]
     
     def get_queryset(self):
-        return URLRoute.objects.filter(project_id=self.kwargs['project_pk'])
+        return URLRoute.objects.filter(
+            project_id=self.kwargs['project_pk'],
+            project__owner=self.request.user
+        ).select_related('project')
     
     def perform_create(self, serializer):
-        project = get_object_or_404(Project, pk=self.kwargs['project_pk'], owner=self.request.user)
-        serializer.save(project=project)
\ No newline at end of file
+        serializer.save(project=self.get_project())
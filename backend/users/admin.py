@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser, UserProfile
+from .models import CustomUser, UserProfile, OutgoingEmail
 
 @admin.register(CustomUser)
 class CustomUserAdmin(UserAdmin):
@@ -17,6 +17,16 @@ class CustomUserAdmin(UserAdmin):
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
-    list_display = ('user', 'subscription_tier', 'projects_limit', 'api_calls_today')
+    list_display = ('user', 'subscription_tier', 'project_count', 'projects_limit', 'calls_today')
     list_filter = ('subscription_tier',)
-    search_fields = ('user__username', 'user__email')
\ No newline at end of file
+    search_fields = ('user__username', 'user__email')
+    
+    @admin.display(description='API calls today')
+    def calls_today(self, profile):
+        return profile.calls_today
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject', 'recipients')
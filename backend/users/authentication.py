@@ -0,0 +1,100 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class AuthenticatedUserCache:
+    """
+    What authentication checks about a token subject, for a short TTL: the
+    user id, is_active and a digest of the password hash (for revoking
+    tokens on a password change), never the hash itself or other fields.
+
+    Saving or deleting a user drops its entry (see users.signals); writes
+    through QuerySet.update() are only picked up when the entry expires.
+    The alias must be shared by all workers so that invalidation reaches
+    them (see users.checks).
+    """
+    KEY_PREFIX = 'users:auth'
+
+    def __init__(self, alias=None, timeout=None):
+        config = getattr(settings, 'USER_AUTH_CACHE', {})
+        self.alias = alias or config.get('ALIAS', 'default')
+        self.timeout = timeout or config.get('TIMEOUT', 60)
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def key(self, user_id):
+        return f'{self.KEY_PREFIX}:{user_id}'
+
+    def get(self, user_id):
+        return self.cache.get(self.key(user_id))
+
+    def set(self, user_id, user):
+        entry = {
+            'pk': user.pk,
+            'is_active': user.is_active,
+            'password_digest': get_md5_hash_password(user.password),
+        }
+        self.cache.set(self.key(user_id), entry, self.timeout)
+        return entry
+
+    def forget(self, user_id):
+        self.cache.delete(self.key(user_id))
+
+
+user_cache = AuthenticatedUserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that skips the user query while the token subject is
+    cached. The user is then only partially loaded (pk and is_active); the
+    first access to another field loads the rest (see CustomUser.refresh_from_db).
+    The profile is not cached: request.user.profile costs a query where it is
+    read, and the tier the quota needs is cached by users.quota.
+    """
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        entry = user_cache.get(user_id)
+        if entry is None:
+            try:
+                user = self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist as e:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found') from e
+            entry = user_cache.set(user_id, user)
+        else:
+            loaded = {self.user_model._meta.pk.attname: entry['pk'], 'is_active': entry['is_active']}
+            fields = [f.attname for f in self.user_model._meta.concrete_fields if f.attname in loaded]
+            user = self.user_model.from_db(
+                router.db_for_read(self.user_model), fields, [loaded[name] for name in fields]
+            )
+        self.check_user(entry, validated_token)
+        return user
+
+    async def aauthenticate(self, request):
+        """authenticate() for async views; the cache and a miss's query run off the event loop"""
+        return await sync_to_async(self.authenticate)(request)
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+    def check_user(self, entry, validated_token):
+        # The same checks as JWTAuthentication.get_user, against a user_cache entry
+        if api_settings.CHECK_USER_IS_ACTIVE and not entry['is_active']:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != entry['password_digest']:
+            raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
@@ -0,0 +1,43 @@
+"""
+Deployment checks (`manage.py check --deploy`) for settings the users app
+relies on in production.
+"""
+from django.conf import settings
+from django.core import checks
+
+# Backends that keep entries per process (or not at all)
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def _is_process_local(alias):
+    return settings.CACHES.get(alias, {}).get('BACKEND') in PROCESS_LOCAL_CACHES
+
+
+@checks.register(checks.Tags.caches, deploy=True)
+def check_quota_cache(app_configs, **kwargs):
+    alias = getattr(settings, 'USER_API_QUOTA', {}).get('ALIAS', 'default')
+    if not _is_process_local(alias):
+        return []
+    return [checks.Error(
+        f'USER_API_QUOTA uses the process-local cache {alias!r}.',
+        hint='Every worker process would count calls separately, multiplying the daily limits by the '
+             'number of workers; point USER_API_QUOTA["ALIAS"] at a shared cache such as Redis or Memcached.',
+        id='users.E001',
+    )]
+
+
+@checks.register(checks.Tags.caches, deploy=True)
+def check_auth_cache(app_configs, **kwargs):
+    alias = getattr(settings, 'USER_AUTH_CACHE', {}).get('ALIAS', 'default')
+    if not _is_process_local(alias):
+        return []
+    return [checks.Error(
+        f'USER_AUTH_CACHE uses the process-local cache {alias!r}.',
+        hint='Saving a user only drops its entry in the saving process, so other workers would keep '
+             'accepting tokens of deactivated users until TIMEOUT; point USER_AUTH_CACHE["ALIAS"] at a '
+             'shared cache such as Redis or Memcached.',
+        id='users.E002',
+    )]
@@ -0,0 +1,40 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from users.outbox import send_queued_emails
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued outgoing emails in batches, retrying failures with backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Mails per batch (default: USER_EMAIL_OUTBOX BATCH_SIZE)')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep polling for due mails instead of exiting once the queue is drained')
+        parser.add_argument('--interval', type=float, default=5,
+                            help='Seconds to sleep between polls of an empty queue with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                sent, failed = send_queued_emails(options['batch_size'])
+            except Exception:
+                # E.g. the database is unreachable; a claimed batch is retried once its lease expires
+                if not options['loop']:
+                    raise
+                logger.exception('Sending queued emails failed')
+                sent = failed = 0
+            if sent or failed:
+                self.stdout.write(f'Sent {sent}, failed {failed}')
+                continue
+            if not options['loop']:
+                break
+            close_old_connections()
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS('No due emails'))
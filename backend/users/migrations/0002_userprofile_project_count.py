@@ -0,0 +1,29 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_project_counts(apps, schema_editor):
+    UserProfile = apps.get_model('users', 'UserProfile')
+    Project = apps.get_model('scaffolder', 'Project')
+    counts = Project.objects.filter(owner=OuterRef('user')).order_by().values('owner').annotate(
+        total=Count('pk')
+    ).values('total')
+    UserProfile.objects.update(project_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('scaffolder', '0012_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='project_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_project_counts, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 import uuid
 
 class CustomUser(AbstractUser):
@@ -20,6 +21,13 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return self.email
 
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        # Accessing one deferred field loads them all, e.g. on a user authenticated from the cache
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            fields = deferred
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
 class UserProfile(models.Model):
     user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name='profile')
     subscription_tier = models.CharField(
@@ -33,6 +41,8 @@ class UserProfile(models.Model):
     )
     projects_limit = models.IntegerField(default=5)
     models_per_project_limit = models.IntegerField(default=10)
+    # Kept in step by scaffolder.signals; checked against projects_limit
+    project_count = models.PositiveIntegerField(default=0, editable=False)
     api_calls_today = models.IntegerField(default=0)
     last_api_call = models.DateTimeField(null=True, blank=True)
     
@@ -40,4 +50,41 @@ class UserProfile(models.Model):
         db_table = 'users_userprofile'
 
     def __str__(self):
-        return f"{self.user.username} Profile"
\ No newline at end of file
+        return f"{self.user.username} Profile"
+
+    @property
+    def calls_today(self):
+        """api_calls_today, or 0 when the last counted call was on an earlier day and no flush has reset it yet"""
+        if self.last_api_call is None or timezone.localdate(self.last_api_call) < timezone.localdate():
+            return 0
+        return self.api_calls_today
+
+
+class OutgoingEmail(models.Model):
+    """Outbox row for a mail sent by the send_queued_emails worker (see users.outbox)"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['next_attempt_at', 'id']
+        indexes = [
+            # The worker's poll: due pending rows, oldest first
+            models.Index(fields=['status', 'next_attempt_at'], name='users_outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.recipients)}"
@@ -0,0 +1,118 @@
+"""
+Transactional email outbox.
+
+Request handlers only insert an OutgoingEmail row, in the same transaction
+as the change that caused it, so they never wait on (or fail with) the
+mail server. The send_queued_emails worker delivers due rows in batches
+over one backend connection and retries failures with exponential backoff
+until MAX_ATTEMPTS, after which the row is marked failed.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+
+def _outbox_settings():
+    config = getattr(settings, 'USER_EMAIL_OUTBOX', {})
+    return {
+        'BATCH_SIZE': config.get('BATCH_SIZE', 50),
+        'MAX_ATTEMPTS': config.get('MAX_ATTEMPTS', 5),
+        'RETRY_BACKOFF': config.get('RETRY_BACKOFF', 60),  # Seconds before the first retry, doubling after
+        'MAX_BACKOFF': config.get('MAX_BACKOFF', 60 * 60),
+        'LEASE': config.get('LEASE', 5 * 60),  # How long a claimed batch is hidden from other workers
+    }
+
+
+def enqueue_email(subject, body, recipients, from_email=None):
+    """Queue a mail; delivered by the send_queued_emails worker"""
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipients),
+    )
+
+
+def retry_delay(attempts, config=None):
+    config = config or _outbox_settings()
+    return timedelta(seconds=min(config['RETRY_BACKOFF'] * 2 ** (attempts - 1), config['MAX_BACKOFF']))
+
+
+def claim_batch(batch_size, now):
+    """Lease up to batch_size due rows to this worker by pushing their next attempt past the lease"""
+    config = _outbox_settings()
+    with transaction.atomic():
+        due = OutgoingEmail.objects.filter(status='pending', next_attempt_at__lte=now)
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        batch = list(due[:batch_size])
+        OutgoingEmail.objects.filter(pk__in=[email.pk for email in batch]).update(
+            next_attempt_at=now + timedelta(seconds=config['LEASE'])
+        )
+    return batch
+
+
+def record_failure(email, error, now, config=None):
+    """Count a failed attempt on email and schedule its retry, or give up after MAX_ATTEMPTS"""
+    config = config or _outbox_settings()
+    email.attempts += 1
+    logger.warning('Sending outgoing email %s failed (attempt %s): %s', email.pk, email.attempts, error)
+    email.last_error = str(error)
+    if email.attempts >= config['MAX_ATTEMPTS']:
+        email.status = 'failed'
+    else:
+        email.next_attempt_at = now + retry_delay(email.attempts, config)
+
+
+def send_queued_emails(batch_size=None, now=None):
+    """Deliver one batch of due mails; returns (sent, failed attempts)"""
+    config = _outbox_settings()
+    now = now or timezone.now()
+    batch = claim_batch(batch_size or config['BATCH_SIZE'], now)
+    if not batch:
+        return 0, 0
+
+    sent, failed = [], []
+    try:
+        mail_connection = get_connection()
+        mail_connection.open()
+    except Exception as e:
+        # The mail server is unreachable; every mail in the batch failed this attempt
+        for email in batch:
+            record_failure(email, e, now, config)
+        failed = batch
+    else:
+        try:
+            for email in batch:
+                message = EmailMessage(
+                    email.subject, email.body, email.from_email, email.recipients, connection=mail_connection
+                )
+                try:
+                    message.send()
+                except Exception as e:
+                    record_failure(email, e, now, config)
+                    failed.append(email)
+                else:
+                    email.attempts += 1
+                    email.status = 'sent'
+                    email.sent_at = timezone.now()
+                    email.last_error = ''
+                    sent.append(email)
+        finally:
+            try:
+                mail_connection.close()
+            except Exception as e:
+                logger.warning('Closing the mail connection failed: %s', e)
+
+    OutgoingEmail.objects.bulk_update(
+        sent + failed, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+    )
+    return len(sent), len(failed)
@@ -0,0 +1,170 @@
+"""
+Daily API-call quota accounting.
+
+Enforcement reads a per-user, per-day counter in the cache (one atomic
+incr per request); the day is part of the key, so counters reset at
+midnight by themselves. The subscription tier is only looked up (and then
+cached) once a user passes the smallest tier limit.
+
+UserProfile.api_calls_today/last_api_call are bookkeeping: calls are
+aggregated in process and flushed to the database with F() updates in one
+transaction every FLUSH_INTERVAL seconds, on a background thread, so the
+request path itself never writes. A hard crash loses at most the last
+interval of bookkeeping; enforcement is unaffected.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import close_old_connections, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .models import UserProfile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIER = UserProfile._meta.get_field('subscription_tier').default
+
+
+def _quota_settings():
+    config = getattr(settings, 'USER_API_QUOTA', {})
+    return {
+        'ALIAS': config.get('ALIAS', 'default'),
+        'DAILY_LIMITS': config.get('DAILY_LIMITS', {'free': 1000, 'pro': 10000, 'enterprise': None}),
+        'TIER_TIMEOUT': config.get('TIER_TIMEOUT', 5 * 60),
+        'FLUSH_INTERVAL': config.get('FLUSH_INTERVAL', 60),
+    }
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+def seconds_until_tomorrow():
+    now = timezone.localtime()
+    return (_day_start(now.date() + timedelta(days=1)) - now).total_seconds()
+
+
+class ApiCallQuota:
+    KEY_PREFIX = 'users:api'
+
+    def __init__(self):
+        self._pending = {}  # (user_id, day) -> [calls, last call]
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._flushing = False
+        self._executor = None
+
+    @property
+    def cache(self):
+        return caches[_quota_settings()['ALIAS']]
+
+    def _tier_key(self, user_id):
+        return f'{self.KEY_PREFIX}:tier:{user_id}'
+
+    def record_call(self, user):
+        """Count one call by user; returns (calls today, daily limit or None)"""
+        config = _quota_settings()
+        now = timezone.now()
+        day = timezone.localdate(now)
+        key = f'{self.KEY_PREFIX}:calls:{day.isoformat()}:{user.pk}'
+        try:
+            calls = self.cache.incr(key)
+        except ValueError:
+            # First call today; outlive the day so the counter never expires mid-day
+            self.cache.add(key, 0, timeout=2 * 24 * 60 * 60)
+            calls = self.cache.incr(key)
+
+        limits = [limit for limit in config['DAILY_LIMITS'].values() if limit is not None]
+        limit = None
+        if limits and calls > min(limits):
+            limit = config['DAILY_LIMITS'].get(self.get_tier(user.pk, config))
+        if limit is None or calls <= limit:
+            self._buffer(user.pk, day, now, config)
+        return calls, limit
+
+    def get_tier(self, user_id, config=None):
+        config = config or _quota_settings()
+        tier = self.cache.get(self._tier_key(user_id))
+        if tier is None:
+            tier = UserProfile.objects.filter(user_id=user_id).values_list(
+                'subscription_tier', flat=True
+            ).first() or DEFAULT_TIER
+            self.cache.set(self._tier_key(user_id), tier, config['TIER_TIMEOUT'])
+        return tier
+
+    def forget_tier(self, user_id):
+        self.cache.delete(self._tier_key(user_id))
+
+    def _buffer(self, user_id, day, now, config):
+        with self._lock:
+            entry = self._pending.setdefault((user_id, day), [0, now])
+            entry[0] += 1
+            entry[1] = max(entry[1], now)
+            interval = config['FLUSH_INTERVAL']
+            due = bool(interval) and not self._flushing and time.monotonic() - self._last_flush >= interval
+            if due:
+                self._flushing = True
+        if due:
+            self._get_executor().submit(self._background_flush)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='users-quota-flush')
+            return self._executor
+
+    def _background_flush(self):
+        close_old_connections()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Flushing API call counts failed')
+        finally:
+            close_old_connections()
+            with self._lock:
+                self._flushing = False
+
+    def flush(self):
+        """Write buffered calls to UserProfile in one transaction; returns the profiles updated"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+
+        updated = 0
+        try:
+            with transaction.atomic():
+                # Oldest day first, so a day rollover resets before the new day's calls are added
+                for (user_id, day), (calls, last_call) in sorted(pending.items(), key=lambda item: item[0][1]):
+                    start, end = _day_start(day), _day_start(day + timedelta(days=1))
+                    updated += UserProfile.objects.filter(user_id=user_id).update(
+                        api_calls_today=Case(
+                            # Already counting a later day: these calls are stale
+                            When(last_api_call__gte=end, then=F('api_calls_today')),
+                            When(last_api_call__gte=start, then=F('api_calls_today') + calls),
+                            default=Value(calls),
+                        ),
+                        last_api_call=Case(
+                            When(last_api_call__gte=last_call, then=F('last_api_call')),
+                            default=Value(last_call),
+                        ),
+                    )
+        except Exception:
+            # Keep the calls for the next flush
+            with self._lock:
+                for key, (calls, last_call) in pending.items():
+                    entry = self._pending.setdefault(key, [0, last_call])
+                    entry[0] += calls
+                    entry[1] = max(entry[1], last_call)
+            raise
+        return updated
+
+
+api_call_quota = ApiCallQuota()
@@ -3,6 +3,8 @@ from django.contrib.auth.password_validation import validate_password
 from .models import CustomUser, UserProfile
 
 class UserProfileSerializer(serializers.ModelSerializer):
+    api_calls_today = serializers.IntegerField(source='calls_today', read_only=True)
+
     class Meta:
         model = UserProfile
         fields = ('subscription_tier', 'projects_limit', 'models_per_project_limit', 
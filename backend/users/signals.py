@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete, post_save
+
+from .authentication import user_cache
+from .models import CustomUser, UserProfile
+from .quota import api_call_quota
+
+
+def on_user_changed(sender, instance, **kwargs):
+    # Password changes and deactivation must reach the next request
+    user_cache.forget(instance.pk)
+
+
+def on_profile_changed(sender, instance, **kwargs):
+    # The tier may have changed
+    api_call_quota.forget_tier(instance.user_id)
+
+
+post_save.connect(on_user_changed, sender=CustomUser, dispatch_uid='auth_cache_user_save')
+post_delete.connect(on_user_changed, sender=CustomUser, dispatch_uid='auth_cache_user_delete')
+post_save.connect(on_profile_changed, sender=UserProfile, dispatch_uid='quota_tier_save')
+post_delete.connect(on_profile_changed, sender=UserProfile, dispatch_uid='quota_tier_delete')
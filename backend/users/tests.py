@@ -1,3 +1,240 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from smtplib import SMTPException
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .authentication import CachedJWTAuthentication, user_cache
+from .checks import check_auth_cache, check_quota_cache
+from .models import CustomUser, UserProfile, OutgoingEmail
+from .outbox import enqueue_email, send_queued_emails
+from .quota import api_call_quota
+
+QUOTA = {'DAILY_LIMITS': {'free': 2, 'pro': 5, 'enterprise': None}, 'FLUSH_INTERVAL': None}
+
+
+@override_settings(USER_API_QUOTA=QUOTA)
+class ApiQuotaTests(TestCase):
+    def setUp(self):
+        # Drop calls buffered by other tests
+        api_call_quota.flush()
+        self.user = CustomUser.objects.create_user(username='caller', email='caller@example.com', password='x')
+        self.profile = UserProfile.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_profile(self):
+        return self.client.get('/api/auth/profile/').status_code
+
+    def test_calls_over_the_tier_limit_are_throttled(self):
+        self.assertEqual([self.get_profile() for _ in range(3)], [200, 200, 429])
+
+    def test_tier_change_applies_immediately(self):
+        self.get_profile()
+        self.get_profile()
+        self.assertEqual(self.get_profile(), 429)
+
+        self.profile.subscription_tier = 'pro'
+        self.profile.save()
+
+        self.assertEqual(self.get_profile(), 200)
+
+    def test_counting_below_the_smallest_limit_does_not_touch_the_database(self):
+        with self.assertNumQueries(0):
+            api_call_quota.record_call(self.user)
+            api_call_quota.record_call(self.user)
+
+    def test_flush_adds_buffered_calls(self):
+        self.get_profile()
+
+        self.assertEqual(api_call_quota.flush(), 1)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.api_calls_today, 1)
+        self.assertIsNotNone(self.profile.last_api_call)
+
+        self.get_profile()
+        self.get_profile()  # Throttled, not counted
+        api_call_quota.flush()
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.api_calls_today, 2)
+
+    def test_flush_resets_the_count_on_a_new_day(self):
+        UserProfile.objects.filter(pk=self.profile.pk).update(
+            api_calls_today=40, last_api_call=timezone.now() - timedelta(days=1)
+        )
+
+        api_call_quota.record_call(self.user)
+        api_call_quota.flush()
+
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.api_calls_today, 1)
+
+    def test_yesterdays_count_reads_as_zero_before_a_flush(self):
+        UserProfile.objects.filter(pk=self.profile.pk).update(
+            api_calls_today=40, last_api_call=timezone.now() - timedelta(days=1)
+        )
+
+        self.assertEqual(self.client.get('/api/auth/profile/').data['profile']['api_calls_today'], 0)
+
+    def test_deploy_check_requires_a_shared_cache(self):
+        self.assertEqual([error.id for error in check_quota_cache(None)], ['users.E001'])
+
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}):
+            self.assertEqual(check_quota_cache(None), [])
+
+
+class AuthenticationCacheTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='cached', email='cached@example.com', password='Old-pass-123')
+        UserProfile.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def user_queries(self):
+        table = connection.ops.quote_name(CustomUser._meta.db_table)
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get('/api/auth/profile/')
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in captured if f'FROM {table}' in query['sql']]
+
+    def test_subject_is_cached_without_credentials(self):
+        self.assertEqual(len(self.user_queries()), 1)
+
+        entry = user_cache.get(self.user.pk)
+        self.assertEqual(set(entry), {'pk', 'is_active', 'password_digest'})
+        self.assertNotIn(self.user.password, entry.values())
+
+        token = JWTAuthentication().get_validated_token(str(RefreshToken.for_user(self.user).access_token))
+        with self.assertNumQueries(0):
+            user = CachedJWTAuthentication().get_user(token)
+        self.assertEqual(user.pk, self.user.pk)
+
+        # Other fields load together on first use
+        with self.assertNumQueries(1):
+            self.assertEqual((user.email, user.username), ('cached@example.com', 'cached'))
+
+    def test_deploy_check_requires_a_shared_cache(self):
+        self.assertEqual([error.id for error in check_auth_cache(None)], ['users.E002'])
+
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}):
+            self.assertEqual(check_auth_cache(None), [])
+
+    def test_password_change_invalidates(self):
+        self.user_queries()
+
+        response = self.client.put('/api/auth/change-password/', {
+            'old_password': 'Old-pass-123', 'new_password': 'New-pass-456', 'new_password2': 'New-pass-456',
+        })
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(len(self.user_queries()), 1)
+
+    def test_deactivation_invalidates(self):
+        self.user_queries()
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 401)
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise SMTPException('Connection refused')
+
+
+class UnreachableEmailBackend(BaseEmailBackend):
+    def open(self):
+        raise ConnectionRefusedError('Mail server unreachable')
+
+    def send_messages(self, email_messages):
+        raise AssertionError('send_messages called without a connection')
+
+
+class EmailOutboxTests(TestCase):
+    def register(self):
+        return APIClient().post('/api/auth/register/', {
+            'username': 'new', 'email': 'new@example.com', 'password': 'Str0ng-pass-123', 'password2': 'Str0ng-pass-123',
+        })
+
+    def test_registration_only_queues_the_verification_mail(self):
+        self.assertEqual(self.register().status_code, 201)
+
+        self.assertEqual(mail.outbox, [])
+        queued = OutgoingEmail.objects.get()
+        self.assertEqual((queued.status, queued.recipients), ('pending', ['new@example.com']))
+
+    def test_worker_sends_due_mails_in_a_batch(self):
+        self.register()
+        enqueue_email('Second', 'Body', ['other@example.com'])
+
+        call_command('send_queued_emails', stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertIn('/verify-email?token=', mail.outbox[0].body)
+        self.assertFalse(OutgoingEmail.objects.exclude(status='sent').exists())
+
+    @override_settings(EMAIL_BACKEND='users.tests.FailingEmailBackend',
+                       USER_EMAIL_OUTBOX={'MAX_ATTEMPTS': 3, 'RETRY_BACKOFF': 60})
+    def test_failures_back_off_then_give_up(self):
+        email = enqueue_email('Hello', 'Body', ['someone@example.com'])
+        now = timezone.now()
+
+        with self.assertLogs('users.outbox', 'WARNING'):
+            send_queued_emails(now=now)
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('pending', 1))
+        self.assertIn('Connection refused', email.last_error)
+        self.assertGreaterEqual(email.next_attempt_at, now + timedelta(seconds=60))
+
+        # Not due yet
+        self.assertEqual(send_queued_emails(now=now + timedelta(seconds=30)), (0, 0))
+
+        with self.assertLogs('users.outbox', 'WARNING'):
+            send_queued_emails(now=now + timedelta(seconds=61))
+        email.refresh_from_db()
+        self.assertGreaterEqual(email.next_attempt_at, now + timedelta(seconds=61 + 120))
+
+        with self.assertLogs('users.outbox', 'WARNING'):
+            send_queued_emails(now=now + timedelta(hours=1))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('failed', 3))
+
+    @override_settings(EMAIL_BACKEND='users.tests.UnreachableEmailBackend',
+                       USER_EMAIL_OUTBOX={'MAX_ATTEMPTS': 3, 'RETRY_BACKOFF': 60})
+    def test_unreachable_server_counts_an_attempt_for_the_batch(self):
+        first = enqueue_email('First', 'Body', ['one@example.com'])
+        second = enqueue_email('Second', 'Body', ['two@example.com'])
+        now = timezone.now()
+
+        with self.assertLogs('users.outbox', 'WARNING'):
+            self.assertEqual(send_queued_emails(now=now), (0, 2))
+
+        for email in (first, second):
+            email.refresh_from_db()
+            self.assertEqual((email.status, email.attempts), ('pending', 1))
+            self.assertIn('Mail server unreachable', email.last_error)
+            self.assertGreaterEqual(email.next_attempt_at, now + timedelta(seconds=60))
+
+    @override_settings(EMAIL_BACKEND='users.tests.UnreachableEmailBackend')
+    def test_worker_loop_survives_an_unreachable_server(self):
+        enqueue_email('Hello', 'Body', ['someone@example.com'])
+        stdout = StringIO()
+
+        # Stop the loop at its first idle sleep
+        with mock.patch('users.management.commands.send_queued_emails.time.sleep', side_effect=KeyboardInterrupt), \
+                self.assertLogs('users.outbox', 'WARNING'), self.assertRaises(KeyboardInterrupt):
+            call_command('send_queued_emails', '--loop', stdout=stdout)
+
+        self.assertIn('Sent 0, failed 1', stdout.getvalue())
+        self.assertEqual(OutgoingEmail.objects.get().attempts, 1)
@@ -0,0 +1,20 @@
+from rest_framework.throttling import BaseThrottle
+
+from .quota import api_call_quota, seconds_until_tomorrow
+
+
+class DailyQuotaThrottle(BaseThrottle):
+    """
+    Per-user daily API-call quota by subscription tier (USER_API_QUOTA).
+
+    Anonymous requests are not counted; see users.quota for the accounting.
+    """
+
+    def allow_request(self, request, view):
+        if not request.user or not request.user.is_authenticated:
+            return True
+        calls, limit = api_call_quota.record_call(request.user)
+        return limit is None or calls <= limit
+
+    def wait(self):
+        return seconds_until_tomorrow()
@@ -3,13 +3,14 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
-from django.core.mail import send_mail
 from django.http import HttpResponse
 from django.conf import settings
+from django.db import transaction
 import jwt
 from datetime import datetime, timedelta
 
 from .models import CustomUser, UserProfile
+from .outbox import enqueue_email
 from .serializers import (
     UserRegistrationSerializer, UserSerializer, ChangePasswordSerializer,
     UserUpdateSerializer, EmailVerificationSerializer
@@ -22,14 +23,14 @@ class RegisterView(generics.CreateAPIView):
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = serializer.save()
+        with transaction.atomic():
+            user = serializer.save()
+            # Queued with the user; delivered by the send_queued_emails worker
+            self.send_verification_email(user)
         
         # Generate tokens
         refresh = RefreshToken.for_user(user)
         
-        # Send verification email (simplified)
-        # self.send_verification_email(user)
-        
         return Response({
             'user': UserSerializer(user).data,
             'refresh': str(refresh),
@@ -46,12 +47,10 @@ class RegisterView(generics.CreateAPIView):
         
         verification_url = f"{settings.FRONTEND_URL}/verify-email?token={token}"
         
-        send_mail(
+        enqueue_email(
             'Verify your email - Rapid Scaffolder',
             f'Please verify your email by clicking this link: {verification_url}',
-            settings.DEFAULT_FROM_EMAIL,
             [user.email],
-            fail_silently=False,
         )
 
 class LoginView(generics.GenericAPIView):
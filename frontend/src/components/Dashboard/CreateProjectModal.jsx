@@ -63,10 +63,7 @@ const CreateProjectModal = ({ isOpen, onClose, onProjectCreated }) => {
       setModels(prev => [...prev, { 
         ...currentModel, 
         id: Date.now(),
-        fields: currentModel.fields.map((field, index) => ({
-          ...field,
-          order: index
-        }))
+        fields: [...currentModel.fields]
       }]);
       setCurrentModel({
         name: '',
@@ -86,8 +83,7 @@ const CreateProjectModal = ({ isOpen, onClose, onProjectCreated }) => {
       blank: false,
       unique: false,
       default_value: '',
-      help_text: '',
-      order: models[modelIndex].fields.length
+      help_text: ''
     };
     
     const updatedModels = [...models];
@@ -126,8 +122,7 @@ const CreateProjectModal = ({ isOpen, onClose, onProjectCreated }) => {
         const modelData = {
           name: model.name,
           description: model.description,
-          display_field: model.display_field || 'id', // Default to 'id' if empty
-          order: models.indexOf(model)
+          display_field: model.display_field || 'id' // Default to 'id' if empty
         };
 
         try {
@@ -144,8 +139,7 @@ const CreateProjectModal = ({ isOpen, onClose, onProjectCreated }) => {
               blank: field.blank || false,
               unique: field.unique || false,
               default_value: field.default_value || '',
-              help_text: field.help_text || '',
-              order: field.order || 0
+              help_text: field.help_text || ''
             };
 
             // Remove null values
@@ -10,7 +10,6 @@ const FieldPropertiesPanel = ({ isOpen, onClose, selectedField, onSaveField, isN
     unique: false,
     default_value: '',
     help_text: '',
-    order: 0,
   });
 
   const fieldTypes = [
@@ -39,7 +38,6 @@ useEffect(() => {
       unique: selectedField.unique || false,
       default_value: selectedField.default_value || '',
       help_text: selectedField.help_text || '',
-      order: selectedField.order || 0,
     });
   } else if (isNewField) {
     setFieldData({
@@ -51,7 +49,6 @@ useEffect(() => {
       unique: false,
       default_value: '',
       help_text: '',
-      order: 0,
     });
   }
 }, [selectedField, isNewField]);
@@ -67,8 +64,7 @@ const handleSave = () => {
     blank: Boolean(fieldData.blank),
     unique: Boolean(fieldData.unique),
     default_value: fieldData.default_value || '',
-    help_text: fieldData.help_text || '',
-    order: fieldData.order || 0
+    help_text: fieldData.help_text || ''
   };
 
   console.log('💾 Saving field data:', completeFieldData);
@@ -145,8 +145,7 @@ const handleAddModel = async () => {
     const newModelData = {
       name: newName,
       description: "",
-      display_field: "id",
-      order: models.length
+      display_field: "id"
     };
 
     console.log('🔧 Creating model with data:', newModelData);
@@ -233,7 +232,6 @@ const handleAddModel = async () => {
         primary_key: fieldData.primary_key || false,
         default_value: fieldData.default_value || '',
         help_text: fieldData.help_text || '',
-        order: fieldData.order || 0,
         relationship_data: fieldData.relationship || null  // Send relationship data
       };
       